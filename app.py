@@ -1,43 +1,141 @@
 from flask import Flask, render_template, request, jsonify, session
 from flask_socketio import SocketIO, join_room, emit
+from functools import wraps
+import json
+import os
 import random
 import math
-import config
+import threading
 import player_settings as psettings
-from location_data import location
+import loan_projection
+import log_events
+import market_engine
+import rent
+import risk
+import sharding
+import street_catalog
+import valuation
+from gamelog import GameLog
+from journal import GameJournal, saved_game_ids
+from market import Stockmarket
+from registry import GameRegistry
 
 app = Flask(__name__)
 app.secret_key = "monopoly-plus-secret-key"
-socketio = SocketIO(app, cors_allowed_origins="*")
-
-games = {}
+socketio = SocketIO(app, cors_allowed_origins="*", **sharding.socketio_options())
 
 S = psettings.settings
 
+# Evicted games are restored from their journal on next access
+games = GameRegistry(
+    loader=lambda game_id: Game.restore(open_journal(game_id)),
+    idle_ttl=S["registry"]["idle_ttl"],
+    max_games=S["registry"]["max_games"],
+    memory_budget=S["registry"]["memory_budget_mb"] * 1024 * 1024,
+    spill_to_disk=S["registry"]["spill_to_disk"],
+)
+
 
 # ── Models ──────────────────────────────────────────────────────────────────
 
+class FairLock:
+    """Reentrant lock granted in arrival order (ticket lock).
+
+    Each game has one: concurrent requests mutate it one at a time, first come
+    first served, so a burst from one phone can't starve another.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._next_ticket = 0
+        self._now_serving = 0
+        self._owner = None
+        self._depth = 0
+
+    def acquire(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while self._now_serving != ticket:
+                self._cond.wait()
+            self._owner = me
+            self._depth = 1
+
+    def release(self):
+        with self._cond:
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._now_serving += 1
+                self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def mutation(method):
+    """Marks a Game method that changes state.
+
+    Runs under the game's lock (single writer). Successful calls bump
+    Game.version and, for the outermost call, are written to the game's
+    journal so the game can be rebuilt by replay.
+    """
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        with self.lock:
+            self._mutation_depth += 1
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                self._mutation_depth -= 1
+            ok = result[0] if isinstance(result, tuple) else result is not False
+            if ok:
+                self.version += 1
+                if self.journal is not None and self._mutation_depth == 0:
+                    self._journal_event(method.__name__, args, kwargs)
+            return result
+    return wrapped
+
+
 class Player:
     """Each player IS a company. Other players can buy shares in them."""
+    __slots__ = (
+        "_on_change", "version", "_valuation",
+        "name", "color", "_balance", "properties", "houses", "_property_value",
+        "shares_issued", "shareholders", "holdings",
+        "bank_loans", "player_loans_given", "player_loans_taken",
+        "distressed", "distress_rounds_left", "defaults", "eliminated",
+        "portfolio", "portfolio_value", "net_worth",
+    )
 
     def __init__(self, name, color):
+        self._on_change = None      # set by Game: called whenever a valuation input changes
+        self.version = 0            # bumped by changed(); share prices are memoized on it
+        self._valuation = None      # (version, engine, share price), see valuation.share_price
         self.name = name
         self.color = color
         self.balance = S["player"]["start_balance"]
-        self.properties = []        # list of street names they own on the physical board
-        self.property_value = 0     # sum of Pris for owned properties
+        self.properties = set()     # street names they own on the physical board (Game.street_owner mirrors it)
+        self.houses = {}            # {street: 1-5 houses (5 = hotel)} — only streets with houses
+        self.property_value = 0     # sum of Pris for owned properties, plus Huspris per house
 
         # Shares: this player can issue up to 4 shares in themselves
         self.shares_issued = 0      # 0-4 shares currently outstanding
         self.shareholders = {}      # {player_name: count} — who holds shares in ME
+        self.holdings = {}          # {player_name: count} — shares I hold in others (mirror of shareholders)
 
         # Loans
-        self.bank_loans = []        # [{"amount": int, "remaining": int, "taken_round": int}]
-        self.player_loans_given = []   # loans I gave: [{"to": name, "remaining": int, ...}]
-        self.player_loans_taken = []   # loans I took: [{"from": name, "remaining": int, "interest_rate": float, ...}]
-
-        # Insurance contracts where I am the insured
-        self.insurance_policies = []   # [{"insurer": name, "premium": int, "coverage_cap": int, "active": bool}]
+        self.bank_loans = []        # [BankLoan], addressed by position
+        self.player_loans_given = {}   # {loan id: PlayerLoan} I lent out — shared with Game.loans
+        self.player_loans_taken = {}   # {loan id: PlayerLoan} I owe
 
         # Distress
         self.distressed = False
@@ -45,100 +143,191 @@ class Player:
         self.defaults = 0           # second default = elimination
         self.eliminated = False
 
+        # Cached figures, refreshed by Game._refresh_figures() when this player is dirty
+        self.portfolio = {}
+        self.portfolio_value = 0
+        self.net_worth = self.balance
+
+    @property
+    def balance(self):
+        return self._balance
+
+    @balance.setter
+    def balance(self, value):
+        self._balance = value
+        self.changed()
+
+    @property
+    def property_value(self):
+        return self._property_value
+
+    @property_value.setter
+    def property_value(self, value):
+        self._property_value = value
+        self.changed()
+
+    def dump(self):
+        """Internal state for journal snapshots (see Game.dump_state)."""
+        return {
+            "name": self.name,
+            "color": self.color,
+            "balance": self.balance,
+            "properties": street_catalog.in_order(self.properties),
+            "houses": dict(self.houses),
+            "property_value": self.property_value,
+            "shares_issued": self.shares_issued,
+            "shareholders": dict(self.shareholders),
+            "bank_loans": [l.to_dict() for l in self.bank_loans],
+            "distressed": self.distressed,
+            "distress_rounds_left": self.distress_rounds_left,
+            "defaults": self.defaults,
+            "eliminated": self.eliminated,
+        }
+
+    @classmethod
+    def load(cls, d):
+        player = cls(d["name"], d["color"])
+        player.balance = d["balance"]
+        player.properties = set(d["properties"])
+        player.houses = dict(d["houses"])
+        player.property_value = d["property_value"]
+        player.shares_issued = d["shares_issued"]
+        player.shareholders = dict(d["shareholders"])
+        player.bank_loans = [BankLoan.from_dict(l) for l in d["bank_loans"]]
+        player.distressed = d["distressed"]
+        player.distress_rounds_left = d["distress_rounds_left"]
+        player.defaults = d["defaults"]
+        player.eliminated = d["eliminated"]
+        return player
+
+    def changed(self):
+        """Flag cached figures (mine and my shareholders') as stale."""
+        self.version += 1
+        if self._on_change:
+            self._on_change(self)
+
     @property
     def share_price(self):
-        max_shares = S["player"]["max_shares"]
-        base = self.property_value + self.balance * 0.1
-        if base <= 0:
-            return 0
-        return base / max_shares
+        return valuation.share_price(self)
 
     @property
     def total_debt(self):
-        bank = sum(l["remaining"] for l in self.bank_loans)
-        player = sum(l["remaining"] for l in self.player_loans_taken)
+        bank = sum(l.remaining for l in self.bank_loans)
+        player = sum(l.remaining for l in self.player_loans_taken.values())
         return bank + player
 
-    def portfolio_value(self, all_players):
-        """Value of shares this player holds in OTHER players."""
-        total = 0
-        for other in all_players:
-            if other.name == self.name or other.eliminated:
-                continue
-            held = other.shareholders.get(self.name, 0)
-            total += held * other.share_price
-        return total
-
-    def get_portfolio(self, all_players):
-        """Dict of {player_name: {count, value, price}} for shares held in others."""
-        portfolio = {}
-        for other in all_players:
-            if other.name == self.name:
-                continue
-            held = other.shareholders.get(self.name, 0)
-            if held > 0:
-                portfolio[other.name] = {
-                    "count": held,
-                    "price": round(other.share_price, 2),
-                    "value": round(held * other.share_price, 2),
-                }
-        return portfolio
-
-    def net_worth_full(self, all_players):
-        """Balance + property value + portfolio value - debt."""
-        return self.balance + self.property_value + self.portfolio_value(all_players) - self.total_debt
-
     def color_groups(self):
         """Returns dict of {color_group: info} for groups where player owns at least 1 street."""
+        owned_by_group = {}
+        for s in self.properties:
+            street = street_catalog.get(s)
+            if street:
+                owned_by_group.setdefault(street.group, []).append(street)
         groups = {}
-        for group_name, streets in config.streets.items():
-            owned = [s for s in streets if s in self.properties]
+        for group_name, streets in street_catalog.GROUPS.items():
+            owned = owned_by_group.get(group_name)
             if owned:
                 groups[group_name] = {
-                    "owned": owned,
+                    "owned": [s.name for s in sorted(owned, key=lambda s: s.order)],
                     "total": len(streets),
                     "complete": len(owned) == len(streets),
                 }
         return groups
 
-    def to_dict(self, all_players=None):
-        all_p = all_players or []
-        portfolio = self.get_portfolio(all_p) if all_p else {}
-        nw = self.net_worth_full(all_p) if all_p else (self.balance + self.property_value - self.total_debt)
+    def to_dict(self, insurance_policies=()):
+        """Reads cached figures — call Game._refresh_figures() first."""
         return {
             "name": self.name,
             "color": self.color,
             "balance": self.balance,
-            "properties": self.properties,
+            "properties": street_catalog.in_order(self.properties),
+            "houses": dict(self.houses),
             "property_value": self.property_value,
             "color_groups": self.color_groups(),
             "shares_issued": self.shares_issued,
             "max_shares": S["player"]["max_shares"],
-            "shareholders": self.shareholders,
+            "shareholders": dict(self.shareholders),
             "share_price": round(self.share_price, 2),
-            "portfolio": portfolio,
-            "portfolio_value": round(self.portfolio_value(all_p), 2) if all_p else 0,
-            "bank_loans": self.bank_loans,
-            "player_loans_taken": self.player_loans_taken,
-            "player_loans_given": self.player_loans_given,
-            "insurance_policies": self.insurance_policies,
+            "portfolio": dict(self.portfolio),
+            "portfolio_value": round(self.portfolio_value, 2),
+            "bank_loans": [l.to_dict() for l in self.bank_loans],
+            "player_loans_taken": [l.to_dict() for l in self.player_loans_taken.values()],
+            "player_loans_given": [l.to_dict() for l in self.player_loans_given.values()],
+            "insurance_policies": list(insurance_policies),
             "total_debt": self.total_debt,
-            "net_worth": round(nw, 2),
+            "debt_projection": loan_projection.total(self, S["projection"]["rounds"]),
+            "net_worth": round(self.net_worth, 2),
             "distressed": self.distressed,
             "distress_rounds_left": self.distress_rounds_left,
             "defaults": self.defaults,
             "eliminated": self.eliminated,
-            "insolvent": nw < 0,
+            "insolvent": self.net_worth < 0,
+        }
+
+
+class BankLoan:
+    __slots__ = ("amount", "remaining", "interest_rate", "taken_round", "restructured")
+
+    def __init__(self, amount, remaining, interest_rate, taken_round, restructured=False):
+        self.amount = amount            # cap basis: interest stops at 2x
+        self.remaining = remaining
+        self.interest_rate = interest_rate
+        self.taken_round = taken_round
+        self.restructured = restructured
+
+    def to_dict(self):
+        return {
+            "amount": self.amount,
+            "remaining": self.remaining,
+            "interest_rate": self.interest_rate,
+            "taken_round": self.taken_round,
+            "restructured": self.restructured,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["amount"], d["remaining"], d["interest_rate"], d["taken_round"], d["restructured"])
+
+
+class PlayerLoan:
+    """A loan between two players, shared by Game.loans and both players' loan maps."""
+    __slots__ = ("id", "lender", "borrower", "amount", "remaining", "interest_rate", "taken_round")
+
+    def __init__(self, loan_id, lender, borrower, amount, remaining, interest_rate, taken_round):
+        self.id = loan_id
+        self.lender = lender            # player name
+        self.borrower = borrower        # player name
+        self.amount = amount
+        self.remaining = remaining
+        self.interest_rate = interest_rate
+        self.taken_round = taken_round
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "amount": self.amount,
+            "remaining": self.remaining,
+            "interest_rate": self.interest_rate,
+            "taken_round": self.taken_round,
+            "from": self.lender,
+            "to": self.borrower,
         }
 
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["id"], d["from"], d["to"], d["amount"], d["remaining"],
+                   d["interest_rate"], d["taken_round"])
+
 
 class InsuranceContract:
     """A contract between two players."""
-    _next_id = 0
+    __slots__ = (
+        "id", "insurer", "insured", "premium_per_round", "coverage_cap",
+        "coverage_used", "active", "missed_payments",
+    )
 
-    def __init__(self, insurer, insured, premium_per_round, coverage_cap):
-        InsuranceContract._next_id += 1
-        self.id = InsuranceContract._next_id
+    def __init__(self, contract_id, insurer, insured, premium_per_round, coverage_cap):
+        self.id = contract_id
         self.insurer = insurer          # player name
         self.insured = insured          # player name
         self.premium_per_round = premium_per_round
@@ -160,21 +349,122 @@ class InsuranceContract:
             "missed_payments": self.missed_payments,
         }
 
+    @classmethod
+    def from_dict(cls, d):
+        contract = cls(d["id"], d["insurer"], d["insured"], d["premium_per_round"], d["coverage_cap"])
+        contract.coverage_used = d["coverage_used"]
+        contract.active = d["active"]
+        contract.missed_payments = d["missed_payments"]
+        return contract
+
+
+class InsuranceBook:
+    """Contracts by id, with insured / insurer indexes over the active ones.
+
+    Deactivated contracts move to `archive` and drop out of the indexes, so
+    lookups cost the active contracts of one player, not the whole history.
+    Iterating the book yields active contracts in creation order.
+    """
+
+    def __init__(self):
+        self._active = {}       # {id: contract}
+        self._by_insured = {}   # {name: {id: contract}}
+        self._by_insurer = {}   # {name: {id: contract}}
+        self.archive = []       # inactive contracts, in order of deactivation
+        self.revision = 0       # bumped whenever the active contracts change
+
+    def __iter__(self):
+        return iter(list(self._active.values()))
+
+    def __len__(self):
+        return len(self._active)
+
+    def add(self, contract):
+        if not contract.active:
+            self.archive.append(contract)
+            return
+        self.revision += 1
+        self._active[contract.id] = contract
+        self._by_insured.setdefault(contract.insured, {})[contract.id] = contract
+        self._by_insurer.setdefault(contract.insurer, {})[contract.id] = contract
+
+    def get(self, contract_id):
+        """Active contract with this id, or None."""
+        return self._active.get(contract_id)
+
+    def for_insured(self, name):
+        return list(self._by_insured.get(name, {}).values())
+
+    def for_insurer(self, name):
+        return list(self._by_insurer.get(name, {}).values())
+
+    def deactivate(self, contract):
+        contract.active = False
+        if self._active.pop(contract.id, None) is None:
+            return
+        self.revision += 1
+        for index, name in ((self._by_insured, contract.insured), (self._by_insurer, contract.insurer)):
+            bucket = index[name]
+            del bucket[contract.id]
+            if not bucket:
+                del index[name]
+        self.archive.append(contract)
+
+    def all(self):
+        """Every contract ever made, by id."""
+        return sorted([*self._active.values(), *self.archive], key=lambda c: c.id)
+
 
 class Game:
     PLAYER_COLORS = ["#e74c3c", "#3498db", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c"]
 
+    # Top-level to_dict() keys that are sent whole in a patch when they change
+    PATCH_KEYS = (
+        "insurance_contracts", "current_round", "started", "claimed_players",
+        "leaderboard", "auction_pool", "winner", "exchange",
+    )
+
     def __init__(self):
         self.players = []
-        self.names = []
-        self.insurance_contracts = []
+        self._by_name = {}      # {name: Player} — index for get_player
+        self.street_owner = {}  # {street: owner name} — single source of truth for ownership
+        self._dirty = set()     # names whose portfolio / net worth must be recomputed
+        self._leaderboard = []
+        self.insurance = InsuranceBook()
+        self.stockmarket = Stockmarket()   # limit order book for shares
+        self.market_table = None   # market_engine.Table: columns kept between columnar market rounds
         self.current_round = 0
         self.started = False
-        self.log = []
+        self.log = GameLog(S["history"]["recent"], S["history"]["chunk_size"])
         self.claimed_players = set()
+        self.loans = {}         # {loan id: PlayerLoan} — ledger of open player-to-player loans
         self._next_loan_id = 0
+        self._next_contract_id = 0
         self.auction_pool = []  # properties from eliminated players
-        self.transactions = []  # structured history: [{round, type, player, amount, counterparty, detail}]
+        # structured history: [{round, type, player, amount, counterparty, detail}]
+        self.transactions = GameLog(S["history"]["recent"], S["history"]["chunk_size"])
+
+        # Versioning: every successful mutation bumps version; clients get patches
+        self.version = 0
+        self._published = None          # last to_dict() sent out as a patch
+        self._published_version = 0
+        self._published_log = 0         # log sequence number at last publish
+        self._published_tx = 0          # transactions sequence number at last publish
+        self._snapshot_cache = None     # (version, to_dict()) — built once per version
+        self._json_cache = None         # (version, json text) — encoded once per version
+        self._risk_cache = None         # (inputs, forecast) — the last forecast_risk, reused for the same figures
+
+        # Persistence: set by the app; every outermost mutation is appended to it
+        self.journal = None
+        self._mutation_depth = 0
+        # Writers (mutations, cache rebuilds, publishing) take this; cached reads don't
+        self.lock = FairLock()
+
+    def _log(self, event_type, **fields):
+        """Append a structured log record (rendered to text only when sent out)."""
+        record = log_events.event(event_type, self.current_round, **fields)
+        self.log.append(record)
+        return record
 
     def _record(self, tx_type, player, amount=0, counterparty=None, detail=""):
         self.transactions.append({
@@ -186,20 +476,51 @@ class Game:
             "detail": detail,
         })
 
+    @mutation
     def add_player(self, name):
-        if name in self.names or len(self.players) >= 6:
-            return False
+        if name in self._by_name or len(self.players) >= 6:
+            return False, "Name taken or max players reached."
         color = self.PLAYER_COLORS[len(self.players)]
-        self.players.append(Player(name, color))
-        self.names.append(name)
-        return True
+        self._attach_player(Player(name, color))
+        return True, f"{name} joined."
 
-    def get_player(self, name):
-        for p in self.players:
-            if p.name == name:
-                return p
-        return None
+    def _attach_player(self, player):
+        player._on_change = self._mark_dirty
+        self.players.append(player)
+        self._by_name[player.name] = player
+        self._mark_dirty(player)
 
+    def get_player(self, name):
+        return self._by_name.get(name)
+
+    @mutation
+    def start(self):
+        if self.started:
+            return False, "Spelet har redan startat."
+        if len(self.players) < 2:
+            return False, "Need at least 2 players."
+        self.started = True
+        self._log("game_started")
+        return True, "Game started."
+
+    @mutation
+    def claim_player(self, name):
+        """A device takes control of a player."""
+        if not self.get_player(name):
+            return False, "Spelaren finns inte."
+        if name in self.claimed_players:
+            return False, "Spelaren ar redan tagen."
+        self.claimed_players.add(name)
+        return True, f"{name} claimed."
+
+    @mutation
+    def unclaim_player(self, name):
+        if name not in self.claimed_players:
+            return False, "Spelaren ar inte tagen."
+        self.claimed_players.discard(name)
+        return True, f"{name} released."
+
+    @mutation
     def buy_from_auction(self, buyer_name, street_name, bid):
         """Buy a property from the auction pool at agreed price."""
         buyer = self.get_player(buyer_name)
@@ -212,93 +533,203 @@ class Game:
         if buyer.balance < bid:
             return False, f"Not enough money. Have {buyer.balance}kr."
 
-        # Find real price for property_value tracking
-        real_price = 0
-        for group in config.streets.values():
-            if street_name in group:
-                real_price = group[street_name]["Pris"]
-                break
+        real_price = street_catalog.price(street_name)
 
         buyer.balance -= bid
         self.auction_pool.remove(street_name)
-        buyer.properties.append(street_name)
-        buyer.property_value += real_price
+        self._give_street(buyer, street_name)
 
-        self.log.append(f"{buyer_name} bought {street_name} from auction for {bid}kr (value: {real_price}kr).")
+        self._log("auction_buy", player=buyer_name, street=street_name, amount=bid, value=real_price)
         return True, f"Bought {street_name} for {bid}kr."
 
     # ── Properties (reported from physical board) ─────────────────────
 
+    def _give_street(self, player, street_name):
+        self.street_owner[street_name] = player.name
+        player.properties.add(street_name)
+        player.property_value += street_catalog.price(street_name)
+
+    def _take_street(self, player, street_name):
+        """Street leaves player; any houses on it go back to the bank."""
+        street = street_catalog.get(street_name)
+        del self.street_owner[street_name]
+        player.properties.discard(street_name)
+        houses = player.houses.pop(street_name, 0)
+        player.property_value -= street.price + houses * (street.house_price or 0)
+
+    def _group_has_houses(self, player, street_name):
+        group = street_catalog.GROUPS[street_catalog.group_of(street_name)]
+        return any(player.houses.get(s) for s in group)
+
+    @mutation
     def add_property(self, player_name, street_name):
         """Player tells us they bought a property on the physical board."""
         player = self.get_player(player_name)
         if not player or player.eliminated:
             return False, "Invalid player."
-        if street_name in player.properties:
-            return False, "Already owns this property."
-
-        # Find property price in config
-        price = None
-        for group in config.streets.values():
-            if street_name in group:
-                price = group[street_name]["Pris"]
-                break
-        if price is None:
+        street = street_catalog.get(street_name)
+        if street is None:
             return False, "Property not found."
+        owner = self.street_owner.get(street_name)
+        if owner == player_name:
+            return False, "Already owns this property."
+        if owner is not None:
+            return False, f"{street_name} is already owned by {owner}."
+        if street_name in self.auction_pool:
+            return False, f"{street_name} is up for auction."
+        price = street.price
 
-        player.properties.append(street_name)
-        player.property_value += price
+        self._give_street(player, street_name)
 
-        self.log.append(f"{player_name} registered {street_name} ({price}kr).")
+        self._log("property_added", player=player_name, street=street_name, amount=price)
         return True, f"Registered {street_name}. Share price now {player.share_price:.0f}kr."
 
+    @mutation
     def remove_property(self, player_name, street_name):
         """Player sold/lost a property."""
         player = self.get_player(player_name)
-        if not player or street_name not in player.properties:
+        if not player or self.street_owner.get(street_name) != player_name:
             return False, "Property not found."
-
-        price = 0
-        for group in config.streets.values():
-            if street_name in group:
-                price = group[street_name]["Pris"]
-                break
+        if self._group_has_houses(player, street_name):
+            return False, f"Sell the houses in {street_catalog.group_of(street_name)} first."
 
         old_price = player.share_price
-        player.properties.remove(street_name)
-        player.property_value -= price
+        self._take_street(player, street_name)
         new_price = player.share_price
 
-        self.log.append(f"{player_name} removed {street_name}.")
+        self._log("property_removed", player=player_name, street=street_name)
         if player.shares_issued > 0 and new_price < old_price * 0.7:
-            self.log.append(
-                f"  ALERT: {player_name}'s share price dropped {old_price:.0f} -> {new_price:.0f}kr!"
-            )
+            self._log("share_price_alert", player=player_name, old=old_price, new=new_price)
         return True, f"Removed {street_name}. Share price: {new_price:.0f}kr."
 
+    @mutation
     def transfer_property(self, from_name, to_name, street_name):
         from_p = self.get_player(from_name)
         to_p = self.get_player(to_name)
         if not from_p or not to_p:
             return False, "Invalid player."
-        if street_name not in from_p.properties:
+        if self.street_owner.get(street_name) != from_name:
             return False, f"{from_name} doesn't own {street_name}."
-        price = 0
-        for group in config.streets.values():
-            if street_name in group:
-                price = group[street_name]["Pris"]
-                break
-        from_p.properties.remove(street_name)
-        from_p.property_value -= price
-        to_p.properties.append(street_name)
-        to_p.property_value += price
-        self.log.append(f"{from_name} transferred {street_name} to {to_name}.")
+        if self._group_has_houses(from_p, street_name):
+            return False, f"Sell the houses in {street_catalog.group_of(street_name)} first."
+        price = street_catalog.price(street_name)
+        self._take_street(from_p, street_name)
+        self._give_street(to_p, street_name)
+        self._log("property_transferred", player=from_name, street=street_name, other=to_name)
         return True, f"Transferred {street_name} ({price}kr)."
 
+    # ── Houses & Rent ─────────────────────────────────────────────────
+    # Houses need the whole colour group and are built and sold evenly
+    # across it. Rent comes from rent.py's compiled tables.
+
+    def _owned_in_group(self, owner_name, street):
+        return sum(1 for s in street_catalog.GROUPS[street.group] if self.street_owner.get(s) == owner_name)
+
+    def rent_due(self, street_name, dice_total=0):
+        """Rent for landing on street_name right now (0 if nobody owns it)."""
+        owner_name = self.street_owner.get(street_name)
+        if owner_name is None:
+            return 0
+        street = street_catalog.get(street_name)
+        houses = self._by_name[owner_name].houses.get(street_name, 0)
+        return rent.rent(street.order, self._owned_in_group(owner_name, street), houses, dice_total)
+
+    @mutation
+    def charge_rent(self, payer_name, street_name, dice_total=0):
+        """payer landed on street_name: pays the owner the rent the tables give.
+        Insurance, dividends and the distress penalty apply as for manual rent."""
+        payer = self.get_player(payer_name)
+        if not payer or payer.eliminated:
+            return False, "Invalid player."
+        street = street_catalog.get(street_name)
+        if street is None:
+            return False, "Property not found."
+        owner_name = self.street_owner.get(street_name)
+        if owner_name is None:
+            return False, f"Nobody owns {street_name}."
+        if owner_name == payer_name:
+            return False, f"{payer_name} owns {street_name}."
+        if rent.KIND[street.order] == rent.UTILITY and not 2 <= dice_total <= 12:
+            return False, "Utility rent needs the dice total (2-12)."
+
+        amount = self.rent_due(street_name, dice_total)
+        self.pay_rent_with_insurance(payer_name, amount)
+        self.collect_rent(owner_name, amount)
+        return True, f"{payer_name} paid {amount}kr rent to {owner_name} for {street_name}."
+
+    @mutation
+    def build_house(self, player_name, street_name):
+        player = self.get_player(player_name)
+        if not player or player.eliminated:
+            return False, "Invalid player."
+        street = street_catalog.get(street_name)
+        if street is None or self.street_owner.get(street_name) != player_name:
+            return False, f"{player_name} doesn't own {street_name}."
+        if street.house_price is None:
+            return False, f"Houses can't be built on {street_name}."
+        if player.distressed:
+            return False, "Cannot build while distressed."
+        group = street_catalog.GROUPS[street.group]
+        if self._owned_in_group(player_name, street) < len(group):
+            return False, f"Own all of {street.group} first."
+        houses = player.houses.get(street_name, 0)
+        if houses >= 5:
+            return False, f"{street_name} already has a hotel."
+        if houses > min(player.houses.get(s, 0) for s in group):
+            return False, f"Build evenly across {street.group}."
+        if player.balance < street.house_price:
+            return False, f"Not enough money. A house costs {street.house_price}kr."
+
+        player.houses[street_name] = houses + 1
+        player.balance -= street.house_price
+        player.property_value += street.house_price
+        self._log("house_built", player=player_name, street=street_name, count=houses + 1, amount=street.house_price)
+        return True, f"Built on {street_name} ({houses + 1}/5)."
+
+    @mutation
+    def sell_house(self, player_name, street_name):
+        """Sell one house back to the bank at half its price."""
+        player = self.get_player(player_name)
+        if not player:
+            return False, "Invalid player."
+        houses = player.houses.get(street_name, 0)
+        if houses <= 0:
+            return False, f"No houses on {street_name}."
+        street = street_catalog.get(street_name)
+        if houses < max(player.houses.get(s, 0) for s in street_catalog.GROUPS[street.group]):
+            return False, f"Sell evenly across {street.group}."
+
+        refund = street.house_price // 2
+        if houses == 1:
+            del player.houses[street_name]
+        else:
+            player.houses[street_name] = houses - 1
+        player.balance += refund
+        player.property_value -= street.house_price
+        self._log("house_sold", player=player_name, street=street_name, count=houses - 1, amount=refund)
+        return True, f"Sold a house on {street_name} for {refund}kr."
+
     # ── Shares ────────────────────────────────────────────────────────
     # Each player can issue up to 4 shares. Buying a share = investing
     # in that player. Shareholders get 15% of rent per share held.
 
+    def _add_shares(self, company, holder, count=1):
+        company.shareholders[holder.name] = company.shareholders.get(holder.name, 0) + count
+        holder.holdings[company.name] = holder.holdings.get(company.name, 0) + count
+        self._mark_dirty(holder)
+
+    def _remove_shares(self, company, holder_name, count=1):
+        company.shareholders[holder_name] -= count
+        if company.shareholders[holder_name] <= 0:
+            del company.shareholders[holder_name]
+        holder = self.get_player(holder_name)
+        if holder:
+            holder.holdings[company.name] -= count
+            if holder.holdings[company.name] <= 0:
+                del holder.holdings[company.name]
+            self._mark_dirty(holder)
+
+    @mutation
     def issue_share(self, owner_name, buyer_name):
         """Owner issues a new share, buyer pays share_price."""
         owner = self.get_player(owner_name)
@@ -322,15 +753,14 @@ class Game:
         buyer.balance -= price
         owner.balance += price  # owner raises cash by issuing equity
         owner.shares_issued += 1
-        owner.shareholders[buyer_name] = owner.shareholders.get(buyer_name, 0) + 1
+        self._add_shares(owner, buyer)
 
-        self.log.append(
-            f"{buyer_name} bought 1 share in {owner_name} for {price:.0f}kr. "
-            f"({owner.shares_issued}/{S['player']['max_shares']} issued)"
-        )
+        self._log("share_issued", player=buyer_name, other=owner_name, amount=price,
+                  issued=owner.shares_issued, max=S["player"]["max_shares"])
         self._record("share_issue", buyer_name, price, owner_name, f"1 share at {price:.0f}kr")
         return True, f"Bought share in {owner_name} for {price:.0f}kr."
 
+    @mutation
     def transfer_share(self, seller_name, buyer_name, company_name, price):
         """Free trade: seller transfers a share in company_name to buyer at agreed price."""
         seller = self.get_player(seller_name)
@@ -349,16 +779,13 @@ class Game:
 
         buyer.balance -= price
         seller.balance += price
-        company.shareholders[seller_name] -= 1
-        if company.shareholders[seller_name] == 0:
-            del company.shareholders[seller_name]
-        company.shareholders[buyer_name] = company.shareholders.get(buyer_name, 0) + 1
+        self._remove_shares(company, seller_name)
+        self._add_shares(company, buyer)
 
-        self.log.append(
-            f"{seller_name} sold 1 share in {company_name} to {buyer_name} for {price}kr."
-        )
+        self._log("share_sold", player=seller_name, company=company_name, other=buyer_name, amount=price)
         return True, f"Share transferred for {price}kr."
 
+    @mutation
     def buyback_share(self, owner_name, from_holder_name):
         owner = self.get_player(owner_name)
         holder = self.get_player(from_holder_name)
@@ -372,21 +799,113 @@ class Game:
             return False, f"Not enough money. Buyback costs {price:.0f}kr."
         owner.balance -= price
         holder.balance += price
-        owner.shareholders[from_holder_name] -= 1
-        if owner.shareholders[from_holder_name] == 0:
-            del owner.shareholders[from_holder_name]
+        self._remove_shares(owner, from_holder_name)
         owner.shares_issued -= 1
-        self.log.append(
-            f"{owner_name} bought back 1 share from {from_holder_name} for {price:.0f}kr. "
-            f"({owner.shares_issued}/{S['player']['max_shares']} outstanding)"
-        )
+        self._log("share_bought_back", player=owner_name, other=from_holder_name, amount=price,
+                  issued=owner.shares_issued, max=S["player"]["max_shares"])
         return True, f"Bought back share for {price:.0f}kr."
 
+    # ── Share Exchange ────────────────────────────────────────────────
+    # Limit orders for shares already issued, matched by price-time
+    # priority. Orders aren't escrowed: a resting order whose trader can no
+    # longer pay or deliver is dropped when it comes up for a fill.
+
+    @mutation
+    def place_order(self, trader_name, company_name, side, price, quantity=1):
+        trader = self.get_player(trader_name)
+        company = self.get_player(company_name)
+        if not trader or not company:
+            return False, "Invalid player."
+        if trader.eliminated or company.eliminated:
+            return False, "Eliminated player."
+        if trader_name == company_name:
+            return False, "Use buyback for your own shares."
+        if side not in ("buy", "sell"):
+            return False, "Side must be buy or sell."
+        if price <= 0 or quantity <= 0:
+            return False, "Price and quantity must be positive."
+        if side == "buy":
+            if trader.distressed:
+                return False, "Cannot buy shares while distressed."
+            _, committed = self.stockmarket.committed(trader_name, "buy")
+            if trader.balance < committed + price * quantity:
+                return False, f"Not enough money for open bids plus {price * quantity}kr."
+        else:
+            offered, _ = self.stockmarket.committed(trader_name, "sell", company_name)
+            free = trader.holdings.get(company_name, 0) - offered
+            if free < quantity:
+                return False, f"{trader_name} has {max(free, 0)} unoffered share(s) in {company_name}."
+
+        own = self.stockmarket.own_cross(trader_name, company_name, side, price)
+        if own:
+            return False, f"That would trade with your own order #{own.id}."
+
+        order, fills = self.stockmarket.place(
+            trader_name, company_name, side, price, quantity, can_fill=self._can_fill
+        )
+        self._log("order_placed", player=trader_name, side=side, quantity=quantity,
+                  company=company_name, amount=price, order=order.id)
+        for fill in fills:
+            self._settle_trade(fill)
+        filled = quantity - order.remaining
+        if order.remaining:
+            return True, f"Order #{order.id}: {filled} filled, {order.remaining} open at {price}kr."
+        return True, f"Order #{order.id} filled ({filled} share(s))."
+
+    def _can_fill(self, resting, taker, quantity, price):
+        """Whether a resting order can still take part in a fill (else it is dropped)."""
+        player = self.get_player(resting.trader)
+        ok = not player.eliminated
+        if ok and resting.side == "buy":
+            ok = not player.distressed and player.balance >= quantity * price
+        elif ok:
+            ok = player.holdings.get(resting.company, 0) >= quantity
+        if not ok:
+            self._log("order_dropped", player=resting.trader, order=resting.id)
+        return ok
+
+    def _settle_trade(self, fill):
+        buyer = self.get_player(fill["buyer"])
+        seller = self.get_player(fill["seller"])
+        company = self.get_player(fill["company"])
+        total = fill["price"] * fill["quantity"]
+        buyer.balance -= total
+        seller.balance += total
+        self._remove_shares(company, seller.name, fill["quantity"])
+        self._add_shares(company, buyer, fill["quantity"])
+        self._log("share_traded", player=buyer.name, other=seller.name, company=company.name,
+                  quantity=fill["quantity"], amount=fill["price"])
+        self._record("share_trade", buyer.name, total, seller.name,
+                     f"{fill['quantity']} share(s) in {company.name} at {fill['price']}kr")
+
+    @mutation
+    def cancel_order(self, player_name, order_id):
+        order = self.stockmarket.orders.get(order_id)
+        if not order or order.trader != player_name:
+            return False, "No such open order."
+        self.stockmarket.cancel(order_id)
+        self._log("order_cancelled", player=player_name, order=order_id)
+        return True, f"Order #{order_id} cancelled."
+
+    def _exchange_view(self):
+        """Quotes per company (best bid/ask, last trade), open orders and recent trades."""
+        market = self.stockmarket
+        return {
+            "quotes": {
+                c: {"bid": market.best_bid(c), "ask": market.best_ask(c),
+                    "last": market.last_price.get(c), **market.depth(c)}
+                for c in market.companies()
+            },
+            "orders": [o.to_dict() for o in market.orders.values()],
+            "trades": list(market.trades)[-20:],
+        }
+
     # ── Rent & Dividends ──────────────────────────────────────────────
 
+    @mutation
     def collect_rent(self, collector_name, amount):
         """Player reports collecting rent. Auto-distributes dividends to shareholders.
-        If collector is distressed, rent is halved."""
+        If collector is distressed, rent is halved. Returns (True, log record)."""
         collector = self.get_player(collector_name)
         if not collector or collector.eliminated:
             return False, "Invalid player."
@@ -394,7 +913,7 @@ class Game:
         effective = amount
         if collector.distressed:
             effective = int(amount * S["distress"]["rent_penalty"])
-            self.log.append(f"{collector_name} is distressed — rent halved: {effective}kr (was {amount}kr).")
+            self._log("rent_halved", player=collector_name, amount=effective, rent=amount)
 
         # Distribute dividends: 15% per share
         dividend_rate = S["player"]["dividend_per_share"]
@@ -407,61 +926,64 @@ class Game:
                     effective -= dividend
                     total_dividends += dividend
                     holder.balance += dividend
-                    self.log.append(
-                        f"  {holder_name} received {dividend}kr dividend "
-                        f"({count} share{'s' if count > 1 else ''} in {collector_name})."
-                    )
+                    self._log("dividend_many" if count > 1 else "dividend",
+                              player=holder_name, amount=dividend, count=count, other=collector_name)
 
         collector.balance += effective
-        msg = f"{collector_name} collected {amount}kr rent"
         if total_dividends > 0:
-            msg += f" ({total_dividends}kr to shareholders, {effective}kr kept)"
-        msg += "."
-        self.log.append(msg)
-        return True, msg
+            record = self._log("rent_collected_split", player=collector_name, amount=amount,
+                               dividends=total_dividends, kept=effective)
+        else:
+            record = self._log("rent_collected", player=collector_name, amount=amount)
+        return True, record
 
+    @mutation
     def pay_rent_with_insurance(self, player_name, rent_amount):
-        """Convenience: pay rent, auto-claiming from best insurance contract."""
+        """Convenience: pay rent, auto-claiming from best insurance contract.
+        Returns (True, log record)."""
         player = self.get_player(player_name)
         if not player:
             return False, "Invalid player."
 
         covered = 0
-        for c in self.insurance_contracts:
-            if c.insured == player_name and c.active:
-                remaining = c.coverage_cap - c.coverage_used
-                claim = min(rent_amount - covered, remaining)
-                if claim <= 0:
-                    continue
-                insurer = self.get_player(c.insurer)
-                if not insurer or insurer.balance < claim:
-                    continue
-                insurer.balance -= claim
-                player.balance += claim
-                c.coverage_used += claim
-                covered += claim
-                self.log.append(
-                    f"  Insurance #{c.id} covered {claim}kr (paid by {c.insurer})."
-                )
-                if c.coverage_used >= c.coverage_cap:
-                    c.active = False
-                if covered >= rent_amount:
-                    break
+        for c in self.insurance.for_insured(player_name):
+            remaining = c.coverage_cap - c.coverage_used
+            claim = min(rent_amount - covered, remaining)
+            if claim <= 0:
+                continue
+            insurer = self.get_player(c.insurer)
+            if not insurer or insurer.balance < claim:
+                continue
+            insurer.balance -= claim
+            player.balance += claim
+            c.coverage_used += claim
+            covered += claim
+            self._log("insurance_covered", contract=c.id, amount=claim, other=c.insurer)
+            if c.coverage_used >= c.coverage_cap:
+                self.insurance.deactivate(c)
+            if covered >= rent_amount:
+                break
 
         out_of_pocket = rent_amount - covered
         if out_of_pocket > 0:
             player.balance -= out_of_pocket
 
-        self._sync_insurance(player_name)
-        msg = f"{player_name} paid {rent_amount}kr rent"
         if covered > 0:
-            msg += f" ({covered}kr covered by insurance, {out_of_pocket}kr out of pocket)"
-        msg += "."
-        self.log.append(msg)
-        return True, msg
+            record = self._log("rent_paid_insured", player=player_name, amount=rent_amount,
+                               covered=covered, paid=out_of_pocket)
+        else:
+            record = self._log("rent_paid", player=player_name, amount=rent_amount)
+        return True, record
 
     # ── Bank Loans ────────────────────────────────────────────────────
 
+    def _loans_changed(self, player):
+        """player's loans changed: stale figures, and stale rows in the market-round columns."""
+        player.changed()
+        if self.market_table is not None:
+            self.market_table.stale.add(player.name)
+
+    @mutation
     def take_bank_loan(self, player_name, amount):
         player = self.get_player(player_name)
         if not player or player.eliminated:
@@ -474,20 +996,14 @@ class Game:
 
         remaining = int(amount * (1 + cfg["interest_rate"]))
         player.balance += amount
-        player.bank_loans.append({
-            "amount": amount,
-            "remaining": remaining,
-            "interest_rate": cfg["interest_rate"],
-            "taken_round": self.current_round,
-        })
+        player.bank_loans.append(BankLoan(amount, remaining, cfg["interest_rate"], self.current_round))
+        self._loans_changed(player)
 
-        self.log.append(
-            f"{player_name} took a bank loan: {amount}kr "
-            f"(repay {remaining}kr at {cfg['interest_rate']*100:.0f}%)."
-        )
+        self._log("bank_loan", player=player_name, amount=amount, remaining=remaining, rate=cfg["interest_rate"])
         self._record("bank_loan", player_name, amount, "Bank", f"repay {remaining}kr")
         return True, f"Bank loan: {amount}kr (repay {remaining}kr)."
 
+    @mutation
     def repay_bank_loan(self, player_name, loan_index, amount=None):
         """Repay a bank loan. If amount is None, repays in full."""
         player = self.get_player(player_name)
@@ -496,22 +1012,24 @@ class Game:
         if loan_index < 0 or loan_index >= len(player.bank_loans):
             return False, "Invalid loan."
         loan = player.bank_loans[loan_index]
-        pay = amount if amount is not None else loan["remaining"]
-        pay = min(pay, loan["remaining"])
+        pay = amount if amount is not None else loan.remaining
+        pay = min(pay, loan.remaining)
         if pay <= 0:
             return False, "Invalid amount."
         if player.balance < pay:
             return False, f"Not enough money. Have {player.balance}kr."
 
         player.balance -= pay
-        loan["remaining"] -= pay
-        if loan["remaining"] <= 0:
+        loan.remaining -= pay
+        self._loans_changed(player)
+        if loan.remaining <= 0:
             player.bank_loans.pop(loan_index)
-            self.log.append(f"{player_name} fully repaid bank loan: {pay}kr.")
+            self._log("bank_loan_repaid", player=player_name, amount=pay)
         else:
-            self.log.append(f"{player_name} partially repaid bank loan: {pay}kr ({loan['remaining']}kr left).")
+            self._log("bank_loan_partial", player=player_name, amount=pay, remaining=loan.remaining)
         return True, f"Repaid {pay}kr."
 
+    @mutation
     def restructure_bank_loan(self, player_name, loan_index):
         """Restructure: adds 20% to remaining but resets compound clock. Once per loan."""
         player = self.get_player(player_name)
@@ -520,21 +1038,20 @@ class Game:
         if loan_index < 0 or loan_index >= len(player.bank_loans):
             return False, "Invalid loan."
         loan = player.bank_loans[loan_index]
-        if loan.get("restructured"):
+        if loan.restructured:
             return False, "Already restructured once."
 
-        old_remaining = loan["remaining"]
-        loan["remaining"] = int(loan["remaining"] * 1.20)
-        loan["amount"] = loan["remaining"]  # reset cap basis
-        loan["restructured"] = True
-        self.log.append(
-            f"{player_name} restructured bank loan: {old_remaining}kr -> {loan['remaining']}kr "
-            f"(+20%, compound clock reset)."
-        )
-        return True, f"Restructured. New balance: {loan['remaining']}kr."
+        old_remaining = loan.remaining
+        loan.remaining = int(loan.remaining * 1.20)
+        loan.amount = loan.remaining  # reset cap basis
+        loan.restructured = True
+        self._loans_changed(player)
+        self._log("bank_loan_restructured", player=player_name, old=old_remaining, remaining=loan.remaining)
+        return True, f"Restructured. New balance: {loan.remaining}kr."
 
     # ── Player-to-Player Loans ────────────────────────────────────────
 
+    @mutation
     def give_player_loan(self, lender_name, borrower_name, amount, interest_rate):
         """Lender gives borrower a loan at negotiated interest."""
         lender = self.get_player(lender_name)
@@ -556,71 +1073,60 @@ class Game:
         borrower.balance += amount
 
         self._next_loan_id += 1
-        loan_record = {
-            "id": self._next_loan_id,
-            "amount": amount,
-            "remaining": remaining,
-            "interest_rate": interest_rate,
-            "taken_round": self.current_round,
-        }
-
-        # Cross-reference
-        lender.player_loans_given.append({
-            **loan_record, "to": borrower_name
-        })
-        borrower.player_loans_taken.append({
-            **loan_record, "from": lender_name
-        })
+        self._add_loan(PlayerLoan(self._next_loan_id, lender_name, borrower_name, amount, remaining,
+                                  interest_rate, self.current_round))
 
-        self.log.append(
-            f"{lender_name} lent {borrower_name} {amount}kr "
-            f"at {interest_rate}% (repay {remaining}kr)."
-        )
+        self._log("player_loan", player=lender_name, other=borrower_name, amount=amount,
+                  rate=interest_rate, remaining=remaining)
         self._record("player_loan", borrower_name, amount, lender_name, f"{interest_rate}% interest")
         return True, f"Loan given: {amount}kr at {interest_rate}%."
 
-    def repay_player_loan(self, borrower_name, loan_index, amount=None):
+    def _add_loan(self, loan):
+        self.loans[loan.id] = loan
+        self._by_name[loan.lender].player_loans_given[loan.id] = loan
+        self._by_name[loan.borrower].player_loans_taken[loan.id] = loan
+        self._loans_changed(self._by_name[loan.borrower])
+
+    def _drop_loan(self, loan):
+        del self.loans[loan.id]
+        self._by_name[loan.lender].player_loans_given.pop(loan.id, None)
+        self._by_name[loan.borrower].player_loans_taken.pop(loan.id, None)
+        self._loans_changed(self._by_name[loan.borrower])
+
+    @mutation
+    def repay_player_loan(self, borrower_name, loan_id, amount=None):
         """Repay a player loan. If amount is None, repays in full."""
         borrower = self.get_player(borrower_name)
         if not borrower:
             return False, "Invalid player."
-        if loan_index < 0 or loan_index >= len(borrower.player_loans_taken):
+        loan = borrower.player_loans_taken.get(loan_id)
+        if loan is None:
             return False, "Invalid loan."
 
-        loan = borrower.player_loans_taken[loan_index]
-        pay = amount if amount is not None else loan["remaining"]
-        pay = min(pay, loan["remaining"])
+        pay = amount if amount is not None else loan.remaining
+        pay = min(pay, loan.remaining)
         if pay <= 0:
             return False, "Invalid amount."
         if borrower.balance < pay:
             return False, f"Not enough money. Have {borrower.balance}kr."
 
-        lender = self.get_player(loan["from"])
+        lender = self.get_player(loan.lender)
         borrower.balance -= pay
-        if lender:
-            lender.balance += pay
-
-        loan["remaining"] -= pay
-        loan_id = loan.get("id")
-
-        # Sync lender's copy by ID
-        if lender and loan_id:
-            for gl in lender.player_loans_given:
-                if gl.get("id") == loan_id:
-                    gl["remaining"] = loan["remaining"]
-                    break
-
-        if loan["remaining"] <= 0:
-            borrower.player_loans_taken.pop(loan_index)
-            if lender:
-                lender.player_loans_given = [gl for gl in lender.player_loans_given if gl.get("id") != loan_id]
-            self.log.append(f"{borrower_name} fully repaid {loan['from']}: {pay}kr.")
+        lender.balance += pay
+        loan.remaining -= pay
+        self._loans_changed(borrower)
+
+        if loan.remaining <= 0:
+            self._drop_loan(loan)
+            self._log("player_loan_repaid", player=borrower_name, other=loan.lender, amount=pay)
         else:
-            self.log.append(f"{borrower_name} partially repaid {loan['from']}: {pay}kr ({loan['remaining']}kr left).")
-        return True, f"Repaid {pay}kr to {loan['from']}."
+            self._log("player_loan_partial", player=borrower_name, other=loan.lender, amount=pay,
+                      remaining=loan.remaining)
+        return True, f"Repaid {pay}kr to {loan.lender}."
 
     # ── Insurance ─────────────────────────────────────────────────────
 
+    @mutation
     def create_insurance(self, insurer_name, insured_name, premium, coverage_cap):
         """Insurer offers a contract: insured pays premium/round, gets coverage up to cap."""
         insurer = self.get_player(insurer_name)
@@ -632,28 +1138,22 @@ class Game:
         if premium <= 0 or coverage_cap <= 0:
             return False, "Invalid terms."
 
-        contract = InsuranceContract(insurer_name, insured_name, premium, coverage_cap)
-        self.insurance_contracts.append(contract)
-        insured.insurance_policies.append(contract.to_dict())
+        self._next_contract_id += 1
+        contract = InsuranceContract(self._next_contract_id, insurer_name, insured_name, premium, coverage_cap)
+        self.insurance.add(contract)
 
-        self.log.append(
-            f"Insurance: {insurer_name} insures {insured_name} — "
-            f"premium {premium}kr/round, coverage up to {coverage_cap}kr."
-        )
+        self._log("insurance_created", player=insured_name, other=insurer_name, premium=premium, amount=coverage_cap)
         return True, f"Contract created (ID: {contract.id})."
 
+    @mutation
     def claim_insurance(self, insured_name, contract_id, claim_amount):
         """Insured makes a claim against a contract."""
         insured = self.get_player(insured_name)
         if not insured:
             return False, "Invalid player."
 
-        contract = None
-        for c in self.insurance_contracts:
-            if c.id == contract_id and c.insured == insured_name and c.active:
-                contract = c
-                break
-        if not contract:
+        contract = self.insurance.get(contract_id)
+        if not contract or contract.insured != insured_name:
             return False, "No active contract found."
 
         remaining_coverage = contract.coverage_cap - contract.coverage_used
@@ -669,39 +1169,48 @@ class Game:
         insured.balance += payout
         contract.coverage_used += payout
 
-        # Sync to player's policy list
-        self._sync_insurance(insured_name)
-
         if contract.coverage_used >= contract.coverage_cap:
-            contract.active = False
-            self.log.append(f"Insurance #{contract.id} coverage exhausted.")
+            self.insurance.deactivate(contract)
+            self._log("insurance_exhausted", contract=contract.id)
 
-        self.log.append(
-            f"{insured_name} claimed {payout}kr from insurance #{contract.id} "
-            f"(paid by {contract.insurer}). {remaining_coverage - payout}kr coverage left."
-        )
+        self._log("insurance_claimed", player=insured_name, amount=payout, contract=contract.id,
+                  other=contract.insurer, left=remaining_coverage - payout)
         return True, f"Claimed {payout}kr."
 
+    @mutation
     def cancel_insurance(self, player_name, contract_id):
-        for c in self.insurance_contracts:
-            if c.id == contract_id and (c.insurer == player_name or c.insured == player_name) and c.active:
-                c.active = False
-                self._sync_insurance(c.insured)
-                self.log.append(f"Insurance #{contract_id} cancelled by {player_name}.")
-                return True, "Contract cancelled."
-        return False, "Contract not found."
-
-    def _sync_insurance(self, player_name):
-        """Sync insurance_policies on player with contract objects."""
-        player = self.get_player(player_name)
-        if player:
-            player.insurance_policies = [
-                c.to_dict() for c in self.insurance_contracts
-                if c.insured == player_name and c.active
-            ]
+        c = self.insurance.get(contract_id)
+        if not c or player_name not in (c.insurer, c.insured):
+            return False, "Contract not found."
+        self.insurance.deactivate(c)
+        self._log("insurance_cancelled", contract=contract_id, player=player_name)
+        return True, "Contract cancelled."
+
+    @mutation
+    def renegotiate_insurance(self, contract_id, new_premium=None, new_cap=None):
+        """Cancel a contract and replace it with new terms on the remaining coverage."""
+        contract = self.insurance.get(contract_id)
+        if not contract:
+            return False, "Contract not found."
+
+        remaining_coverage = contract.coverage_cap - contract.coverage_used
+        if new_premium is None:
+            new_premium = contract.premium_per_round
+        if new_cap is None:
+            new_cap = remaining_coverage
+        new_cap = min(new_cap, remaining_coverage)  # can't increase beyond remaining
+        if new_premium <= 0 or new_cap <= 0:
+            return False, "Invalid terms."
+
+        self.insurance.deactivate(contract)
+        ok, msg = self.create_insurance(contract.insurer, contract.insured, new_premium, new_cap)
+        if ok:
+            self._log("insurance_renegotiated", contract=contract_id)
+        return ok, msg
 
     # ── Transactions ──────────────────────────────────────────────────
 
+    @mutation
     def transfer_money(self, from_name, to_name, amount):
         sender = self.get_player(from_name)
         receiver = self.get_player(to_name)
@@ -714,9 +1223,10 @@ class Game:
 
         sender.balance -= amount
         receiver.balance += amount
-        self.log.append(f"{from_name} paid {to_name} {amount}kr.")
+        self._log("money_transferred", player=from_name, other=to_name, amount=amount)
         return True, f"Transferred {amount}kr."
 
+    @mutation
     def adjust_balance(self, player_name, amount):
         """For board events: rent paid, taxes, passing Start, etc."""
         player = self.get_player(player_name)
@@ -724,13 +1234,14 @@ class Game:
             return False, "Invalid player."
         player.balance += amount
         if amount >= 0:
-            self.log.append(f"{player_name} received {amount}kr.")
+            self._log("balance_received", player=player_name, amount=amount)
         else:
-            self.log.append(f"{player_name} paid {abs(amount)}kr.")
+            self._log("balance_paid", player=player_name, amount=-amount)
         return True, f"Balance adjusted by {amount:+}kr."
 
     # ── Distress & Default ────────────────────────────────────────────
 
+    @mutation
     def enter_distress(self, player_name):
         """Player can't pay rent — enters distressed status."""
         player = self.get_player(player_name)
@@ -743,73 +1254,64 @@ class Game:
         if player.defaults >= 2:
             player.eliminated = True
             player.distressed = False
-            self.log.append(f"{player_name} defaulted a second time — ELIMINATED!")
+            player.changed()
+            self._log("eliminated", player=player_name)
             self._handle_elimination(player)
             winner = self.check_winner()
             if winner:
-                self.log.append(f"── {winner} WINS THE GAME! ──")
+                self._log("winner", player=winner)
             return True, f"{player_name} eliminated!"
         else:
             player.distressed = True
             player.distress_rounds_left = S["distress"]["duration_rounds"]
-            self.log.append(
-                f"{player_name} defaulted — enters DISTRESSED status for "
-                f"{S['distress']['duration_rounds']} rounds (rent income halved). "
-                f"A second default means elimination."
-            )
+            player.changed()
+            self._log("distressed", player=player_name, rounds=S["distress"]["duration_rounds"])
             return True, f"{player_name} is now distressed."
 
     def _handle_elimination(self, player):
         name = player.name
         # Void insurance
-        for c in self.insurance_contracts:
-            if c.insurer == name or c.insured == name:
-                c.active = False
+        for c in self.insurance.for_insured(name) + self.insurance.for_insurer(name):
+            self.insurance.deactivate(c)
+        # Open orders by or for the eliminated player are withdrawn
+        self.stockmarket.cancel_all(trader=name)
+        self.stockmarket.cancel_all(company=name)
         # Shares others hold in eliminated player become worthless
         if player.shareholders:
             for holder_name, count in list(player.shareholders.items()):
-                self.log.append(f"  {holder_name}'s {count} share(s) in {name} are now worthless.")
-            player.shareholders.clear()
+                self._log("shares_worthless", player=name, other=holder_name, count=count)
+                self._remove_shares(player, holder_name, count)
             player.shares_issued = 0
         # Shares eliminated player holds in others — shareholder slot freed
-        for other in self.players:
-            if other.name == name:
-                continue
-            held = other.shareholders.pop(name, 0)
-            if held > 0:
-                self.log.append(f"  {name}'s {held} share(s) in {other.name} voided (slots now available).")
+        # (in seating order, as before: holdings' insertion order would reorder the log)
+        for company in [p for p in self.players if p.name in player.holdings]:
+            held = player.holdings[company.name]
+            self._remove_shares(company, name, held)
+            self._log("shares_voided", player=name, other=company.name, count=held)
         # Player loans FROM eliminated = forgiven
-        for loan in player.player_loans_given:
-            borrower = self.get_player(loan["to"])
-            if borrower:
-                borrower.player_loans_taken = [l for l in borrower.player_loans_taken if l["from"] != name]
-                self.log.append(f"  {loan['to']}'s loan from {name} ({loan['remaining']}kr) forgiven.")
-        player.player_loans_given.clear()
+        for loan in list(player.player_loans_given.values()):
+            self._drop_loan(loan)
+            self._log("loan_forgiven", player=name, other=loan.borrower, amount=loan.remaining)
         # Player loans TO eliminated = lenders lose out
-        for loan in player.player_loans_taken:
-            lender = self.get_player(loan["from"])
-            if lender:
-                lender.player_loans_given = [gl for gl in lender.player_loans_given if gl["to"] != name]
-                self.log.append(f"  {loan['from']} lost {loan['remaining']}kr lent to {name}.")
-        player.player_loans_taken.clear()
+        for loan in list(player.player_loans_taken.values()):
+            self._drop_loan(loan)
+            self._log("loan_lost", player=name, other=loan.lender, amount=loan.remaining)
         # Bank loans written off
         if player.bank_loans:
-            total = sum(l["remaining"] for l in player.bank_loans)
-            self.log.append(f"  Bank wrote off {total}kr in loans to {name}.")
+            total = sum(l.remaining for l in player.bank_loans)
+            self._log("bank_write_off", player=name, amount=total)
             player.bank_loans.clear()
+            self._loans_changed(player)
 
         # Properties go to auction pool
         if player.properties:
-            props = list(player.properties)
-            player.properties.clear()
-            player.property_value = 0
+            props = street_catalog.in_order(player.properties)
+            for s in props:
+                self._take_street(player, s)
             if not hasattr(self, 'auction_pool'):
                 self.auction_pool = []
             self.auction_pool.extend(props)
-            self.log.append(f"  {name}'s properties ({', '.join(props)}) available for auction.")
-
-        for p in self.players:
-            self._sync_insurance(p.name)
+            self._log("properties_to_auction", player=name, streets=props)
 
     def active_player_count(self):
         return sum(1 for p in self.players if not p.eliminated)
@@ -820,13 +1322,79 @@ class Game:
             return active[0].name
         return None
 
+    def project_debt(self, player_name, rounds):
+        """Per-loan and total debt over the next `rounds` market rounds, if nothing else happens."""
+        player = self.get_player(player_name)
+        if not player or player.eliminated:
+            return False, "Invalid player."
+        if not 1 <= rounds <= S["projection"]["max_rounds"]:
+            return False, f"Rounds must be 1-{S['projection']['max_rounds']}."
+        return True, loan_projection.project(player, rounds)
+
+    def forecast_risk(self, rounds, loan=None, contract=None):
+        """Each active player's chance of defaulting, being eliminated and going
+        insolvent within `rounds` market rounds (see risk.py).
+
+        loan=(lender, borrower, amount, rate) or contract=(insurer, insured,
+        premium, coverage_cap) forecasts as if that deal were signed.
+
+        Only reading the figures takes the lock; the Monte Carlo runs outside
+        it, and is skipped when the figures are those of the last call.
+        """
+        if not risk.available():
+            return False, "Risk forecasts need numpy."
+        if not 1 <= rounds <= S["projection"]["max_rounds"]:
+            return False, f"Rounds must be 1-{S['projection']['max_rounds']}."
+        with self.lock:
+            self._refresh_figures()
+            table = risk.Table(self)
+            for deal in (loan, contract):
+                if deal and (deal[0] not in table.index or deal[1] not in table.index or deal[0] == deal[1]):
+                    return False, "Invalid players."
+                if deal and (deal[2] <= 0 or deal[3] < 0):
+                    return False, "Invalid terms."
+            if loan:
+                if self.get_player(loan[0]).balance < loan[2]:
+                    return False, f"{loan[0]} doesn't have {loan[2]}kr."
+                table.lend(*loan)
+            if contract:
+                table.insure(*contract)
+        key = (rounds, S["risk"]["paths"], S["risk"]["seed"], table.key())
+        cache = self._risk_cache
+        if cache is not None and cache[0] == key:
+            return True, cache[1]
+        forecast = risk.forecast(table, rounds)
+        self._risk_cache = (key, forecast)
+        return True, forecast
+
     # ── Market Round (triggered when someone passes Go) ───────────────
 
+    @mutation
     def market_round(self):
         """Process per-round financials: insurance premiums, distress countdown, loan interest."""
         self.current_round += 1
-        messages = []
+        events = []
+
+        def note(event_type, **fields):
+            events.append(log_events.event(event_type, self.current_round, **fields))
+
+        cfg = S["market"]
+        columnar = cfg["engine"] == "columnar" or (
+            cfg["engine"] == "auto" and market_engine.table_rows(self) >= cfg["columnar_min_rows"]
+        )
+        if not (columnar and market_engine.available() and market_engine.run(self, events)):
+            self._market_round_loop(note)
 
+        # Round summary
+        total_interest = sum(1 for e in events if e["e"] in log_events.INTEREST_EVENTS)
+        total_premiums = sum(1 for e in events if e["e"] in log_events.PREMIUM_EVENTS)
+        for e in events:
+            self.log.append(e)
+        self._log("market_round", interest=total_interest, premiums=total_premiums)
+        return events
+
+    def _market_round_loop(self, note):
+        """Per-player market round; market_engine.run is the columnar equivalent."""
         # 0) Process distress countdowns first
         for player in self.players:
             if player.eliminated or not player.distressed:
@@ -834,151 +1402,302 @@ class Game:
             player.distress_rounds_left -= 1
             if player.distress_rounds_left <= 0:
                 player.distressed = False
-                messages.append(f"{player.name} recovered from distressed status!")
+                player.changed()
+                note("distress_recovered", player=player.name)
             else:
-                messages.append(
-                    f"{player.name} still distressed ({player.distress_rounds_left} rounds left)."
-                )
+                note("distress_continues", player=player.name, rounds=player.distress_rounds_left)
 
         for player in self.players:
             if player.eliminated:
                 continue
 
             # 1) Insurance premiums (skipped if distressed, 1 grace period for missed payment)
-            for c in self.insurance_contracts:
-                if c.insured == player.name and c.active:
-                    if player.distressed:
-                        messages.append(f"{player.name} is distressed — insurance #{c.id} premium deferred.")
-                        continue
-                    if player.balance >= c.premium_per_round:
-                        player.balance -= c.premium_per_round
-                        insurer = self.get_player(c.insurer)
-                        if insurer:
-                            insurer.balance += c.premium_per_round
-                        c.missed_payments = 0
-                        messages.append(
-                            f"{player.name} paid {c.premium_per_round}kr premium to {c.insurer}."
-                        )
+            for c in self.insurance.for_insured(player.name):
+                if player.distressed:
+                    note("premium_deferred", player=player.name, contract=c.id)
+                    continue
+                if player.balance >= c.premium_per_round:
+                    player.balance -= c.premium_per_round
+                    insurer = self.get_player(c.insurer)
+                    if insurer:
+                        insurer.balance += c.premium_per_round
+                    c.missed_payments = 0
+                    note("premium_paid", player=player.name, amount=c.premium_per_round, other=c.insurer)
+                else:
+                    c.missed_payments += 1
+                    if c.missed_payments >= 2:
+                        self.insurance.deactivate(c)
+                        note("premium_lapsed", player=player.name, contract=c.id)
                     else:
-                        c.missed_payments += 1
-                        if c.missed_payments >= 2:
-                            c.active = False
-                            messages.append(
-                                f"{player.name} missed 2 premiums — insurance #{c.id} LAPSED!"
-                            )
-                        else:
-                            messages.append(
-                                f"WARNING: {player.name} missed premium for #{c.id} "
-                                f"(1 grace round — pay next round or it lapses)."
-                            )
+                        note("premium_missed", player=player.name, contract=c.id)
 
             # 2) Bank loan interest compounds (skip if distressed, cap at 2x)
             if not player.distressed:
                 for loan in player.bank_loans:
-                    cap = loan["amount"] * 2
-                    if loan["remaining"] >= cap:
+                    cap = loan.amount * 2
+                    if loan.remaining >= cap:
                         continue  # capped
-                    interest = int(loan["remaining"] * 0.05)
-                    loan["remaining"] = min(loan["remaining"] + interest, cap)
+                    interest = int(loan.remaining * 0.05)
+                    loan.remaining = min(loan.remaining + interest, cap)
+                    self._loans_changed(player)
                     if interest > 0:
-                        capped_msg = " (CAPPED)" if loan["remaining"] >= cap else ""
-                        messages.append(
-                            f"{player.name}'s bank loan grew by {interest}kr "
-                            f"(owes {loan['remaining']}kr){capped_msg}."
-                        )
+                        note("bank_interest_capped" if loan.remaining >= cap else "bank_interest",
+                             player=player.name, amount=interest, remaining=loan.remaining)
 
                 # 3) Player loan interest compounds (skip if distressed, cap at 2x)
-                for loan in player.player_loans_taken:
-                    rate = loan.get("interest_rate", 0)
-                    cap = loan["amount"] * 2
-                    if rate > 0 and loan["remaining"] < cap:
-                        compound = int(loan["remaining"] * rate / 100 * 0.1)
+                for loan in player.player_loans_taken.values():
+                    rate = loan.interest_rate
+                    cap = loan.amount * 2
+                    if rate > 0 and loan.remaining < cap:
+                        compound = int(loan.remaining * rate / 100 * 0.1)
                         if compound > 0:
-                            loan["remaining"] = min(loan["remaining"] + compound, cap)
-                            loan_id = loan.get("id")
-                            lender = self.get_player(loan["from"])
-                            if lender and loan_id:
-                                for gl in lender.player_loans_given:
-                                    if gl.get("id") == loan_id:
-                                        gl["remaining"] = loan["remaining"]
-                                        break
-                            capped_msg = " (CAPPED)" if loan["remaining"] >= cap else ""
-                            messages.append(
-                                f"{player.name}'s loan from {loan['from']} grew by {compound}kr "
-                                f"(owes {loan['remaining']}kr){capped_msg}."
-                            )
+                            loan.remaining = min(loan.remaining + compound, cap)
+                            self._loans_changed(player)
+                            note("loan_interest_capped" if loan.remaining >= cap else "loan_interest",
+                                 player=player.name, other=loan.lender, amount=compound,
+                                 remaining=loan.remaining)
             else:
-                messages.append(f"{player.name} is distressed — loan interest frozen this round.")
+                note("interest_frozen", player=player.name)
 
             # 4) Distress countdown (already processed at start of round)
             pass
 
-        # Sync all insurance
-        for p in self.players:
-            self._sync_insurance(p.name)
+    # ── Persistence ───────────────────────────────────────────────────
 
-        # Round summary
-        total_interest = sum(1 for m in messages if "grew by" in m)
-        total_premiums = sum(1 for m in messages if "premium" in m)
-        for msg in messages:
-            self.log.append(msg)
-        self.log.append(
-            f"── Market Round {self.current_round} "
-            f"({total_interest} interest charges, {total_premiums} premiums) ──"
-        )
-        return messages
+    def _journal_event(self, op, args, kwargs):
+        if self.journal.record(self.version, op, args, kwargs):
+            self.journal.write_snapshot(self.version, self.dump_state())
+
+    def dump_state(self):
+        """Complete internal state as plain data, for journal snapshots."""
+        return {
+            "version": self.version,
+            "current_round": self.current_round,
+            "started": self.started,
+            "claimed_players": sorted(self.claimed_players),
+            "next_loan_id": self._next_loan_id,
+            "next_contract_id": self._next_contract_id,
+            "auction_pool": list(self.auction_pool),
+            "players": [p.dump() for p in self.players],
+            "insurance_contracts": [c.to_dict() for c in self.insurance.all()],
+            "player_loans": [l.to_dict() for l in self.loans.values()],
+            "stockmarket": self.stockmarket.dump(),
+            "log": self.log.dump(),
+            "transactions": self.transactions.dump(),
+        }
+
+    @classmethod
+    def from_state(cls, data):
+        game = cls()
+        for d in data["players"]:
+            game._attach_player(Player.load(d))
+        for player in game.players:
+            for street in player.properties:
+                game.street_owner[street] = player.name
+            for holder_name, count in player.shareholders.items():
+                game._by_name[holder_name].holdings[player.name] = count
+        for c in data["insurance_contracts"]:
+            game.insurance.add(InsuranceContract.from_dict(c))
+        for l in data["player_loans"]:
+            game._add_loan(PlayerLoan.from_dict(l))
+        game.stockmarket = Stockmarket.load(data["stockmarket"])
+        game.version = data["version"]
+        game.current_round = data["current_round"]
+        game.started = data["started"]
+        game.claimed_players = set(data["claimed_players"])
+        game._next_loan_id = data["next_loan_id"]
+        game._next_contract_id = data["next_contract_id"]
+        game.auction_pool = data["auction_pool"]
+        history = S["history"]
+        game.log = GameLog.load(data["log"], history["recent"], history["chunk_size"])
+        game.transactions = GameLog.load(data["transactions"], history["recent"], history["chunk_size"])
+        return game
+
+    def approx_size(self):
+        """Rough bytes held in memory: serialized state x3 for Python object overhead."""
+        with self.lock:
+            return 3 * len(json.dumps(self.dump_state(), separators=(",", ":")))
+
+    @classmethod
+    def restore(cls, journal):
+        """Rebuild a game from its latest snapshot plus the journal tail."""
+        state, events = journal.load()
+        game = cls.from_state(state) if state else cls()
+        for event in events:
+            getattr(game, event["op"])(*event["args"], **event["kwargs"])
+        game.journal = journal
+        return game
 
     # ── Serialization ─────────────────────────────────────────────────
 
-    def to_dict(self):
-        player_dicts = [p.to_dict(self.players) for p in self.players]
-        leaderboard = sorted(
-            [{"name": p["name"], "net_worth": p["net_worth"], "color": p["color"]}
-             for p in player_dicts if not p["eliminated"]],
-            key=lambda x: x["net_worth"], reverse=True
+    def _mark_dirty(self, player):
+        """player's valuation inputs changed: their figures and their shareholders' are stale."""
+        self._dirty.add(player.name)
+        self._dirty.update(player.shareholders)
+
+    def _refresh_figures(self):
+        """Recompute portfolio, net worth and leaderboard for players marked dirty."""
+        if not self._dirty:
+            return
+        for name in self._dirty:
+            player = self._by_name[name]
+            portfolio = {}
+            value = 0
+            for company_name, held in player.holdings.items():
+                if company_name == name:
+                    continue  # shares bought back into yourself via a trade aren't a holding
+                company = self._by_name[company_name]
+                price = company.share_price
+                portfolio[company_name] = {
+                    "count": held,
+                    "price": round(price, 2),
+                    "value": round(held * price, 2),
+                }
+                if not company.eliminated:
+                    value += held * price
+            player.portfolio = portfolio
+            player.portfolio_value = value
+            player.net_worth = player.balance + player.property_value + value - player.total_debt
+        self._dirty.clear()
+
+        ranked = sorted(
+            (p for p in self.players if not p.eliminated),
+            key=lambda p: round(p.net_worth, 2), reverse=True,
         )
-        for i, entry in enumerate(leaderboard):
-            entry["rank"] = i + 1
+        self._leaderboard = [
+            {"name": p.name, "net_worth": round(p.net_worth, 2), "color": p.color, "rank": i + 1}
+            for i, p in enumerate(ranked)
+        ]
+
+    def to_dict(self):
+        self._refresh_figures()
+        # Policies are a view of the insurance book, built only here
+        player_dicts = [
+            p.to_dict([c.to_dict() for c in self.insurance.for_insured(p.name)]) for p in self.players
+        ]
+        leaderboard = [dict(entry) for entry in self._leaderboard]
         winner = self.check_winner()
         return {
+            "version": self.version,
             "players": player_dicts,
-            "insurance_contracts": [c.to_dict() for c in self.insurance_contracts if c.active],
+            "insurance_contracts": [c.to_dict() for c in self.insurance],
             "current_round": self.current_round,
             "started": self.started,
-            "log": self.log[-40:],
-            "all_streets": self._all_streets(),
-            "claimed_players": list(self.claimed_players),
+            "log": log_events.render_all(self.log.tail(40), S["history"]["language"]),
+            "owners": self._street_owners(),
+            "claimed_players": sorted(self.claimed_players),
             "leaderboard": leaderboard,
-            "auction_pool": self.auction_pool,
-            "transactions": self.transactions[-30:],
+            "auction_pool": list(self.auction_pool),
+            "transactions": self.transactions.tail(30),
             "winner": winner,
+            "exchange": self._exchange_view(),
         }
 
-    def _all_streets(self):
-        owner_map = {}
-        for p in self.players:
-            for s in p.properties:
-                owner_map[s] = p.name
-        streets = []
-        for group_name, group in config.streets.items():
-            for street_name, info in group.items():
-                streets.append({
-                    "name": street_name,
-                    "group": group_name,
-                    "price": info["Pris"],
-                    "owner": owner_map.get(street_name),
-                })
-        return streets
+    def _street_owners(self):
+        """{street: owner} for owned streets. Static street data is served by /api/streets."""
+        return dict(self.street_owner)
+
+    def snapshot(self):
+        """to_dict() for the current version, built at most once per version.
+
+        A cache hit is lock-free; it may trail an in-flight mutation by one
+        version but is always a consistent state.
+        """
+        cache = self._snapshot_cache
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+        with self.lock:
+            if self._snapshot_cache is None or self._snapshot_cache[0] != self.version:
+                self._snapshot_cache = (self.version, self.to_dict())
+            return self._snapshot_cache[1]
+
+    def to_json(self):
+        """snapshot() encoded as JSON, encoded at most once per version."""
+        cache = self._json_cache
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+        with self.lock:
+            if self._json_cache is None or self._json_cache[0] != self.version:
+                self._json_cache = (self.version, json.dumps(self.snapshot(), ensure_ascii=False))
+            return self._json_cache[1]
+
+    def make_patch(self):
+        """Diff current state against the last published one.
+
+        Returns {version, base, ...changes} or None if nothing changed since
+        the last patch. Clients apply a patch only when their version == base.
+        """
+        with self.lock:
+            return self._make_patch()
+
+    def _make_patch(self):
+        if self._published is not None and self.version == self._published_version:
+            return None
+        state = self.snapshot()
+        prev = self._published or {}
+        patch = {"version": self.version, "base": self._published_version}
+
+        old_players = {p["name"]: p for p in prev.get("players", [])}
+        players = {}
+        for p in state["players"]:
+            old = old_players.get(p["name"])
+            changed = p if old is None else {k: v for k, v in p.items() if old.get(k) != v}
+            if changed:
+                players[p["name"]] = changed
+        if players:
+            patch["players"] = players
+
+        old_owners = prev.get("owners", {})
+        owners = {s: o for s, o in state["owners"].items() if old_owners.get(s) != o}
+        owners.update({s: None for s in old_owners if s not in state["owners"]})
+        if owners:
+            patch["owners"] = owners
+
+        if len(self.log) > self._published_log:
+            patch["log"] = log_events.render_all(self.log.since(self._published_log, limit=40), S["history"]["language"])
+        if len(self.transactions) > self._published_tx:
+            patch["transactions"] = self.transactions.since(self._published_tx, limit=30)
+
+        for key in self.PATCH_KEYS:
+            if key not in prev or prev[key] != state[key]:
+                patch[key] = state[key]
+
+        self._published = state
+        self._published_version = self.version
+        self._published_log = len(self.log)
+        self._published_tx = len(self.transactions)
+        return patch
 
 
 # ── Helper ──────────────────────────────────────────────────────────────────
 
 def get_game():
     game_id = session.get("game_id")
-    if game_id and game_id in games:
-        return games[game_id]
+    if game_id:
+        return games.get(game_id)
     return None
 
+def open_journal(game_id):
+    cfg = S["storage"]
+    if not cfg["directory"]:
+        return None
+    return GameJournal(cfg["directory"], game_id, cfg["snapshot_every"], cfg["fsync"])
+
+
+def load_saved_games():
+    """Register every journaled game; each is restored from disk on first access."""
+    for game_id in saved_game_ids(S["storage"]["directory"]):
+        if sharding.owns(game_id):
+            games.add_spilled(game_id)
+
+
+def sweep_games():
+    """Background task: evict idle games and keep the registry within budget."""
+    while True:
+        socketio.sleep(S["registry"]["sweep_interval"])
+        games.sweep()
+
+
 def game_required(f):
     """Decorator for endpoints that need an active started game."""
     from functools import wraps
@@ -991,12 +1710,30 @@ def game_required(f):
     return wrapped
 
 
+def game_response(game, ok=True, message=None, **extra):
+    """JSON response whose "game" field is the game's cached serialized state."""
+    body = {"status": "ok" if ok else "error"}
+    if message is not None:
+        body["message"] = message
+    body.update(extra)
+    head = json.dumps(body, ensure_ascii=False)
+    return app.response_class(
+        head[:-1] + ', "game": ' + game.to_json() + "}",
+        mimetype="application/json",
+    )
+
+
 # ── Broadcast helper ────────────────────────────────────────────────────────
 
 def broadcast_state(game_id):
-    """Push current game state to all clients in this game's room."""
-    if game_id in games:
-        socketio.emit("game_update", {"game": games[game_id].to_dict()}, room=game_id)
+    """Push what changed since the last broadcast to all clients in this game's room."""
+    game = games.get(game_id)
+    if game:
+        # Hold the lock while emitting so patches leave in version order
+        with game.lock:
+            patch = game.make_patch()
+            if patch:
+                socketio.emit("game_patch", patch, room=game_id)
 
 
 # ── SocketIO events ────────────────────────────────────────────────────────
@@ -1006,18 +1743,28 @@ def handle_join_room(data):
     game_id = session.get("game_id")
     if game_id:
         join_room(game_id)
-        if game_id in games:
-            emit("game_update", {"game": games[game_id].to_dict()})
+        game = games.get(game_id)
+        if game:
+            emit("game_update", '{"game": ' + game.to_json() + "}")
+
+
+@socketio.on("request_snapshot")
+def handle_request_snapshot(data=None):
+    """Client missed a patch (version gap) and needs the full state again."""
+    game_id = session.get("game_id")
+    game = games.get(game_id) if game_id else None
+    if game:
+        emit("game_update", '{"game": ' + game.to_json() + "}")
 
 
 @socketio.on("disconnect")
 def handle_disconnect():
     game_id = session.get("game_id")
     player_name = session.get("player_name")
-    if game_id and game_id in games and player_name:
-        game = games[game_id]
+    game = games.get(game_id) if game_id else None
+    if game and player_name:
         if not game.started:
-            game.claimed_players.discard(player_name)
+            game.unclaim_player(player_name)
             session.pop("player_name", None)
             broadcast_state(game_id)
 
@@ -1032,21 +1779,28 @@ def index():
 @app.route("/api/new_game", methods=["POST"])
 def new_game():
     game_id = str(random.randint(10000, 99999))
+    # In sharded mode only hand out codes this worker owns, so the router sends them back here
+    while game_id in games or not sharding.owns(game_id):
+        game_id = str(random.randint(10000, 99999))
     session["game_id"] = game_id
     session.pop("player_name", None)
-    games[game_id] = Game()
+    game = Game()
+    game.journal = open_journal(game_id)
+    if game.journal:
+        game.journal.write_snapshot(game.version, game.dump_state())
+    games[game_id] = game
     return jsonify({"status": "ok", "game_id": game_id})
 
 
 @app.route("/api/join_game", methods=["POST"])
 def join_game():
     game_id = str(request.json.get("game_id", "")).strip()
-    if game_id not in games:
+    game = games.get(game_id)
+    if game is None:
         return jsonify({"status": "error", "message": "Spelet hittades inte."}), 404
     session["game_id"] = game_id
     session.pop("player_name", None)
-    game = games[game_id]
-    return jsonify({"status": "ok", "game_id": game_id, "game": game.to_dict()})
+    return game_response(game, game_id=game_id)
 
 
 @app.route("/api/claim_player", methods=["POST"])
@@ -1055,12 +1809,9 @@ def claim_player():
     if not game:
         return jsonify({"status": "error", "message": "No active game."}), 400
     name = request.json.get("name", "").strip()
-    player = game.get_player(name)
-    if not player:
-        return jsonify({"status": "error", "message": "Spelaren finns inte."}), 400
-    if name in game.claimed_players:
-        return jsonify({"status": "error", "message": "Spelaren ar redan tagen."}), 400
-    game.claimed_players.add(name)
+    ok, msg = game.claim_player(name)
+    if not ok:
+        return jsonify({"status": "error", "message": msg}), 400
     session["player_name"] = name
     broadcast_state(session.get("game_id"))
     return jsonify({"status": "ok", "player_name": name})
@@ -1076,7 +1827,7 @@ def unclaim_player():
         return jsonify({"status": "error", "message": "Du har ingen spelare vald."}), 400
     if game.started:
         return jsonify({"status": "error", "message": "Kan inte byta spelare efter att spelet startat."}), 400
-    game.claimed_players.discard(name)
+    game.unclaim_player(name)
     session.pop("player_name", None)
     broadcast_state(session.get("game_id"))
     return jsonify({"status": "ok"})
@@ -1090,10 +1841,11 @@ def add_player():
     name = request.json.get("name", "").strip().capitalize()
     if not name:
         return jsonify({"status": "error", "message": "Name required."}), 400
-    if game.add_player(name):
+    ok, msg = game.add_player(name)
+    if ok:
         broadcast_state(session.get("game_id"))
-        return jsonify({"status": "ok", "game": game.to_dict()})
-    return jsonify({"status": "error", "message": "Name taken or max players reached."}), 400
+        return game_response(game)
+    return jsonify({"status": "error", "message": msg}), 400
 
 
 @app.route("/api/start_game", methods=["POST"])
@@ -1101,14 +1853,17 @@ def start_game():
     game = get_game()
     if not game:
         return jsonify({"status": "error", "message": "No active game."}), 400
-    if game.started:
-        return jsonify({"status": "error", "message": "Spelet har redan startat."}), 400
-    if len(game.players) < 2:
-        return jsonify({"status": "error", "message": "Need at least 2 players."}), 400
-    game.started = True
-    game.log.append("── Game started! ──")
+    ok, msg = game.start()
+    if not ok:
+        return jsonify({"status": "error", "message": msg}), 400
     broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok", "game": game.to_dict()})
+    return game_response(game)
+
+
+@app.route("/api/streets", methods=["GET"])
+def streets():
+    """Static street catalog; clients fetch it once."""
+    return app.response_class(street_catalog.CLIENT_JSON, mimetype="application/json")
 
 
 @app.route("/api/state", methods=["GET"])
@@ -1116,12 +1871,30 @@ def state():
     game = get_game()
     if not game:
         return jsonify({"status": "error", "message": "No active game."}), 400
-    return jsonify({
-        "status": "ok",
-        "game": game.to_dict(),
-        "my_player": session.get("player_name"),
-        "game_id": session.get("game_id"),
-    })
+    return game_response(
+        game, my_player=session.get("player_name"), game_id=session.get("game_id")
+    )
+
+
+@app.route("/api/history", methods=["GET"])
+def history():
+    """Older log / transaction entries, one page at a time (newest first pages).
+
+    Log lines come rendered in ?lang= (default history.language); ?raw=1 returns the records.
+    """
+    game = get_game()
+    if not game:
+        return jsonify({"status": "error", "message": "No active game."}), 400
+    kind = request.args.get("kind", "log")
+    if kind not in ("log", "transactions"):
+        return jsonify({"status": "error", "message": "Unknown history kind."}), 400
+    before = request.args.get("before", type=int)
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    with game.lock:
+        entries, cursor = getattr(game, kind).page(before, limit)
+    if kind == "log" and not request.args.get("raw", type=int):
+        entries = log_events.render_all(entries, request.args.get("lang", S["history"]["language"]))
+    return jsonify({"status": "ok", "entries": entries, "next": cursor})
 
 
 # ── Properties ──
@@ -1133,7 +1906,7 @@ def add_property(game):
     ok, msg = game.add_property(d.get("player"), d.get("street"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/remove_property", methods=["POST"])
@@ -1143,7 +1916,7 @@ def remove_property(game):
     ok, msg = game.remove_property(d.get("player"), d.get("street"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Shares ──
@@ -1155,7 +1928,7 @@ def issue_share(game):
     ok, msg = game.issue_share(d.get("owner"), d.get("buyer"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/transfer_share", methods=["POST"])
@@ -1167,7 +1940,30 @@ def transfer_share(game):
     )
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
+
+
+@app.route("/api/place_order", methods=["POST"])
+@game_required
+def place_order(game):
+    d = request.json
+    ok, msg = game.place_order(
+        d.get("player"), d.get("company"), d.get("side"),
+        int(d.get("price", 0)), int(d.get("quantity", 1)),
+    )
+    if ok:
+        broadcast_state(session.get("game_id"))
+    return game_response(game, ok, msg)
+
+
+@app.route("/api/cancel_order", methods=["POST"])
+@game_required
+def cancel_order(game):
+    d = request.json
+    ok, msg = game.cancel_order(d.get("player"), int(d.get("order_id", 0)))
+    if ok:
+        broadcast_state(session.get("game_id"))
+    return game_response(game, ok, msg)
 
 
 # ── Rent ──
@@ -1176,10 +1972,11 @@ def transfer_share(game):
 @game_required
 def collect_rent(game):
     d = request.json
-    ok, msg = game.collect_rent(d.get("player"), int(d.get("amount", 0)))
+    ok, result = game.collect_rent(d.get("player"), int(d.get("amount", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+        result = log_events.render(result, S["history"]["language"])
+    return game_response(game, ok, result)
 
 
 # ── Bank Loans ──
@@ -1191,7 +1988,7 @@ def take_bank_loan(game):
     ok, msg = game.take_bank_loan(d.get("player"), int(d.get("amount", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/repay_bank_loan", methods=["POST"])
@@ -1202,7 +1999,7 @@ def repay_bank_loan(game):
     ok, msg = game.repay_bank_loan(d.get("player"), int(d.get("loan_index", 0)), int(amt) if amt else None)
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Player Loans ──
@@ -1217,7 +2014,7 @@ def give_player_loan(game):
     )
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/repay_player_loan", methods=["POST"])
@@ -1225,10 +2022,10 @@ def give_player_loan(game):
 def repay_player_loan(game):
     d = request.json
     amt = d.get("amount")
-    ok, msg = game.repay_player_loan(d.get("player"), int(d.get("loan_index", 0)), int(amt) if amt else None)
+    ok, msg = game.repay_player_loan(d.get("player"), int(d.get("loan_id", 0)), int(amt) if amt else None)
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Insurance ──
@@ -1243,7 +2040,7 @@ def create_insurance(game):
     )
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/claim_insurance", methods=["POST"])
@@ -1255,7 +2052,7 @@ def claim_insurance(game):
     )
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/cancel_insurance", methods=["POST"])
@@ -1265,7 +2062,7 @@ def cancel_insurance(game):
     ok, msg = game.cancel_insurance(d.get("player"), int(d.get("contract_id", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Money ──
@@ -1279,7 +2076,7 @@ def transfer_money(game):
     )
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/adjust_balance", methods=["POST"])
@@ -1289,7 +2086,7 @@ def adjust_balance(game):
     ok, msg = game.adjust_balance(d.get("player"), int(d.get("amount", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Distress ──
@@ -1301,7 +2098,7 @@ def distress(game):
     ok, msg = game.enter_distress(d.get("player"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 # ── Market Round ──
@@ -1309,10 +2106,73 @@ def distress(game):
 @app.route("/api/market_round", methods=["POST"])
 @game_required
 def market_round(game):
-    messages = game.market_round()
+    events = game.market_round()
     broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok", "messages": messages, "game": game.to_dict()})
+    return game_response(game, messages=log_events.render_all(events, S["history"]["language"]))
+
+
+@app.route("/api/loan_projection", methods=["GET"])
+@game_required
+def loan_projection_route(game):
+    """?player=&rounds= — what the player's loans will have grown to after each coming market round."""
+    with game.lock:
+        ok, result = game.project_debt(request.args.get("player"), request.args.get("rounds", 10, type=int))
+    if not ok:
+        return jsonify({"status": "error", "message": result}), 400
+    return jsonify({"status": "ok", **result})
+
 
+@app.route("/api/risk_forecast", methods=["GET"])
+@game_required
+def risk_forecast(game):
+    """?rounds= — each player's chance of default, elimination and insolvency.
+
+    Add lender=&borrower=&amount=&rate= or insurer=&insured=&premium=&cover=
+    to see the forecast as if that loan or contract were signed.
+    """
+    args = request.args
+    rounds = args.get("rounds", S["risk"]["rounds"], type=int)
+    loan = contract = None
+    if args.get("lender"):
+        loan = (args.get("lender"), args.get("borrower"), args.get("amount", 0, type=int),
+                args.get("rate", 0, type=float))
+    if args.get("insurer"):
+        contract = (args.get("insurer"), args.get("insured"), args.get("premium", 0, type=int),
+                    args.get("cover", 0, type=int))
+    ok, result = game.forecast_risk(rounds, loan, contract)
+    if not ok:
+        return jsonify({"status": "error", "message": result}), 400
+    return jsonify({"status": "ok", "rounds": rounds, "players": result})
+
+
+@app.route("/api/charge_rent", methods=["POST"])
+@game_required
+def charge_rent(game):
+    d = request.json
+    ok, msg = game.charge_rent(d.get("player"), d.get("street"), int(d.get("dice", 0)))
+    if ok:
+        broadcast_state(session.get("game_id"))
+    return game_response(game, ok, msg)
+
+
+@app.route("/api/build_house", methods=["POST"])
+@game_required
+def build_house(game):
+    d = request.json
+    ok, msg = game.build_house(d.get("player"), d.get("street"))
+    if ok:
+        broadcast_state(session.get("game_id"))
+    return game_response(game, ok, msg)
+
+
+@app.route("/api/sell_house", methods=["POST"])
+@game_required
+def sell_house(game):
+    d = request.json
+    ok, msg = game.sell_house(d.get("player"), d.get("street"))
+    if ok:
+        broadcast_state(session.get("game_id"))
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/transfer_property", methods=["POST"])
@@ -1322,7 +2182,7 @@ def transfer_property_route(game):
     ok, msg = game.transfer_property(d.get("from"), d.get("to"), d.get("street"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/buyback_share", methods=["POST"])
@@ -1332,7 +2192,7 @@ def buyback_share_route(game):
     ok, msg = game.buyback_share(d.get("owner"), d.get("holder"))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 @app.route("/api/buy_from_auction", methods=["POST"])
 @game_required
@@ -1341,7 +2201,7 @@ def buy_from_auction_route(game):
     ok, msg = game.buy_from_auction(d.get("player"), d.get("street"), int(d.get("bid", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/restructure_bank_loan", methods=["POST"])
@@ -1351,45 +2211,42 @@ def restructure_bank_loan_route(game):
     ok, msg = game.restructure_bank_loan(d.get("player"), int(d.get("loan_index", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 @app.route("/api/pay_rent_with_insurance", methods=["POST"])
 @game_required
 def pay_rent_with_insurance_route(game):
     d = request.json
-    ok, msg = game.pay_rent_with_insurance(d.get("player"), int(d.get("amount", 0)))
+    ok, result = game.pay_rent_with_insurance(d.get("player"), int(d.get("amount", 0)))
     if ok:
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+        result = log_events.render(result, S["history"]["language"])
+    return game_response(game, ok, result)
 
 
 @app.route("/api/renegotiate_insurance", methods=["POST"])
 @game_required
 def renegotiate_insurance_route(game):
     d = request.json
-    contract_id = int(d.get("contract_id", 0))
-    # Cancel old, create new with remaining coverage
-    contract = None
-    for c in game.insurance_contracts:
-        if c.id == contract_id and c.active:
-            contract = c
-            break
-    if not contract:
-        return jsonify({"status": "error", "message": "Contract not found.", "game": game.to_dict()})
-
-    remaining_coverage = contract.coverage_cap - contract.coverage_used
-    new_premium = int(d.get("new_premium", contract.premium_per_round))
-    new_cap = int(d.get("new_cap", remaining_coverage))
-    new_cap = min(new_cap, remaining_coverage)  # can't increase beyond remaining
-
-    contract.active = False
-    ok, msg = game.create_insurance(contract.insurer, contract.insured, new_premium, new_cap)
+    new_premium = d.get("new_premium")
+    new_cap = d.get("new_cap")
+    ok, msg = game.renegotiate_insurance(
+        int(d.get("contract_id", 0)),
+        int(new_premium) if new_premium is not None else None,
+        int(new_cap) if new_cap is not None else None,
+    )
     if ok:
-        game.log.append(f"Insurance #{contract_id} renegotiated -> new terms.")
         broadcast_state(session.get("game_id"))
-    return jsonify({"status": "ok" if ok else "error", "message": msg, "game": game.to_dict()})
+    return game_response(game, ok, msg)
 
 
 if __name__ == "__main__":
-    socketio.run(app, debug=True, port=5000, host="0.0.0.0")
+    load_saved_games()
+    socketio.start_background_task(sweep_games)
+    if sharding.current_shard()[1] > 1:
+        # Worker behind sharding.py's router
+        port = int(os.environ[sharding.PORT_ENV])
+        socketio.run(app, port=port, host="127.0.0.1", allow_unsafe_werkzeug=True)
+    else:
+        socketio.run(app, debug=True, port=5000, host="0.0.0.0")
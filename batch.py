@@ -0,0 +1,174 @@
+"""Monte Carlo runs of headless games (see simulation.py) over a process pool.
+
+    python batch.py --games 10000 --players 4 --seed 1 --out runs.jsonl \
+        --set player.dividend_per_share=0.10
+
+Game i of a batch always gets the same seed, so a batch is reproducible
+however many workers run it. Each finished game is written to --out as one
+JSON line as soon as its chunk comes back; the summary (win rates,
+elimination rounds, loan defaults, share returns) is printed at the end.
+--set overrides any entry of player_settings.settings in every worker.
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import player_settings as psettings
+
+NAMES = ("Anna", "Bo", "Cia", "Dan", "Eva", "Filip")
+
+
+def game_seed(base_seed, index):
+    """Seed of game index in a batch started from base_seed."""
+    return base_seed * 1_000_003 + index
+
+
+def apply_overrides(overrides):
+    """Set {"section.key": value} entries in player_settings.settings."""
+    for path, value in overrides.items():
+        section, key = path.split(".", 1)
+        if key not in psettings.settings.get(section, {}):
+            raise KeyError(f"Unknown setting {path}")
+        psettings.settings[section][key] = value
+
+
+def _init_worker(overrides):
+    apply_overrides(overrides)
+
+
+def _play(names, seeds):
+    """Worker task: play one game per seed."""
+    import simulation
+    results = []
+    for index, seed in seeds:
+        result = simulation.simulate(names, seed)
+        result["game"] = index
+        results.append(result)
+    return results
+
+
+class Summary:
+    """Aggregates game results as they arrive."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.games = 0
+        self.decided = 0
+        self.rounds = 0
+        self.wins = dict.fromkeys(names, 0)
+        self.eliminations = []          # market round of every elimination
+        self.borrowers = 0              # player-games with a bank or player loan
+        self.borrower_defaults = 0      # ... of which defaulted at least once
+        self.defaults = 0               # player-games with at least one default
+        self.share_returns = []         # (dividends + final value) / cost - 1, per investing player-game
+
+    def add(self, result):
+        self.games += 1
+        self.decided += result["decided"]
+        self.rounds += result["rounds"]
+        self.wins[result["winner"]] += 1
+        for stats in result["players"].values():
+            if stats["eliminated_round"] is not None:
+                self.eliminations.append(stats["eliminated_round"])
+            defaulted = stats["defaults"] > 0
+            self.defaults += defaulted
+            if stats["bank_loans"] or stats["player_loans"]:
+                self.borrowers += 1
+                self.borrower_defaults += defaulted
+            if stats["share_cost"] > 0:
+                self.share_returns.append(
+                    (stats["dividends"] + stats["share_value"]) / stats["share_cost"] - 1
+                )
+
+    def to_dict(self):
+        n = self.games or 1
+        player_games = n * len(self.names)
+        eliminations = sorted(self.eliminations)
+        returns = sorted(self.share_returns)
+        return {
+            "games": self.games,
+            "decided": round(self.decided / n, 4),
+            "mean_rounds": round(self.rounds / n, 2),
+            "win_rate": {name: round(w / n, 4) for name, w in self.wins.items()},
+            "elimination_rate": round(len(eliminations) / player_games, 4),
+            "elimination_round": _describe(eliminations),
+            "default_rate": round(self.defaults / player_games, 4),
+            "borrower_default_rate": round(self.borrower_defaults / self.borrowers, 4) if self.borrowers else None,
+            "share_return": _describe(returns),
+        }
+
+
+def _describe(values):
+    """Mean and quartiles of sorted values."""
+    if not values:
+        return None
+    pick = lambda q: round(values[min(int(q * len(values)), len(values) - 1)], 4)
+    return {"mean": round(sum(values) / len(values), 4), "p25": pick(0.25), "median": pick(0.5), "p75": pick(0.75)}
+
+
+def run_batch(games, players=4, base_seed=0, workers=None, out=None, overrides=None, chunk_size=25):
+    """Play `games` headless games across a process pool. Returns a Summary.
+
+    out, if given, is a path; each game result is appended to it as a JSON line.
+    """
+    names = NAMES[:players]
+    overrides = overrides or {}
+    summary = Summary(names)
+    chunks = [
+        [(i, game_seed(base_seed, i)) for i in range(start, min(start + chunk_size, games))]
+        for start in range(0, games, chunk_size)
+    ]
+    sink = open(out, "a", encoding="utf-8") if out else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(overrides,)) as pool:
+            futures = [pool.submit(_play, names, seeds) for seeds in chunks]
+            for future in as_completed(futures):
+                for result in future.result():
+                    summary.add(result)
+                    if sink:
+                        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+                if sink:
+                    sink.flush()
+    finally:
+        if sink:
+            sink.close()
+    return summary
+
+
+def _parse_override(text):
+    path, _, raw = text.partition("=")
+    try:
+        value = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        value = raw
+    return path.strip(), value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Monopoly Plus games in parallel.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=4, choices=range(2, len(NAMES) + 1))
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i uses a seed derived from it")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--out", help="append one JSON line per game to this file")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="SECTION.KEY=VALUE",
+                        help="override a player_settings entry, e.g. player.dividend_per_share=0.1")
+    args = parser.parse_args(argv)
+
+    overrides = dict(_parse_override(o) for o in args.overrides)
+    try:
+        apply_overrides(overrides)  # fail fast on typos, before starting workers
+    except (KeyError, ValueError) as e:
+        parser.error(str(e))
+    summary = run_batch(args.games, args.players, args.seed, args.workers or os.cpu_count(),
+                        args.out, overrides)
+    json.dump(summary.to_dict(), sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
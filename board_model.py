@@ -0,0 +1,136 @@
+"""Long-run landing frequencies on the board, as a Markov chain over dice rolls.
+
+A state is where a roll leaves the token: (square, doubles rolled so far this
+turn) or in jail before the k-th attempt to roll out. Each roll of two dice
+moves between states, following Fängelse and three doubles in a row. Chans
+and Allmänning are plain squares: the repo has no card decks, and
+simulation.py plays by these same Rules. The stationary distribution gives
+how often each square ends a move, per turn.
+
+The chain is solved once per rule set and cached; expected_rent() is then a
+couple of dict lookups:
+
+    board_model.expected_rent("Norrmalmstorg", 3)    # kr per opponent turn, 3 houses
+"""
+import functools
+from collections import namedtuple
+from types import MappingProxyType
+
+import street_catalog
+from location_data import location
+
+# jail_attempts: turns spent rolling for doubles before paying out (the last
+# try pays and moves); doubles_to_jail: doubles in a row that send you to
+# jail, without moving on the last one.
+Rules = namedtuple("Rules", "jail_attempts doubles_to_jail", defaults=(3, 3))
+DEFAULT_RULES = Rules()
+
+Landing = namedtuple("Landing", "squares in_jail rolls_per_turn")
+
+SQUARES = len(location)
+JAIL = next(p for p, sq in location.items() if sq.get("Fängelse") == "Besök")
+GO_TO_JAIL = next(p for p, sq in location.items() if sq.get("Fängelse") == "Fängelse")
+
+# (total, double, probability) for two dice
+ROLLS = tuple(
+    (a + b, a == b, 1 / 36) for a in range(1, 7) for b in range(1, 7)
+)
+MEAN_ROLL = 7   # utility rent is a multiple of the roll; its expectation uses the mean
+
+
+def _transitions(rules):
+    """Sparse transition rows and, per state, its square (None: in jail) and whether a turn ends there."""
+    doubles = rules.doubles_to_jail
+    free = lambda pos, d: pos * doubles + d
+    jailed = lambda k: SQUARES * doubles + k
+    size = SQUARES * doubles + rules.jail_attempts
+
+    square = [s // doubles for s in range(SQUARES * doubles)] + [None] * rules.jail_attempts
+    ends_turn = [s % doubles == 0 for s in range(SQUARES * doubles)] + [True] * rules.jail_attempts
+
+    def land(row, pos, next_doubles, p):
+        pos %= SQUARES
+        state = jailed(0) if pos == GO_TO_JAIL else free(pos, next_doubles)
+        row[state] = row.get(state, 0.0) + p
+
+    rows = []
+    for state in range(size):
+        row = {}
+        if state < SQUARES * doubles:
+            pos, d = divmod(state, doubles)
+            for total, double, p in ROLLS:
+                if double and d + 1 == doubles:
+                    row[jailed(0)] = row.get(jailed(0), 0.0) + p
+                else:
+                    land(row, pos + total, d + 1 if double else 0, p)
+        else:
+            k = state - SQUARES * doubles
+            for total, double, p in ROLLS:
+                if double or k + 1 == rules.jail_attempts:
+                    land(row, JAIL + total, 0, p)   # out (paying on the last try); no extra roll
+                else:
+                    row[jailed(k + 1)] = row.get(jailed(k + 1), 0.0) + p
+        rows.append(row)
+    return rows, square, ends_turn
+
+
+@functools.lru_cache(maxsize=None)
+def landing_probabilities(rules=DEFAULT_RULES):
+    """Long-run Landing for rules: per-turn probability that a move ends on
+    each square, the share of turns that end in jail, and rolls per turn."""
+    rows, square, ends_turn = _transitions(rules)
+    size = len(rows)
+    dist = [1.0 / size] * size
+    for _ in range(10000):
+        nxt = [0.0] * size
+        for state, p in enumerate(dist):
+            if p:
+                for target, q in rows[state].items():
+                    nxt[target] += p * q
+        delta = sum(abs(a - b) for a, b in zip(nxt, dist))
+        dist = nxt
+        if delta < 1e-13:
+            break
+
+    turn_ends = sum(p for p, end in zip(dist, ends_turn) if end)
+    squares = [0.0] * SQUARES
+    in_jail = 0.0
+    for state, p in enumerate(dist):
+        if square[state] is None:
+            in_jail += p
+        else:
+            squares[square[state]] += p
+    return Landing(
+        squares=tuple(p / turn_ends for p in squares),
+        in_jail=in_jail / turn_ends,
+        rolls_per_turn=1 / turn_ends,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def rent_table(rules=DEFAULT_RULES):
+    """{street: {"Hyra" key: expected rent per opponent turn}} for rules."""
+    squares = landing_probabilities(rules).squares
+    table = {}
+    for street in street_catalog.STREETS.values():
+        p = squares[street.position]
+        table[street.name] = MappingProxyType({
+            key: p * (rent(MEAN_ROLL) if callable(rent) else rent) for key, rent in street.rent.items()
+        })
+    return MappingProxyType(table)
+
+
+def rent_key(street, owned_in_group, houses=0):
+    """The "Hyra" key that applies: houses, or for stations and utilities
+    how many of the group the owner has, or "Alla" for a complete colour group."""
+    if houses:
+        return houses
+    if street.house_price is None:
+        return owned_in_group
+    return "Alla" if owned_in_group == len(street_catalog.GROUPS[street.group]) else "Inga"
+
+
+def expected_rent(street_name, key="Inga", rules=DEFAULT_RULES):
+    """Expected rent from one opponent turn on street_name. key is a "Hyra"
+    key (see rent_key)."""
+    return rent_table(rules)[street_name][key]
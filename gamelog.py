@@ -0,0 +1,94 @@
+import base64
+import json
+import zlib
+from collections import deque
+
+
+class GameLog:
+    """Append-only history with bounded memory.
+
+    The newest `capacity` entries stay as plain objects (a ring buffer); older
+    ones are gathered into chunks of `chunk_size` and kept zlib-compressed.
+    Entries are numbered 0, 1, 2, ... in append order; len() is the total ever
+    appended, so a count doubles as a cursor.
+    """
+
+    def __init__(self, capacity=200, chunk_size=500):
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self._recent = deque()      # newest entries, at most capacity
+        self._spill = []            # evicted from _recent, not yet compressed
+        self._archive = []          # [zlib-compressed JSON list], chunk_size entries each
+        self._total = 0
+
+    def __len__(self):
+        return self._total
+
+    def append(self, entry):
+        self._recent.append(entry)
+        self._total += 1
+        if len(self._recent) > self.capacity:
+            self._spill.append(self._recent.popleft())
+            if len(self._spill) >= self.chunk_size:
+                self._archive.append(zlib.compress(
+                    json.dumps(self._spill, ensure_ascii=False, separators=(",", ":")).encode()
+                ))
+                self._spill = []
+
+    def tail(self, n):
+        """Last n entries, oldest first."""
+        if n <= 0:
+            return []
+        if n <= len(self._recent):
+            return list(self._recent)[-n:]
+        return self.range(max(0, self._total - n), self._total)
+
+    def since(self, seq, limit=None):
+        """Entries numbered seq and up (at most the last `limit` of them)."""
+        start = max(seq, 0)
+        if limit is not None:
+            start = max(start, self._total - limit)
+        return self.tail(self._total - start)
+
+    def range(self, start, end):
+        """Entries numbered start..end-1."""
+        start, end = max(start, 0), min(end, self._total)
+        if start >= end:
+            return []
+        out = []
+        archived = len(self._archive) * self.chunk_size
+        for i in range(start // self.chunk_size, min(len(self._archive), -(-end // self.chunk_size))):
+            chunk = json.loads(zlib.decompress(self._archive[i]))
+            base = i * self.chunk_size
+            out.extend(chunk[max(start - base, 0):end - base])
+        live = self._spill + list(self._recent)
+        out.extend(live[max(start - archived, 0):max(end - archived, 0)])
+        return out
+
+    def page(self, before=None, limit=50):
+        """One page walking backwards from `before` (default: newest).
+
+        Returns (entries oldest first, cursor for the next older page or None).
+        """
+        end = self._total if before is None else min(max(before, 0), self._total)
+        start = max(0, end - limit)
+        return self.range(start, end), (start or None)
+
+    # ── Persistence ──
+
+    def dump(self):
+        return {
+            "chunk_size": self.chunk_size,
+            "archive": [base64.b64encode(c).decode() for c in self._archive],
+            "entries": self._spill + list(self._recent),
+        }
+
+    @classmethod
+    def load(cls, data, capacity=200, chunk_size=500):
+        log = cls(capacity, chunk_size)
+        log.chunk_size = data["chunk_size"]  # archived chunks keep the size they were cut at
+        log._archive = [base64.b64decode(c) for c in data["archive"]]
+        log._total = len(log._archive) * log.chunk_size
+        for entry in data["entries"]:
+            log.append(entry)
+        return log
@@ -0,0 +1,95 @@
+import json
+import os
+
+
+class GameJournal:
+    """Append-only event journal plus periodic snapshots for one game.
+
+    Layout: <directory>/<game_id>/snapshot.json and journal.jsonl. Each journal
+    line is one successful Game mutation ({"v", "op", "args", "kwargs"}); after a
+    snapshot the journal is truncated, so recovery loads the snapshot and replays
+    only the events written since.
+    """
+
+    def __init__(self, directory, game_id, snapshot_every=50, fsync=False):
+        self.game_id = game_id
+        self.path = os.path.join(directory, game_id)
+        self.snapshot_path = os.path.join(self.path, "snapshot.json")
+        self.journal_path = os.path.join(self.path, "journal.jsonl")
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.events_since_snapshot = 0
+        self._file = None
+        os.makedirs(self.path, exist_ok=True)
+
+    def record(self, version, op, args, kwargs):
+        """Append one event. Returns True when a snapshot is due."""
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        line = json.dumps({"v": version, "op": op, "args": list(args), "kwargs": kwargs}, ensure_ascii=False)
+        self._file.write(line + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.events_since_snapshot += 1
+        return self.events_since_snapshot >= self.snapshot_every
+
+    def write_snapshot(self, version, state):
+        """Atomically replace the snapshot, then start a fresh journal."""
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"v": version, "state": state}, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Events up to `version` are in the snapshot now; load() also skips them if we crash here
+        self.close()
+        open(self.journal_path, "w").close()
+        self.events_since_snapshot = 0
+
+    def load(self):
+        """Returns (snapshot state or None, [events newer than the snapshot])."""
+        state, snap_version = None, -1
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snap = json.load(f)
+            state, snap_version = snap["state"], snap["v"]
+
+        events = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break  # torn last line from a crash mid-write
+                    if event["v"] > snap_version:
+                        events.append(event)
+        self.events_since_snapshot = len(events)
+        return state, events
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def delete(self):
+        self.close()
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(self.path) and not os.listdir(self.path):
+            os.rmdir(self.path)
+
+
+def saved_game_ids(directory):
+    """Game ids that have a journal directory on disk."""
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.isdir(os.path.join(directory, name))
+    )
@@ -0,0 +1,91 @@
+"""What a player will owe over the next market rounds, if nothing else happens.
+
+Game.market_round compounds bank loans by int(remaining * 0.05) and player
+loans by int(remaining * rate / 100 * 0.1), both capped at twice the amount,
+and skips a player while they are distressed. The truncation makes each step
+depend on the exact previous balance, so the growing part of a loan's path
+is worked out once per (balance, cap, rate) and cached. After that:
+
+- rounds frozen by distress repeat the current balance,
+- the growing part is a slice of the cached path,
+- once capped (or when a step truncates to 0) the balance is constant.
+
+So a schedule costs a slice, not a loop over rounds, and loans with the
+same terms share their path.
+"""
+import functools
+
+BANK = "bank"
+PLAYER = "player"
+
+
+@functools.lru_cache(maxsize=65536)
+def growth_path(remaining, cap, kind, rate=0):
+    """Balances after each compounding round until the balance stops changing."""
+    path = []
+    if kind == PLAYER and rate <= 0:
+        return ()
+    while remaining < cap:
+        if kind == BANK:
+            step = int(remaining * 0.05)
+        else:
+            step = int(remaining * rate / 100 * 0.1)
+        if step <= 0:
+            break
+        remaining = min(remaining + step, cap)
+        path.append(remaining)
+    return tuple(path)
+
+
+def frozen_rounds(player):
+    """Upcoming market rounds in which player's interest is frozen by distress."""
+    # The countdown runs before interest: the round that ends distress already compounds
+    return max(player.distress_rounds_left - 1, 0) if player.distressed else 0
+
+
+def schedule(remaining, cap, kind, rate, rounds, frozen=0):
+    """Balance owed after each of the next `rounds` market rounds."""
+    held = min(frozen, rounds)
+    path = growth_path(remaining, cap, kind, rate)[:rounds - held]
+    last = path[-1] if path else remaining
+    return [remaining] * held + list(path) + [last] * (rounds - held - len(path))
+
+
+def project(player, rounds):
+    """Per-loan and total debt schedules for the next `rounds` market rounds.
+
+    Returns {"loans": [{kind, index or id/lender, remaining, schedule}], "total": [...]}.
+    """
+    frozen = frozen_rounds(player)
+    loans = []
+    for i, loan in enumerate(player.bank_loans):
+        loans.append({
+            "kind": BANK,
+            "index": i,
+            "remaining": loan.remaining,
+            "schedule": schedule(loan.remaining, loan.amount * 2, BANK, 0, rounds, frozen),
+        })
+    for loan in player.player_loans_taken.values():
+        loans.append({
+            "kind": PLAYER,
+            "id": loan.id,
+            "lender": loan.lender,
+            "remaining": loan.remaining,
+            "schedule": schedule(loan.remaining, loan.amount * 2, PLAYER, loan.interest_rate, rounds, frozen),
+        })
+    total = [sum(col) for col in zip(*(l["schedule"] for l in loans))] if loans else [0] * rounds
+    return {"loans": loans, "total": total}
+
+
+def total(player, rounds):
+    """Total debt after each of the next `rounds` market rounds."""
+    frozen = frozen_rounds(player)
+    owed = [0] * rounds
+    for loan in player.bank_loans:
+        for t, value in enumerate(schedule(loan.remaining, loan.amount * 2, BANK, 0, rounds, frozen)):
+            owed[t] += value
+    for loan in player.player_loans_taken.values():
+        sched = schedule(loan.remaining, loan.amount * 2, PLAYER, loan.interest_rate, rounds, frozen)
+        for t, value in enumerate(sched):
+            owed[t] += value
+    return owed
@@ -0,0 +1,153 @@
+"""Game log entries as structured records, turned into text only when shown.
+
+A record is a small dict: {"e": event type, "r": round, **fields}. Actors and
+amounts stay as fields so the log can be queried (see INTEREST_EVENTS) and
+rendered in either language on demand.
+"""
+
+TEMPLATES = {
+    "en": {
+        "game_started": "── Game started! ──",
+        "auction_buy": "{player} bought {street} from auction for {amount}kr (value: {value}kr).",
+        "property_added": "{player} registered {street} ({amount}kr).",
+        "property_removed": "{player} removed {street}.",
+        "share_price_alert": "  ALERT: {player}'s share price dropped {old:.0f} -> {new:.0f}kr!",
+        "property_transferred": "{player} transferred {street} to {other}.",
+        "house_built": "{player} built on {street} for {amount}kr ({count}/5).",
+        "house_sold": "{player} sold a house on {street} for {amount}kr ({count}/5 left).",
+        "share_issued": "{player} bought 1 share in {other} for {amount:.0f}kr. ({issued}/{max} issued)",
+        "share_sold": "{player} sold 1 share in {company} to {other} for {amount}kr.",
+        "order_placed": "{player} placed order #{order}: {side} {quantity} share(s) in {company} at {amount}kr.",
+        "order_cancelled": "{player} cancelled order #{order}.",
+        "order_dropped": "Order #{order} by {player} dropped — no longer covered.",
+        "share_traded": "{player} bought {quantity} share(s) in {company} from {other} at {amount}kr.",
+        "share_bought_back": "{player} bought back 1 share from {other} for {amount:.0f}kr. ({issued}/{max} outstanding)",
+        "rent_halved": "{player} is distressed — rent halved: {amount}kr (was {rent}kr).",
+        "dividend": "  {player} received {amount}kr dividend ({count} share in {other}).",
+        "dividend_many": "  {player} received {amount}kr dividend ({count} shares in {other}).",
+        "rent_collected": "{player} collected {amount}kr rent.",
+        "rent_collected_split": "{player} collected {amount}kr rent ({dividends}kr to shareholders, {kept}kr kept).",
+        "insurance_covered": "  Insurance #{contract} covered {amount}kr (paid by {other}).",
+        "rent_paid": "{player} paid {amount}kr rent.",
+        "rent_paid_insured": "{player} paid {amount}kr rent ({covered}kr covered by insurance, {paid}kr out of pocket).",
+        "bank_loan": "{player} took a bank loan: {amount}kr (repay {remaining}kr at {rate:.0%}).",
+        "bank_loan_repaid": "{player} fully repaid bank loan: {amount}kr.",
+        "bank_loan_partial": "{player} partially repaid bank loan: {amount}kr ({remaining}kr left).",
+        "bank_loan_restructured": "{player} restructured bank loan: {old}kr -> {remaining}kr (+20%, compound clock reset).",
+        "player_loan": "{player} lent {other} {amount}kr at {rate}% (repay {remaining}kr).",
+        "player_loan_repaid": "{player} fully repaid {other}: {amount}kr.",
+        "player_loan_partial": "{player} partially repaid {other}: {amount}kr ({remaining}kr left).",
+        "insurance_created": "Insurance: {other} insures {player} — premium {premium}kr/round, coverage up to {amount}kr.",
+        "insurance_exhausted": "Insurance #{contract} coverage exhausted.",
+        "insurance_claimed": "{player} claimed {amount}kr from insurance #{contract} (paid by {other}). {left}kr coverage left.",
+        "insurance_cancelled": "Insurance #{contract} cancelled by {player}.",
+        "insurance_renegotiated": "Insurance #{contract} renegotiated -> new terms.",
+        "money_transferred": "{player} paid {other} {amount}kr.",
+        "balance_received": "{player} received {amount}kr.",
+        "balance_paid": "{player} paid {amount}kr.",
+        "eliminated": "{player} defaulted a second time — ELIMINATED!",
+        "winner": "── {player} WINS THE GAME! ──",
+        "distressed": "{player} defaulted — enters DISTRESSED status for {rounds} rounds (rent income halved). "
+                      "A second default means elimination.",
+        "shares_worthless": "  {other}'s {count} share(s) in {player} are now worthless.",
+        "shares_voided": "  {player}'s {count} share(s) in {other} voided (slots now available).",
+        "loan_forgiven": "  {other}'s loan from {player} ({amount}kr) forgiven.",
+        "loan_lost": "  {other} lost {amount}kr lent to {player}.",
+        "bank_write_off": "  Bank wrote off {amount}kr in loans to {player}.",
+        "properties_to_auction": "  {player}'s properties ({streets}) available for auction.",
+        "distress_recovered": "{player} recovered from distressed status!",
+        "distress_continues": "{player} still distressed ({rounds} rounds left).",
+        "premium_deferred": "{player} is distressed — insurance #{contract} premium deferred.",
+        "premium_paid": "{player} paid {amount}kr premium to {other}.",
+        "premium_lapsed": "{player} missed 2 premiums — insurance #{contract} LAPSED!",
+        "premium_missed": "WARNING: {player} missed premium for #{contract} (1 grace round — pay next round or it lapses).",
+        "bank_interest": "{player}'s bank loan grew by {amount}kr (owes {remaining}kr).",
+        "bank_interest_capped": "{player}'s bank loan grew by {amount}kr (owes {remaining}kr) (CAPPED).",
+        "loan_interest": "{player}'s loan from {other} grew by {amount}kr (owes {remaining}kr).",
+        "loan_interest_capped": "{player}'s loan from {other} grew by {amount}kr (owes {remaining}kr) (CAPPED).",
+        "interest_frozen": "{player} is distressed — loan interest frozen this round.",
+        "market_round": "── Market Round {r} ({interest} interest charges, {premiums} premiums) ──",
+    },
+    "sv": {
+        "game_started": "── Spelet har startat! ──",
+        "auction_buy": "{player} köpte {street} på auktion för {amount}kr (värde: {value}kr).",
+        "property_added": "{player} registrerade {street} ({amount}kr).",
+        "property_removed": "{player} tog bort {street}.",
+        "share_price_alert": "  VARNING: {player}s aktiekurs föll {old:.0f} -> {new:.0f}kr!",
+        "property_transferred": "{player} överlät {street} till {other}.",
+        "house_built": "{player} byggde på {street} för {amount}kr ({count}/5).",
+        "house_sold": "{player} sålde ett hus på {street} för {amount}kr ({count}/5 kvar).",
+        "share_issued": "{player} köpte 1 aktie i {other} för {amount:.0f}kr. ({issued}/{max} utgivna)",
+        "share_sold": "{player} sålde 1 aktie i {company} till {other} för {amount}kr.",
+        "order_placed": "{player} lade order #{order}: {side} {quantity} aktie(r) i {company} à {amount}kr.",
+        "order_cancelled": "{player} drog tillbaka order #{order}.",
+        "order_dropped": "Order #{order} från {player} struken — saknar täckning.",
+        "share_traded": "{player} köpte {quantity} aktie(r) i {company} av {other} à {amount}kr.",
+        "share_bought_back": "{player} köpte tillbaka 1 aktie från {other} för {amount:.0f}kr. ({issued}/{max} utestående)",
+        "rent_halved": "{player} är i kris — hyran halveras: {amount}kr (var {rent}kr).",
+        "dividend": "  {player} fick {amount}kr i utdelning ({count} aktie i {other}).",
+        "dividend_many": "  {player} fick {amount}kr i utdelning ({count} aktier i {other}).",
+        "rent_collected": "{player} tog in {amount}kr i hyra.",
+        "rent_collected_split": "{player} tog in {amount}kr i hyra ({dividends}kr till aktieägare, {kept}kr behålls).",
+        "insurance_covered": "  Försäkring #{contract} täckte {amount}kr (betalt av {other}).",
+        "rent_paid": "{player} betalade {amount}kr i hyra.",
+        "rent_paid_insured": "{player} betalade {amount}kr i hyra ({covered}kr från försäkring, {paid}kr ur egen ficka).",
+        "bank_loan": "{player} tog ett banklån: {amount}kr (återbetala {remaining}kr, {rate:.0%}).",
+        "bank_loan_repaid": "{player} betalade av banklånet helt: {amount}kr.",
+        "bank_loan_partial": "{player} amorterade på banklånet: {amount}kr ({remaining}kr kvar).",
+        "bank_loan_restructured": "{player} omstrukturerade banklånet: {old}kr -> {remaining}kr (+20%, ränteklockan nollställd).",
+        "player_loan": "{player} lånade ut {amount}kr till {other} mot {rate}% (återbetala {remaining}kr).",
+        "player_loan_repaid": "{player} betalade tillbaka hela lånet till {other}: {amount}kr.",
+        "player_loan_partial": "{player} amorterade till {other}: {amount}kr ({remaining}kr kvar).",
+        "insurance_created": "Försäkring: {other} försäkrar {player} — premie {premium}kr/runda, täckning upp till {amount}kr.",
+        "insurance_exhausted": "Försäkring #{contract} är förbrukad.",
+        "insurance_claimed": "{player} fick {amount}kr från försäkring #{contract} (betalt av {other}). {left}kr täckning kvar.",
+        "insurance_cancelled": "Försäkring #{contract} avbruten av {player}.",
+        "insurance_renegotiated": "Försäkring #{contract} omförhandlad -> nya villkor.",
+        "money_transferred": "{player} betalade {other} {amount}kr.",
+        "balance_received": "{player} fick {amount}kr.",
+        "balance_paid": "{player} betalade {amount}kr.",
+        "eliminated": "{player} gick i konkurs en andra gång — UTSLAGEN!",
+        "winner": "── {player} VINNER SPELET! ──",
+        "distressed": "{player} kunde inte betala — i KRIS i {rounds} rundor (hyresintäkter halveras). "
+                      "Nästa gång innebär utslagning.",
+        "shares_worthless": "  {other}s {count} aktie(r) i {player} är nu värdelösa.",
+        "shares_voided": "  {player}s {count} aktie(r) i {other} makulerade (platser lediga).",
+        "loan_forgiven": "  {other}s lån från {player} ({amount}kr) efterskänks.",
+        "loan_lost": "  {other} förlorade {amount}kr utlånat till {player}.",
+        "bank_write_off": "  Banken skrev av {amount}kr i lån till {player}.",
+        "properties_to_auction": "  {player}s gator ({streets}) går till auktion.",
+        "distress_recovered": "{player} är inte längre i kris!",
+        "distress_continues": "{player} är fortfarande i kris ({rounds} rundor kvar).",
+        "premium_deferred": "{player} är i kris — premien för försäkring #{contract} skjuts upp.",
+        "premium_paid": "{player} betalade {amount}kr i premie till {other}.",
+        "premium_lapsed": "{player} missade 2 premier — försäkring #{contract} UPPHÖR!",
+        "premium_missed": "VARNING: {player} missade premien för #{contract} (1 runda nåd — betala nästa runda annars upphör den).",
+        "bank_interest": "{player}s banklån växte med {amount}kr (skuld {remaining}kr).",
+        "bank_interest_capped": "{player}s banklån växte med {amount}kr (skuld {remaining}kr) (TAK NÅTT).",
+        "loan_interest": "{player}s lån från {other} växte med {amount}kr (skuld {remaining}kr).",
+        "loan_interest_capped": "{player}s lån från {other} växte med {amount}kr (skuld {remaining}kr) (TAK NÅTT).",
+        "interest_frozen": "{player} är i kris — låneräntan fryses denna runda.",
+        "market_round": "── Marknadsrunda {r} ({interest} räntedebiteringar, {premiums} premier) ──",
+    },
+}
+
+# Events the market-round summary counts
+INTEREST_EVENTS = frozenset({"bank_interest", "bank_interest_capped", "loan_interest", "loan_interest_capped"})
+PREMIUM_EVENTS = frozenset({"premium_deferred", "premium_paid", "premium_lapsed", "premium_missed"})
+
+
+def event(event_type, round_no, **fields):
+    return {"e": event_type, "r": round_no, **fields}
+
+
+def render(record, lang="en"):
+    """Text for one log record."""
+    templates = TEMPLATES.get(lang, TEMPLATES["en"])
+    template = templates.get(record["e"]) or TEMPLATES["en"][record["e"]]
+    fields = {k: ", ".join(v) if isinstance(v, list) else v for k, v in record.items()}
+    return template.format(**fields)
+
+
+def render_all(records, lang="en"):
+    return [render(r, lang) for r in records]
@@ -1,6 +1,7 @@
 import os
 import config
 import player_settings as settings
+import simulation
 
 clear = lambda: os.system('cls')
 
@@ -48,6 +49,26 @@ class MonopolyApp():
     def start_game(self):
         clear()
         game_mode = self.query_type()
+        if game_mode == "2":
+            self.complete_game()
+
+    def complete_game(self):
+        """Plays a whole game between bots and prints the outcome."""
+        try:
+            sim = simulation.Simulation(self.Monop.names)
+        except ValueError as e:
+            print(e)
+            return
+        result = sim.run()
+        clear()
+        if result["decided"]:
+            print(f"{result['winner']} won after {result['rounds']} rounds ({result['turns']} turns).")
+        else:
+            print(f"No one went bankrupt in {result['rounds']} rounds. {result['winner']} has the highest net worth.")
+        ranked = sorted(result["players"].items(), key=lambda item: item[1]["net_worth"], reverse=True)
+        for name, stats in ranked:
+            status = "eliminated" if stats["eliminated_round"] is not None else f"{stats['net_worth']:.0f}kr"
+            print(f"  {name}: {status}, {stats['properties']} streets")
 
     def query_type(self):
         while True:
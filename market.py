@@ -1,10 +1,238 @@
+import heapq
+from collections import deque
+
+
 class MarketHandler:
     """Class for managing the Stockmarket class and Insurance_company"""
 
     def __init__(self):
         pass
 
+
+class Order:
+    """A limit order for shares in one player-company."""
+    __slots__ = ("id", "trader", "company", "side", "price", "quantity", "remaining")
+
+    def __init__(self, order_id, trader, company, side, price, quantity, remaining=None):
+        self.id = order_id              # also the time priority: lower id = earlier
+        self.trader = trader            # player name
+        self.company = company          # player name whose shares are traded
+        self.side = side                # "buy" | "sell"
+        self.price = price              # limit, kr per share
+        self.quantity = quantity
+        self.remaining = quantity if remaining is None else remaining
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "trader": self.trader,
+            "company": self.company,
+            "side": self.side,
+            "price": self.price,
+            "quantity": self.quantity,
+            "remaining": self.remaining,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["id"], d["trader"], d["company"], d["side"], d["price"], d["quantity"], d["remaining"])
+
+
 class Stockmarket:
+    """Limit order book per company, matched by price-time priority.
 
-    def __init__(self, players):
-        pass
+    Each company has a bid heap (-price, id) and an ask heap (price, id).
+    Cancelled and filled orders are left in the heaps and skipped when they
+    reach the top; once a heap's dead entries outnumber its live ones it is
+    rebuilt, so placing and cancelling stay O(log n) amortized and a heap is
+    never more than twice its open orders.
+    Trades execute at the resting order's price. The book only matches; the
+    caller settles cash and shares for the fills it gets back.
+    """
+
+    def __init__(self, trade_history=50):
+        self.orders = {}            # {order id: Order} — open orders only
+        self._bids = {}             # {company: [(-price, id, order)]}
+        self._asks = {}             # {company: [(price, id, order)]}
+        self._by_trader = {}        # {trader: {order id: Order}}
+        self._dead = {}             # {(side, company): closed orders still in that heap}
+        self.last_price = {}        # {company: price of the latest trade}
+        self.trades = deque(maxlen=trade_history)   # recent fills, oldest first
+        self._next_id = 0
+
+    # ── Orders ──
+
+    def place(self, trader, company, side, price, quantity, can_fill=None):
+        """Add a limit order and match it. Returns (order, fills).
+
+        can_fill(resting, taker, quantity, price) is asked before each fill;
+        a resting order it rejects is cancelled and matching moves on. Each
+        fill is a dict {company, buyer, seller, price, quantity, buy_id, sell_id}.
+        """
+        self._next_id += 1
+        order = Order(self._next_id, trader, company, side, price, quantity)
+        fills = []
+        opposite = self._asks if side == "buy" else self._bids
+        heap = opposite.get(company, [])
+        while order.remaining and heap:
+            resting = self._top(heap)
+            if resting is None:
+                break
+            if (side == "buy" and resting.price > price) or (side == "sell" and resting.price < price):
+                break
+            qty = min(order.remaining, resting.remaining)
+            if can_fill and not can_fill(resting, order, qty, resting.price):
+                self.cancel(resting.id)
+                continue
+            fill = self._fill(order, resting, qty)
+            fills.append(fill)
+        if order.remaining:
+            self._rest(order)
+        return order, fills
+
+    def cancel(self, order_id):
+        """Remove an open order. Returns it, or None if it isn't open."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        mine = self._by_trader[order.trader]
+        del mine[order_id]
+        if not mine:
+            del self._by_trader[order.trader]
+        self._bury(order)
+        return order
+
+    def cancel_all(self, trader=None, company=None):
+        """Cancel every open order by trader and/or for company."""
+        if trader is not None:
+            doomed = list(self._by_trader.get(trader, {}).values())
+        else:
+            doomed = list(self.orders.values())
+        cancelled = [o for o in doomed if company is None or o.company == company]
+        for order in cancelled:
+            self.cancel(order.id)
+        if company is not None and trader is None:
+            self._bids.pop(company, None)
+            self._asks.pop(company, None)
+            self._dead.pop(("buy", company), None)
+            self._dead.pop(("sell", company), None)
+        return cancelled
+
+    def own_cross(self, trader, company, side, price):
+        """trader's open order that an order (side, price) for company would trade with, or None."""
+        for order in self._by_trader.get(trader, {}).values():
+            if order.company == company and order.side != side and (
+                order.price <= price if side == "buy" else order.price >= price
+            ):
+                return order
+        return None
+
+    def orders_of(self, trader):
+        return list(self._by_trader.get(trader, {}).values())
+
+    def committed(self, trader, side, company=None):
+        """Open (shares, cash) a trader has on one side, optionally for one company."""
+        shares = cash = 0
+        for order in self._by_trader.get(trader, {}).values():
+            if order.side == side and (company is None or order.company == company):
+                shares += order.remaining
+                cash += order.remaining * order.price
+        return shares, cash
+
+    # ── Prices ──
+
+    def best_bid(self, company):
+        top = self._top(self._bids.get(company, []))
+        return top.price if top else None
+
+    def best_ask(self, company):
+        top = self._top(self._asks.get(company, []))
+        return top.price if top else None
+
+    def depth(self, company, levels=5):
+        """{"bids": [[price, shares]], "asks": [[price, shares]]}, best first."""
+        out = {}
+        for side, heap, best_first in (("bids", self._bids, True), ("asks", self._asks, False)):
+            book = {}
+            for _, _, order in heap.get(company, []):
+                if order.id in self.orders:
+                    book[order.price] = book.get(order.price, 0) + order.remaining
+            out[side] = [[p, book[p]] for p in sorted(book, reverse=best_first)[:levels]]
+        return out
+
+    def companies(self):
+        """Companies with open orders or a trade price."""
+        live = {o.company for o in self.orders.values()}
+        return sorted(live | set(self.last_price))
+
+    # ── Internals ──
+
+    def _top(self, heap):
+        """Best live order on a heap, dropping dead entries on the way."""
+        while heap:
+            order = heap[0][2]
+            if order.id in self.orders:
+                return order
+            heapq.heappop(heap)
+            self._dead[order.side, order.company] -= 1
+        return None
+
+    def _bury(self, order):
+        """Count a closed order's heap entry as dead; compact the heap once most entries are."""
+        heap = (self._bids if order.side == "buy" else self._asks).get(order.company)
+        if heap is None:
+            return
+        key = (order.side, order.company)
+        dead = self._dead.get(key, 0) + 1
+        if dead * 2 > len(heap):
+            heap[:] = [entry for entry in heap if entry[2].id in self.orders]
+            heapq.heapify(heap)
+            dead = 0
+        self._dead[key] = dead
+
+    def _rest(self, order):
+        self.orders[order.id] = order
+        self._by_trader.setdefault(order.trader, {})[order.id] = order
+        if order.side == "buy":
+            heapq.heappush(self._bids.setdefault(order.company, []), (-order.price, order.id, order))
+        else:
+            heapq.heappush(self._asks.setdefault(order.company, []), (order.price, order.id, order))
+
+    def _fill(self, taker, resting, qty):
+        taker.remaining -= qty
+        resting.remaining -= qty
+        if not resting.remaining:
+            self.cancel(resting.id)
+        buy, sell = (taker, resting) if taker.side == "buy" else (resting, taker)
+        fill = {
+            "company": taker.company,
+            "buyer": buy.trader,
+            "seller": sell.trader,
+            "price": resting.price,
+            "quantity": qty,
+            "buy_id": buy.id,
+            "sell_id": sell.id,
+        }
+        self.last_price[taker.company] = resting.price
+        self.trades.append(fill)
+        return fill
+
+    # ── Persistence ──
+
+    def dump(self):
+        return {
+            "next_id": self._next_id,
+            "orders": [o.to_dict() for o in sorted(self.orders.values(), key=lambda o: o.id)],
+            "last_price": dict(self.last_price),
+            "trades": list(self.trades),
+        }
+
+    @classmethod
+    def load(cls, data):
+        market = cls()
+        market._next_id = data["next_id"]
+        for d in data["orders"]:
+            market._rest(Order.from_dict(d))
+        market.last_price = dict(data["last_price"])
+        market.trades.extend(data["trades"])
+        return market
@@ -0,0 +1,288 @@
+"""Columnar market round: the same rules as Game.market_round's loop, as array ops.
+
+Loan balances, caps and rates and the insurance contracts are kept in numpy
+columns (a Table, held by the game as Game.market_table) from one round to
+the next. Game marks a player stale whenever their loans change (see
+Game._loans_changed) and only that player's rows are read again; contracts
+are re-read when the insurance book's revision moves. A round is then a few
+array operations over every row, plus Python work only for what it changes:
+capped loans, and loans whose interest truncates to 0, cost nothing.
+
+Events come out in the same order as the per-player loop, so logs match.
+Premiums are the one order-dependent step (an insurer may receive a premium
+before paying their own). When every paying player can cover all their
+premiums from their opening balance the outcome doesn't depend on order and
+is applied in one go; otherwise that step follows the loop contract by
+contract. Loans with a non-integer balance or amount leave the round to the
+loop (run() returns False), since the array maths would round differently.
+
+numpy is optional: without it (or for small tables, see the "market" settings)
+Game uses the plain loop.
+"""
+import functools
+import itertools
+
+import log_events
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional speed-up
+    np = None
+
+
+def available():
+    return np is not None
+
+
+def table_rows(game):
+    """Rows a round touches: contracts plus bank and player loans."""
+    return len(game.insurance) + sum(
+        len(p.bank_loans) + len(p.player_loans_taken) for p in game.players
+    )
+
+
+class _Loans:
+    """One kind of loan as flat columns, in the loop's order (by borrower seat, then loan order).
+
+    Each borrower's rows are a segment of the columns. A stale borrower's
+    segment is read again from their loan objects and the columns re-joined;
+    other segments are kept as they are.
+    """
+
+    def __init__(self, loans_of):
+        self.loans_of = loans_of    # player -> their loans of this kind, in loop order
+        self.segments = []          # per seat: (loans, remaining, cap, rate, exact), None when stale
+        self.loans = []             # loan object per row
+        self.owner = None           # seat per row
+        self.remaining = self.cap = self.rate = None
+        self.exact = True           # every balance and amount is an int
+
+    def refresh(self, players, stale):
+        segments = self.segments
+        segments.extend([None] * (len(players) - len(segments)))
+        for i in stale:
+            segments[i] = None
+        if self.owner is not None and None not in segments:
+            return
+        for i, segment in enumerate(segments):
+            if segment is None:
+                segments[i] = self._read(players[i])
+        self._join()
+
+    def _read(self, player):
+        loans = list(self.loans_of(player))
+        remaining = [l.remaining for l in loans]
+        amount = [l.amount for l in loans]
+        exact = all(type(v) is int for v in itertools.chain(remaining, amount))
+        return (
+            loans,
+            np.array(remaining if exact else [], np.int64),
+            np.array(amount if exact else [], np.int64) * 2,
+            np.array([l.interest_rate for l in loans] if exact else [], float),
+            exact,
+        )
+
+    def _join(self):
+        segments = self.segments
+        self.exact = all(s[4] for s in segments)
+        if not self.exact:
+            self.owner = None   # read again once the odd figure is gone
+            return
+        self.loans = list(itertools.chain.from_iterable(s[0] for s in segments))
+        sizes = [len(s[0]) for s in segments]
+        self.owner = np.repeat(np.arange(len(segments)), sizes)
+        self.remaining = np.concatenate([s[1] for s in segments])
+        self.cap = np.concatenate([s[2] for s in segments])
+        self.rate = np.concatenate([s[3] for s in segments])
+        # Segments become views of the columns, so writes to the columns keep them current
+        start = 0
+        for i, (size, segment) in enumerate(zip(sizes, segments)):
+            end = start + size
+            segments[i] = (segment[0], self.remaining[start:end], self.cap[start:end], self.rate[start:end], True)
+            start = end
+
+
+class Table:
+    """A game's market-round columns, kept between rounds."""
+
+    def __init__(self):
+        self.stale = set()      # names of players whose loans changed since their rows were read
+        self.bank = _Loans(lambda p: p.bank_loans)
+        self.player = _Loans(lambda p: p.player_loans_taken.values())
+        self.revision = None    # insurance book revision the contract columns were read at
+        self.contracts = []
+        self.insured = self.insurer = self.premium = None
+        self.whole_premiums = True
+
+    def refresh(self, game):
+        """Bring stale rows up to date. False if a loan figure isn't an int."""
+        players = game.players
+        stale = [i for i, p in enumerate(players) if p.name in self.stale] if self.stale else ()
+        self.stale.clear()
+        self.bank.refresh(players, stale)
+        self.player.refresh(players, stale)
+
+        book = game.insurance
+        if self.revision != book.revision:
+            index = {p.name: i for i, p in enumerate(players)}
+            self.contracts = [c for p in players for c in book.for_insured(p.name)]
+            self.insured = np.fromiter((index[c.insured] for c in self.contracts), np.int64, len(self.contracts))
+            self.insurer = np.fromiter((index.get(c.insurer, -1) for c in self.contracts), np.int64,
+                                       len(self.contracts))
+            premiums = [c.premium_per_round for c in self.contracts]
+            self.whole_premiums = all(type(p) is int for p in premiums)
+            self.premium = np.array(premiums, np.int64 if self.whole_premiums else float)
+            self.revision = book.revision
+        return self.bank.exact and self.player.exact
+
+
+def run(game, events):
+    """Apply one market round's distress, premium and interest steps to game.
+
+    Log records are appended to events in the loop engine's order. Returns
+    False, having changed nothing, when the round must go to the loop.
+    """
+    players = game.players
+    n = len(players)
+    if n == 0:
+        return True
+    table = game.market_table
+    if table is None:
+        table = game.market_table = Table()
+    if not table.refresh(game):
+        return False
+    event = functools.partial(log_events.event, round_no=game.current_round)
+    active = np.fromiter((not p.eliminated for p in players), bool, n)
+    distressed = np.fromiter((p.distressed for p in players), bool, n)
+    rounds_left = np.fromiter((p.distress_rounds_left for p in players), np.int64, n)
+
+    # 0) Distress countdowns
+    ticking = active & distressed
+    rounds_left[ticking] -= 1
+    recovered = ticking & (rounds_left <= 0)
+    distressed &= ~recovered
+    for i in np.flatnonzero(ticking).tolist():
+        player = players[i]
+        player.distress_rounds_left = int(rounds_left[i])
+        if recovered[i]:
+            player.distressed = False
+            player.changed()
+            events.append(event("distress_recovered", player=player.name))
+        else:
+            events.append(event("distress_continues", player=player.name, rounds=player.distress_rounds_left))
+
+    per_player = [[] for _ in range(n)]   # events buffered to keep per-player order
+
+    _premiums(game, table, players, active, distressed, per_player, event)
+    paying = active & ~distressed
+    _bank_interest(table.bank, players, paying, per_player, event)
+    _player_loan_interest(table.player, players, paying, per_player, event)
+    for i in np.flatnonzero(active & distressed).tolist():
+        per_player[i].append(event("interest_frozen", player=players[i].name))
+
+    for records in per_player:
+        events.extend(records)
+    return True
+
+
+def _premiums(game, table, players, active, distressed, per_player, event):
+    if not table.contracts:
+        return
+    insured, insurer, premium = table.insured, table.insurer, table.premium
+    live = np.flatnonzero(active[insured])      # the loop skips eliminated players' contracts
+    if not live.size:
+        return
+    deferred = distressed[insured[live]]
+    due = live[~deferred]
+    payers = insured[due]
+    owed = np.bincount(payers, weights=premium[due], minlength=len(players))
+    to_insurer = due[insurer[due] >= 0]
+    received = np.bincount(insurer[to_insurer], weights=premium[to_insurer], minlength=len(players))
+    moved = np.flatnonzero((owed > 0) | (received > 0)).tolist()
+    balances = {i: players[i].balance for i in moved}
+    if table.whole_premiums and all(type(b) is int for b in balances.values()) and all(
+            owed[i] <= balances[i] for i in np.unique(payers).tolist()):
+        paid = np.ones(due.size, bool)
+        for i in moved:
+            players[i].balance = balances[i] - int(owed[i]) + int(received[i])
+    else:
+        paid = np.zeros(due.size, bool)
+        for j, k in enumerate(due.tolist()):
+            payer, amount = players[insured[k]], table.contracts[k].premium_per_round
+            if payer.balance >= amount:
+                payer.balance -= amount
+                if insurer[k] >= 0:
+                    players[insurer[k]].balance += amount
+                paid[j] = True
+
+    outcome = np.zeros(len(table.contracts), np.int8)     # 0 deferred, 1 paid, 2 not paid
+    outcome[due] = np.where(paid, 1, 2)
+    contracts = table.contracts
+    for k, i, result in zip(live.tolist(), insured[live].tolist(), outcome[live].tolist()):
+        c = contracts[k]
+        if result == 0:
+            per_player[i].append(event("premium_deferred", player=c.insured, contract=c.id))
+        elif result == 1:
+            c.missed_payments = 0
+            per_player[i].append(
+                event("premium_paid", player=c.insured, amount=c.premium_per_round, other=c.insurer)
+            )
+        else:
+            c.missed_payments += 1
+            if c.missed_payments >= 2:
+                game.insurance.deactivate(c)
+                per_player[i].append(event("premium_lapsed", player=c.insured, contract=c.id))
+            else:
+                per_player[i].append(event("premium_missed", player=c.insured, contract=c.id))
+
+
+def _bank_interest(rows, players, paying, per_player, event):
+    """5% compounding on bank loans, capped at twice the amount."""
+    if not rows.loans:
+        return
+    remaining, cap = rows.remaining, rows.cap
+    picked = np.flatnonzero(paying[rows.owner] & (remaining < cap))
+    if not picked.size:
+        return
+    owner = rows.owner[picked]
+    for i in np.unique(owner).tolist():
+        players[i].changed()
+    interest = (remaining[picked] * 0.05).astype(np.int64)
+    grown = np.minimum(remaining[picked] + interest, cap[picked])
+    remaining[picked] = grown
+    step = interest > 0     # a step that truncates to 0 leaves the loan as it was
+    loans = rows.loans
+    for k, i, added, new, capped in zip(picked[step].tolist(), owner[step].tolist(), interest[step].tolist(),
+                                        grown[step].tolist(), (grown[step] >= cap[picked[step]]).tolist()):
+        loans[k].remaining = new
+        per_player[i].append(event(
+            "bank_interest_capped" if capped else "bank_interest",
+            player=players[i].name, amount=added, remaining=new,
+        ))
+
+
+def _player_loan_interest(rows, players, paying, per_player, event):
+    """Player loans compound at a tenth of their rate, capped at twice the amount."""
+    if not rows.loans:
+        return
+    remaining, cap, rate = rows.remaining, rows.cap, rows.rate
+    picked = np.flatnonzero(paying[rows.owner] & (rate > 0) & (remaining < cap))
+    # Same float steps as int(remaining * rate / 100 * 0.1) on Python numbers
+    compound = (remaining[picked] * rate[picked] / 100 * 0.1).astype(np.int64)
+    picked, compound = picked[compound > 0], compound[compound > 0]
+    if not picked.size:
+        return
+    grown = np.minimum(remaining[picked] + compound, cap[picked])
+    remaining[picked] = grown
+    owner = rows.owner[picked]
+    for i in np.unique(owner).tolist():
+        players[i].changed()
+    loans = rows.loans
+    for k, i, added, new, capped in zip(picked.tolist(), owner.tolist(), compound.tolist(), grown.tolist(),
+                                        (grown >= cap[picked]).tolist()):
+        loan = loans[k]
+        loan.remaining = new  # the lender's view is the same object
+        per_player[i].append(event(
+            "loan_interest_capped" if capped else "loan_interest",
+            player=players[i].name, other=loan.lender, amount=added, remaining=new,
+        ))
@@ -13,4 +13,52 @@ settings = {
         "rent_penalty": 0.50,  # halves rent income
         "duration_rounds": 2,  # 2 rounds of distressed status
     },
+    "storage": {
+        "directory": "saved_games",  # journals + snapshots per game; None disables persistence
+        "snapshot_every": 50,  # journal events between compact snapshots
+        "fsync": False,  # fsync every journal write (slower, survives power loss)
+    },
+    "registry": {
+        "idle_ttl": 6 * 3600,  # seconds without activity before a game is evicted from memory
+        "max_games": 1000,  # LRU cap on games held in memory
+        "memory_budget_mb": 512,  # approximate cap on memory used by all games, checked by the sweep
+        "spill_to_disk": True,  # evicted games are snapshotted and resumed on next access
+        "sweep_interval": 60,  # seconds between background sweeps
+    },
+    "history": {
+        "recent": 200,  # log / transaction entries kept uncompressed per game
+        "chunk_size": 500,  # older entries are compressed in chunks of this many
+        "language": "en",  # game log language sent to clients: "en" or "sv"
+    },
+    "market": {
+        "engine": "auto",  # "loop", "columnar" (needs numpy) or "auto": columnar for big tables
+        "columnar_min_rows": 500,  # contracts + loans at which "auto" switches to columnar
+    },
+    "valuation": {
+        "engine": "fundamental",  # share price engine: "fundamental" or "formula" (property + 10% of cash)
+        "horizon_turns": 60,  # opponent turns of expected rent counted in a company's value
+        "cash_weight": 0.1,  # share of net cash (balance minus debt) counted; net debt counts in full
+        "distress_discount": 0.5,  # value cut while distressed
+    },
+    "projection": {
+        "rounds": 10,  # market rounds of projected debt in each player's state
+        "max_rounds": 200,  # longest projection /api/loan_projection returns
+    },
+    "risk": {
+        "rounds": 10,  # market rounds ahead in each player's default / elimination forecast
+        "paths": 500,  # Monte Carlo futures per forecast (needs numpy; 5-8 ms for 5 players)
+        "seed": 0,  # fixed, so the same state always gives the same forecast
+    },
+    "simulation": {
+        "max_rounds": 100,  # market rounds (passes of Start) before a headless game is called on net worth
+        "jail_fine": 1000,
+        "cash_reserve": 2000,  # bots keep this much cash after buying a street or house
+        "houses_per_turn": 3,
+        "trade_premium": 2.0,  # multiple of the list price a bot pays for the last street of a group
+        "max_bank_loans": 3,  # open bank loans a bot takes before asking other players
+        "loan_rate": 20,  # % bots charge each other on player loans
+        "insurance_cover": 5000,  # coverage a bot buys once it owns a street
+        "insurance_rate": 0.05,  # premium per round as a share of coverage
+        "share_budget": 0.25,  # share of cash above the reserve a bot puts into one share
+    },
 }
@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# What a corrupt or unreadable journal raises on restore
+RESTORE_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError)
+
+
+class GameRegistry:
+    """Games by code, with idle-TTL / LRU eviction and a memory budget.
+
+    max_games is enforced as games are added or restored; idle games and the
+    memory budget are handled by sweep(), which the server runs in the background.
+
+    Behaves like the plain dict it replaces (in, get, [], []=). Evicted games
+    that have a journal are snapshotted and "spilled": they stay listed and are
+    restored through `loader` on next access. With spill_to_disk off (or no
+    journal) an evicted game is gone for good. A game whose restore fails is
+    logged and quarantined: it stays on disk, its id stays taken, and it
+    reads as missing.
+    """
+
+    def __init__(self, loader=None, idle_ttl=None, max_games=None, memory_budget=None,
+                 spill_to_disk=True, clock=time.monotonic):
+        self._games = OrderedDict()     # in memory, least recently used first
+        self._last_used = {}            # {game_id: clock()}
+        self._spilled = set()           # on disk only, restored on access
+        self._loading = {}              # {game_id: Lock} held while that game is restored
+        self.quarantined = {}           # {game_id: restore error} — never retried
+        self._sizes = {}                # {game_id: (version, approx bytes)}
+        self._loader = loader           # game_id -> Game
+        self._lock = threading.RLock()
+        self.idle_ttl = idle_ttl
+        self.max_games = max_games
+        self.memory_budget = memory_budget
+        self.spill_to_disk = spill_to_disk
+        self.clock = clock
+
+    def __contains__(self, game_id):
+        with self._lock:
+            return game_id in self._games or game_id in self._spilled or game_id in self.quarantined
+
+    def __len__(self):
+        with self._lock:
+            return len(self._games) + len(self._spilled)
+
+    def get(self, game_id, default=None):
+        with self._lock:
+            game = self._touch(game_id)
+            if game is not None or game_id not in self._spilled or not self._loader:
+                return default if game is None else game
+            loading = self._loading.setdefault(game_id, threading.Lock())
+        # Restore outside the registry lock: a slow restore only holds up its own game
+        with loading:
+            with self._lock:
+                game = self._touch(game_id)   # restored by whoever held `loading` before us
+                if game is not None or game_id not in self._spilled:
+                    return default if game is None else game
+            try:
+                game = self._loader(game_id)
+            except RESTORE_ERRORS as e:
+                log.warning("Could not restore game %s: %s", game_id, e)
+                with self._lock:
+                    self._spilled.discard(game_id)
+                    self._loading.pop(game_id, None)
+                    self.quarantined[game_id] = str(e)
+                return default
+            with self._lock:
+                self._spilled.discard(game_id)
+                self._loading.pop(game_id, None)
+                self._games[game_id] = game
+                self._touch(game_id)
+        self._enforce_limits(keep=game_id)
+        return game
+
+    def _touch(self, game_id):
+        """The in-memory game, marked most recently used, or None. Call with _lock held."""
+        game = self._games.get(game_id)
+        if game is not None:
+            self._games.move_to_end(game_id)
+            self._last_used[game_id] = self.clock()
+        return game
+
+    def __getitem__(self, game_id):
+        game = self.get(game_id)
+        if game is None:
+            raise KeyError(game_id)
+        return game
+
+    def __setitem__(self, game_id, game):
+        with self._lock:
+            self._spilled.discard(game_id)
+            self._games[game_id] = game
+            self._games.move_to_end(game_id)
+            self._last_used[game_id] = self.clock()
+        self._enforce_limits(keep=game_id)
+
+    def add_spilled(self, game_id):
+        """Register a game that lives on disk until first accessed."""
+        with self._lock:
+            if game_id not in self._games:
+                self._spilled.add(game_id)
+
+    def in_memory(self):
+        with self._lock:
+            return list(self._games)
+
+    # ── Eviction ──────────────────────────────────────────────────────
+
+    def evict(self, game_id):
+        """Drop a game from memory, spilling it to its journal if allowed."""
+        with self._lock:
+            game = self._games.pop(game_id, None)
+            self._last_used.pop(game_id, None)
+            self._sizes.pop(game_id, None)
+        if game is None:
+            return
+        with game.lock:  # let an in-flight mutation finish first
+            journal = game.journal
+            if journal is None:
+                return
+            if self.spill_to_disk:
+                journal.write_snapshot(game.version, game.dump_state())
+                journal.close()
+                with self._lock:
+                    if game_id not in self._games:
+                        self._spilled.add(game_id)
+            else:
+                journal.delete()
+
+    def approx_size(self, game_id, game):
+        """game.approx_size(), recomputed only when the game's version changed."""
+        cached = self._sizes.get(game_id)
+        if cached and cached[0] == game.version:
+            return cached[1]
+        size = game.approx_size()
+        self._sizes[game_id] = (game.version, size)
+        return size
+
+    def memory_used(self):
+        with self._lock:
+            items = list(self._games.items())
+        return sum(self.approx_size(gid, g) for gid, g in items)
+
+    def sweep(self):
+        """Evict idle games, then enforce max_games and the memory budget."""
+        if self.idle_ttl is not None:
+            cutoff = self.clock() - self.idle_ttl
+            with self._lock:
+                idle = [gid for gid in self._games if self._last_used.get(gid, 0) < cutoff]
+            for game_id in idle:
+                self.evict(game_id)
+        self._enforce_limits(memory=True)
+
+    def _enforce_limits(self, keep=None, memory=False):
+        """Evict least recently used games over max_games, and over the memory
+        budget when `memory` is set. Measuring memory serializes every changed
+        game, so only the background sweep does it."""
+        while True:
+            with self._lock:
+                victims = [gid for gid in self._games if gid != keep]
+                over_count = self.max_games is not None and len(self._games) > self.max_games
+            over_memory = (
+                memory and self.memory_budget is not None and victims
+                and self.memory_used() > self.memory_budget
+            )
+            if not victims or not (over_count or over_memory):
+                return
+            self.evict(victims[0])  # least recently used
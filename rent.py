@@ -0,0 +1,68 @@
+"""Rent from config.streets' "Hyra" tables, compiled to flat lookups at import.
+
+Each street owns SLOTS consecutive entries of RENT, starting at
+street.order * SLOTS:
+
+- colour groups: slot 0 unimproved, 1-5 houses (5 = hotel), 6 complete group
+- stations: slot n = rent with n stations owned
+- utilities: slot n = kr per pip of the dice total with n utilities owned
+  (config has lambdas of the dice total; they are resolved to multipliers here)
+
+rent() is then a couple of tuple lookups, whatever the street.
+"""
+import street_catalog
+
+SLOTS = 7
+COMPLETE = 6
+COLOUR, STATION, UTILITY = 0, 1, 2
+
+
+def _compile():
+    kinds, group_sizes, table = [], [], []
+    for street in street_catalog.STREETS.values():   # street.order is the position here
+        row = [0] * SLOTS
+        if street.house_price is not None:
+            kind = COLOUR
+            row[0] = street.rent["Inga"]
+            row[COMPLETE] = street.rent["Alla"]
+            for houses in range(1, 6):
+                row[houses] = street.rent[houses]
+        elif any(callable(r) for r in street.rent.values()):
+            kind = UTILITY
+            for owned, per_roll in street.rent.items():
+                multiplier = per_roll(1)
+                if any(per_roll(total) != total * multiplier for total in range(2, 13)):
+                    raise ValueError(f"{street.name}: utility rent isn't a multiple of the dice total")
+                row[owned] = multiplier
+        else:
+            kind = STATION
+            for owned, amount in street.rent.items():
+                row[owned] = amount
+        kinds.append(kind)
+        group_sizes.append(len(street_catalog.GROUPS[street.group]))
+        table.extend(row)
+    return tuple(kinds), tuple(group_sizes), tuple(table)
+
+
+KIND, GROUP_SIZE, RENT = _compile()
+
+
+def rent(order, owned_in_group, houses=0, dice_total=0):
+    """Rent for landing on the street with this order, in constant time.
+
+    owned_in_group is how many streets of its group the owner has; dice_total
+    only matters for utilities.
+    """
+    base = order * SLOTS
+    kind = KIND[order]
+    if kind == COLOUR:
+        if houses:
+            return RENT[base + houses]
+        return RENT[base + COMPLETE] if owned_in_group == GROUP_SIZE[order] else RENT[base]
+    if kind == STATION:
+        return RENT[base + owned_in_group]
+    return RENT[base + owned_in_group] * dice_total
+
+
+def rent_for(street_name, owned_in_group, houses=0, dice_total=0):
+    return rent(street_catalog.STREETS[street_name].order, owned_in_group, houses, dice_total)
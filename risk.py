@@ -0,0 +1,233 @@
+"""Chance that each player defaults, or is eliminated, within the next market rounds.
+
+A Monte Carlo over `paths` futures of the whole table, run as numpy arrays
+shaped (paths, players). Between two market rounds:
+
+- each player lands a Poisson number of times (board_model's landing
+  frequencies; a round comes each time anyone passes Start, so more players
+  means fewer moves each per round) and pays the square's rent (rent.py, with
+  the owner's houses and groups as they are now) or tax;
+- rent is halved for a distressed owner and split with shareholders, and the
+  payer's insurance covers it while coverage lasts;
+- one player passes Start and draws the salary.
+
+A player whose cash plus what their houses sell back for goes below zero
+defaults, as in enter_distress: distressed for distress.duration_rounds, or
+eliminated if they have defaulted before. The unpaid part is written off.
+Then the market round: distress countdowns and premiums. Loan balances follow
+loan_projection; they add no cash flow (loans have no repayment schedule)
+but count against net worth, which is the "insolvent" figure.
+
+New borrowing is not modelled, so a high default chance reads as "will need
+credit". The forecast is seeded, so the same state gives the same figures.
+
+numpy is optional: without it forecast() returns None.
+"""
+import board_model
+import loan_projection
+import player_settings as psettings
+import rent
+import street_catalog
+from location_data import location
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional speed-up
+    np = None
+
+S = psettings.settings
+
+SALARY = location[0]["Start"]
+TAXES = {pos: sq["Skatt"] for pos, sq in location.items() if "Skatt" in sq}
+
+
+def available():
+    return np is not None
+
+
+class Table:
+    """The figures a forecast needs, taken from a game's active players.
+
+    lend() and insure() add a deal that hasn't been signed, for what-if forecasts.
+    """
+
+    def __init__(self, game):
+        players = [p for p in game.players if not p.eliminated]
+        self.names = [p.name for p in players]
+        index = {name: i for i, name in enumerate(self.names)}
+        self.index = index
+        self.balance = [p.balance for p in players]
+        self.net_worth = [p.net_worth for p in players]
+        self.resale = [sum(n * street_catalog.get(s).house_price // 2 for s, n in p.houses.items())
+                       for p in players]
+        self.defaults = [p.defaults for p in players]
+        self.distressed = [p.distressed for p in players]
+        self.rounds_left = [p.distress_rounds_left for p in players]
+        self.frozen = [loan_projection.frozen_rounds(p) for p in players]
+        # (remaining, cap, kind, rate) per loan, by borrower
+        self.loans = [
+            [(l.remaining, l.amount * 2, loan_projection.BANK, 0) for l in p.bank_loans]
+            + [(l.remaining, l.amount * 2, loan_projection.PLAYER, l.interest_rate)
+               for l in p.player_loans_taken.values()]
+            for p in players
+        ]
+        # {collector: {holder: shares}} among active players
+        self.shares = [{index[h]: n for h, n in p.shareholders.items() if h in index} for p in players]
+        # (insured, insurer, premium, coverage left) per active contract
+        self.contracts = [
+            (index[c.insured], index[c.insurer], c.premium_per_round, c.coverage_cap - c.coverage_used)
+            for c in game.insurance if c.insured in index and c.insurer in index
+        ]
+
+        # Per board square: what landing there costs, and who gets it (-1: the bank)
+        self.charge = [0] * board_model.SQUARES
+        self.payee = [-1] * board_model.SQUARES
+        for pos, tax in TAXES.items():
+            self.charge[pos] = tax
+        for p in players:
+            by_group = {}
+            for name in p.properties:
+                group = street_catalog.get(name).group
+                by_group[group] = by_group.get(group, 0) + 1
+            for name in p.properties:
+                street = street_catalog.get(name)
+                self.charge[street.position] = rent.rent(
+                    street.order, by_group[street.group], p.houses.get(name, 0), board_model.MEAN_ROLL)
+                self.payee[street.position] = index[p.name]
+
+    def key(self):
+        """The figures as one hashable value: equal keys give the same forecast."""
+        return (
+            tuple(self.names), tuple(self.balance), tuple(self.net_worth), tuple(self.resale),
+            tuple(self.defaults), tuple(self.distressed), tuple(self.rounds_left), tuple(self.frozen),
+            tuple(map(tuple, self.loans)), tuple(tuple(sorted(s.items())) for s in self.shares),
+            tuple(self.contracts), tuple(self.charge), tuple(self.payee),
+        )
+
+    def lend(self, lender, borrower, amount, interest_rate):
+        """Add a player loan on give_player_loan's terms."""
+        i, j = self.index[lender], self.index[borrower]
+        self.balance[i] -= amount
+        self.balance[j] += amount
+        self.net_worth[i] -= amount
+        remaining = int(amount * (1 + interest_rate / 100))
+        self.net_worth[j] += amount - remaining
+        self.loans[j].append((remaining, amount * 2, loan_projection.PLAYER, interest_rate))
+
+    def insure(self, insurer, insured, premium, coverage_cap):
+        """Add an insurance contract on create_insurance's terms."""
+        self.contracts.append((self.index[insured], self.index[insurer], premium, coverage_cap))
+
+
+def forecast(table, rounds, paths=None, seed=None):
+    """{name: {"default", "elimination", "insolvent"}}: chance of each within `rounds` market rounds.
+
+    default: defaults at least once; elimination: is eliminated;
+    insolvent: net worth (with loans grown as projected) drops below 0.
+    """
+    if np is None:
+        return None
+    cfg = S["risk"]
+    paths = paths or cfg["paths"]
+    rng = np.random.default_rng(cfg["seed"] if seed is None else seed)
+    n = len(table.names)
+    if n == 0:
+        return {}
+
+    # Landings per player per market round
+    landing = board_model.landing_probabilities()
+    per_turn = sum(landing.squares)
+    turns = board_model.SQUARES / (n * board_model.MEAN_ROLL * landing.rolls_per_turn)
+    lam = turns * per_turn
+    cumulative = np.cumsum(np.array(landing.squares) / per_turn)
+    cumulative[-1] = 1.0
+    charge = np.array(table.charge, float)
+    payee = np.array([p if p >= 0 else n for p in table.payee])   # column n: the bank
+    cells = np.arange(paths * n)   # (path, player), flattened
+
+    keep = np.ones(n)
+    dividends = np.zeros((n, n))
+    rate = S["player"]["dividend_per_share"]
+    for i, holders in enumerate(table.shares):
+        for j, count in holders.items():
+            dividends[i, j] = rate * count
+            keep[i] -= rate * count
+    premiums = np.zeros((n, n))
+    cover_by = np.zeros((n, n))
+    for insured, insurer, premium, cover in table.contracts:
+        premiums[insured, insurer] += premium
+        cover_by[insured, insurer] += cover
+    coverage = np.broadcast_to(cover_by.sum(axis=1), (paths, n)).copy()
+    cover_share = np.divide(cover_by, cover_by.sum(axis=1, keepdims=True),
+                            out=np.zeros((n, n)), where=cover_by > 0)
+
+    debt_growth = np.zeros((rounds, n))
+    for i, loans in enumerate(table.loans):
+        for remaining, cap, kind, loan_rate in loans:
+            sched = loan_projection.schedule(remaining, cap, kind, loan_rate, rounds, table.frozen[i])
+            debt_growth[:, i] += np.array(sched) - remaining
+
+    balance = np.broadcast_to(np.array(table.balance, float), (paths, n)).copy()
+    start = balance.copy()
+    resale = np.array(table.resale, float)
+    net_worth = np.array(table.net_worth, float)
+    defaults = np.broadcast_to(np.array(table.defaults), (paths, n)).copy()
+    distressed = np.broadcast_to(np.array(table.distressed), (paths, n)).copy()
+    rounds_left = np.broadcast_to(np.array(table.rounds_left), (paths, n)).copy()
+    alive = np.ones((paths, n), bool)
+    defaulted = np.zeros((paths, n), bool)
+    written_off = np.zeros((paths, n))
+    penalty = S["distress"]["rent_penalty"]
+    duration = S["distress"]["duration_rounds"]
+    insolvent = np.zeros((paths, n), bool)
+
+    for t in range(rounds):
+        # Moves: rent and tax out, insured part paid by insurers
+        who = np.repeat(cells, rng.poisson(lam, paths * n) * alive.ravel())   # one entry per landing
+        squares = np.searchsorted(cumulative, rng.random(who.size))
+        to = payee[squares]
+        path = who // n
+        owner_alive = np.concatenate([alive, np.ones((paths, 1), bool)], axis=1)
+        due = charge[squares] * ((to != who % n) & owner_alive[path, to])
+        owed = np.bincount(who, due, paths * n).reshape(paths, n)
+        covered = np.minimum(owed, coverage)
+        coverage -= covered
+        rent_in = np.bincount(path * (n + 1) + to, due, paths * (n + 1)).reshape(paths, n + 1)[:, :n]
+        rent_in = rent_in * np.where(distressed, penalty, 1.0)
+        balance += rent_in * keep + rent_in @ dividends - (owed - covered) - covered @ cover_share
+
+        # Start salary to whoever passed it
+        passer = np.argmax(rng.random((paths, n)) * alive, axis=1)
+        balance[np.arange(paths), passer] += SALARY * alive[np.arange(paths), passer]
+
+        # Defaults
+        short = alive & (balance + resale < 0)
+        defaults += short
+        defaulted |= short
+        written_off -= np.where(short, balance, 0)
+        balance[short] = 0
+        out = short & (defaults >= 2)
+        alive &= ~out
+        distressed = (distressed | short) & alive
+        rounds_left[short] = duration
+
+        # Market round: distress countdown, then premiums
+        ticking = alive & distressed
+        rounds_left -= ticking
+        distressed &= ~(ticking & (rounds_left <= 0))
+        bill = alive @ premiums.T
+        pays = alive & ~distressed & (balance >= bill) & (bill > 0)
+        balance -= pays * bill
+        balance += (pays @ premiums) * alive
+
+        insolvent |= alive & (net_worth + balance - written_off - start - debt_growth[t] < 0)
+
+    eliminated = ~alive
+    return {
+        name: {
+            "default": round(float(defaulted[:, i].mean()), 3),
+            "elimination": round(float(eliminated[:, i].mean()), 3),
+            "insolvent": round(float((insolvent[:, i] | eliminated[:, i]).mean()), 3),
+        }
+        for i, name in enumerate(table.names)
+    }
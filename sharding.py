@@ -0,0 +1,245 @@
+"""Sharded mode: games partitioned across worker processes by game code.
+
+    python sharding.py --workers 4 --port 5000
+
+starts N app.py workers on port+1..port+N, a front router on --port that
+sends every /api/* call and Socket.IO request for a game to the worker that
+owns it, and a small in-process broker standing in for a message queue so
+Socket.IO emits reach clients on any worker.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import zlib
+from multiprocessing.connection import Client, Listener
+
+import socketio
+from werkzeug.http import parse_cookie
+
+# Env vars handed from the launcher to each worker
+SHARD_ENV = "MONOPOLY_SHARD"            # "index/count"
+PORT_ENV = "MONOPOLY_PORT"
+BROKER_ENV = "MONOPOLY_BROKER"          # "host:port"
+BROKER_KEY_ENV = "MONOPOLY_BROKER_KEY"  # hex authkey
+
+HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade",
+}
+
+
+def shard_of(game_id, count):
+    """Worker index that owns game_id."""
+    game_id = str(game_id)
+    if game_id.isdigit():
+        return int(game_id) % count
+    return zlib.crc32(game_id.encode()) % count
+
+
+def current_shard():
+    """(index, count) for this process; (0, 1) when not sharded."""
+    value = os.environ.get(SHARD_ENV)
+    if not value:
+        return 0, 1
+    index, count = value.split("/")
+    return int(index), int(count)
+
+
+def owns(game_id):
+    index, count = current_shard()
+    return shard_of(game_id, count) == index
+
+
+# ── Cross-worker broadcast ──────────────────────────────────────────────────
+
+class LocalQueueManager(socketio.PubSubManager):
+    """Socket.IO client manager that publishes through the launcher's broker.
+
+    Stand-in for Redis/Kombu when every worker runs on one machine.
+    """
+    name = "localqueue"
+
+    def __init__(self, address, authkey, channel="socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._conn = Client(address, authkey=authkey)
+        self._send_lock = threading.Lock()
+
+    def _publish(self, data):
+        with self._send_lock:
+            self._conn.send(data)
+
+    def _listen(self):
+        while True:
+            yield self._conn.recv()
+
+
+def socketio_options():
+    """Extra SocketIO() kwargs for this process."""
+    broker = os.environ.get(BROKER_ENV)
+    if not broker:
+        return {}
+    host, port = broker.rsplit(":", 1)
+    authkey = bytes.fromhex(os.environ[BROKER_KEY_ENV])
+    return {"client_manager": LocalQueueManager((host, int(port)), authkey)}
+
+
+class Broker:
+    """Fans every published message out to all connected workers."""
+
+    def __init__(self, address, authkey):
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.conns = []
+        self.lock = threading.Lock()
+
+    def serve_forever(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            conn = self.listener.accept()
+            with self.lock:
+                self.conns.append(conn)
+            threading.Thread(target=self._relay, args=(conn,), daemon=True).start()
+
+    def _relay(self, conn):
+        try:
+            while True:
+                message = conn.recv()
+                with self.lock:
+                    for other in list(self.conns):
+                        try:
+                            other.send(message)
+                        except OSError:
+                            self.conns.remove(other)
+        except (EOFError, OSError):
+            with self.lock:
+                if conn in self.conns:
+                    self.conns.remove(conn)
+
+
+# ── Front router ────────────────────────────────────────────────────────────
+
+class Router:
+    """WSGI app proxying each request to the worker that owns its game.
+
+    The game code comes from the join_game body or the signed session cookie.
+    Requests without a game (new_game, static files) go round-robin.
+    WebSocket upgrades are refused, so Socket.IO clients stay on long-polling
+    through the router.
+    """
+
+    def __init__(self, workers, flask_app):
+        self.workers = workers              # [(host, port)]
+        self.serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+        self.cookie_name = flask_app.config["SESSION_COOKIE_NAME"]
+        self._round_robin = itertools.cycle(range(len(workers)))
+
+    def game_id_for(self, environ, body):
+        if environ.get("PATH_INFO") == "/api/join_game" and body:
+            try:
+                return str(json.loads(body).get("game_id", "")).strip() or None
+            except (ValueError, AttributeError):
+                return None
+        cookie = parse_cookie(environ.get("HTTP_COOKIE", "")).get(self.cookie_name)
+        if not cookie:
+            return None
+        try:
+            return self.serializer.loads(cookie).get("game_id")
+        except Exception:  # bad signature / expired / garbage
+            return None
+
+    def __call__(self, environ, start_response):
+        if environ.get("HTTP_UPGRADE", "").lower() == "websocket":
+            start_response("400 Bad Request", [("Content-Type", "text/plain")])
+            return [b"WebSocket not supported through the router; use polling."]
+
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = environ["wsgi.input"].read(length) if length else b""
+        game_id = self.game_id_for(environ, body)
+        if game_id:
+            index = shard_of(game_id, len(self.workers))
+        else:
+            index = next(self._round_robin)
+        return self.proxy(self.workers[index], environ, body, start_response)
+
+    def proxy(self, worker, environ, body, start_response):
+        path = environ.get("PATH_INFO", "/")
+        if environ.get("QUERY_STRING"):
+            path += "?" + environ["QUERY_STRING"]
+        headers = {}
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                name = key[5:].replace("_", "-").title()
+                if name.lower() not in HOP_BY_HOP and name.lower() != "host":
+                    headers[name] = value
+        if environ.get("CONTENT_TYPE"):
+            headers["Content-Type"] = environ["CONTENT_TYPE"]
+        if body:
+            headers["Content-Length"] = str(len(body))
+
+        conn = http.client.HTTPConnection(*worker, timeout=60)
+        try:
+            conn.request(environ["REQUEST_METHOD"], path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except OSError:
+            start_response("502 Bad Gateway", [("Content-Type", "text/plain")])
+            return [b"Worker unavailable."]
+        finally:
+            conn.close()
+        out_headers = [
+            (k, v) for k, v in resp.getheaders()
+            if k.lower() not in HOP_BY_HOP and k.lower() != "content-length"
+        ]
+        out_headers.append(("Content-Length", str(len(data))))
+        start_response(f"{resp.status} {resp.reason}", out_headers)
+        return [data]
+
+
+# ── Launcher ────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Monopoly Plus across several worker processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    authkey = secrets.token_bytes(16)
+    broker = Broker(("127.0.0.1", 0), authkey)
+    broker.serve_forever()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    workers, procs = [], []
+    for i in range(args.workers):
+        port = args.port + 1 + i
+        env = dict(
+            os.environ,
+            **{
+                SHARD_ENV: f"{i}/{args.workers}",
+                PORT_ENV: str(port),
+                BROKER_ENV: f"{broker.address[0]}:{broker.address[1]}",
+                BROKER_KEY_ENV: authkey.hex(),
+            },
+        )
+        procs.append(subprocess.Popen([sys.executable, os.path.join(here, "app.py")], env=env, cwd=here))
+        workers.append(("127.0.0.1", port))
+
+    from werkzeug.serving import run_simple
+    from app import app as flask_app
+    try:
+        run_simple(args.host, args.port, Router(workers, flask_app), threaded=True)
+    finally:
+        for p in procs:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
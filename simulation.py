@@ -0,0 +1,306 @@
+"""Headless complete game: dice and the board drive app.Game.
+
+Players are simple bots. They roll, move over location_data.location, buy
+streets they can afford, pay rent, borrow when short, invest in each other,
+insure themselves, buy the last street of a colour group and build houses. Every
+money movement, rent and house goes through Game's methods, so the rules
+are exactly the add-on's. Dice and jail follow board_model.DEFAULT_RULES,
+the rule set board_model prices rent with; Chans and Allmänning are plain
+squares in both (there are no cards in the repo).
+
+Used by main.py's "Complete game" mode and for balancing runs:
+
+    result = Simulation(["Anna", "Bo", "Cia"], seed=7).run()
+"""
+import random
+import threading
+
+import player_settings as psettings
+import board_model
+import street_catalog
+from app import Game
+from location_data import location
+
+S = psettings.settings
+
+# Board squares as (kind, value), by position
+_KINDS = {"Start": "start", "Skatt": "tax", "Fängelse": "jail", "Chans": "card",
+          "Allmänning": "card", "Fri Parkering": "free"}
+
+
+def _build_board():
+    board = []
+    for pos in range(len(location)):
+        (group_name, value), = location[pos].items()
+        if street_catalog.get(value):
+            board.append(("street", street_catalog.get(value)))
+        elif group_name == "Fängelse" and value == "Fängelse":
+            board.append(("go_to_jail", None))
+        else:
+            board.append((_KINDS[group_name], value))
+    return tuple(board)
+
+
+BOARD = _build_board()
+GO_SALARY = location[0]["Start"]
+JAIL = board_model.JAIL
+RULES = board_model.DEFAULT_RULES
+# Colour groups houses can be built on: {group: (Street, ...)}
+HOUSE_GROUPS = {
+    group: tuple(street_catalog.get(name) for name in names)
+    for group, names in street_catalog.GROUPS.items()
+    if street_catalog.get(names[0]).house_price
+}
+
+
+class Simulation:
+    """One complete game between bots, reproducible from its seed."""
+
+    def __init__(self, names, seed=None):
+        if not 2 <= len(names) <= len(Game.PLAYER_COLORS):
+            raise ValueError(f"Need 2-{len(Game.PLAYER_COLORS)} players.")
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.cfg = S["simulation"]
+        self.game = Game()
+        self.game.lock = threading.RLock()   # one thread drives a headless game: no queue to keep fair
+        for name in names:
+            self.game.add_player(name)
+        self.game.start()
+        self.names = list(names)
+        self.position = dict.fromkeys(names, 0)
+        self.jail_turns = dict.fromkeys(names, 0)   # >0: in jail, turns spent there
+        self.turns = 0
+        self.stats = {
+            name: {"eliminated_round": None, "bank_loans": 0, "player_loans": 0,
+                   "share_cost": 0, "dividends": 0}
+            for name in names
+        }
+
+    def run(self):
+        """Play until one player is left or the round limit. Returns the result dict."""
+        game = self.game
+        max_rounds = self.cfg["max_rounds"]
+        while game.check_winner() is None and game.current_round < max_rounds:
+            for name in self.names:
+                if not game.get_player(name).eliminated:
+                    self.turn(name)
+                    if game.check_winner() is not None:
+                        break
+        return self.result()
+
+    # ── Turn ──────────────────────────────────────────────────────────
+
+    def turn(self, name):
+        self.turns += 1
+        player = self.game.get_player(name)
+        roll = self.rng.random
+        if player.balance < 0 and not player.distressed:
+            self._default(name)
+            if player.eliminated:
+                return
+        for doubles in range(1, RULES.doubles_to_jail + 1):
+            d1, d2 = int(roll() * 6) + 1, int(roll() * 6) + 1
+            if self.jail_turns[name]:
+                if d1 != d2 and self.jail_turns[name] < RULES.jail_attempts:
+                    self.jail_turns[name] += 1
+                    return
+                if d1 != d2:
+                    self._pay(name, self.cfg["jail_fine"])
+                    if player.eliminated:
+                        return
+                self.jail_turns[name] = 0
+                self._move(name, d1 + d2)
+                return  # leaving jail never earns another roll
+            if d1 == d2 and doubles == RULES.doubles_to_jail:
+                self._to_jail(name)   # too many doubles in a row: straight to jail, no move
+                break
+            self._move(name, d1 + d2)
+            if player.eliminated or self.jail_turns[name] or d1 != d2:
+                break
+        if not player.eliminated:
+            self._manage(name)
+
+    def _move(self, name, steps):
+        game = self.game
+        pos = self.position[name] + steps
+        if pos >= len(BOARD):
+            pos -= len(BOARD)
+            game.adjust_balance(name, GO_SALARY)
+            game.market_round()
+        self.position[name] = pos
+        kind, value = BOARD[pos]
+        if kind == "street":
+            self._land_on_street(name, value, steps)
+        elif kind == "tax":
+            self._pay(name, value)
+        elif kind == "go_to_jail":
+            self._to_jail(name)
+
+    def _to_jail(self, name):
+        self.position[name] = JAIL
+        self.jail_turns[name] = 1
+
+    def _land_on_street(self, name, street, dice_total):
+        game = self.game
+        owner = game.street_owner.get(street.name)
+        player = game.get_player(name)
+        if owner is None:
+            if street.name not in game.auction_pool and player.balance - street.price >= self.cfg["cash_reserve"]:
+                game.adjust_balance(name, -street.price)
+                game.add_property(name, street.name)
+            elif street.name in game.auction_pool and player.balance - street.price >= self.cfg["cash_reserve"]:
+                game.buy_from_auction(name, street.name, street.price)
+            return
+        if owner == name:
+            return
+        rent = game.rent_due(street.name, dice_total)
+        self._raise_cash(name, rent)
+        game.pay_rent_with_insurance(name, rent)
+        holders = game.get_player(owner).shareholders
+        before = {h: game.get_player(h).balance for h in holders}
+        game.collect_rent(owner, rent)
+        for holder, balance in before.items():
+            self.stats[holder]["dividends"] += game.get_player(holder).balance - balance
+        if player.balance < 0:
+            self._default(name)
+
+    # ── Money ─────────────────────────────────────────────────────────
+
+    def _pay(self, name, amount):
+        """Pay the bank, borrowing or defaulting if needed."""
+        self._raise_cash(name, amount)
+        self.game.adjust_balance(name, -amount)
+        if self.game.get_player(name).balance < 0:
+            self._default(name)
+
+    def _raise_cash(self, name, amount):
+        """Borrow from the bank, then from the richest player, to cover amount."""
+        game = self.game
+        player = game.get_player(name)
+        short = amount - player.balance
+        if short <= 0 or player.distressed:
+            return
+        cfg = S["bank_loan"]
+        if len(player.bank_loans) < self.cfg["max_bank_loans"]:
+            loan = min(max(short, cfg["min_loan"]), cfg["max_loan"])
+            if game.take_bank_loan(name, loan)[0]:
+                self.stats[name]["bank_loans"] += 1
+                short -= loan
+        if short > 0:
+            lender = max((p for p in game.players if p.name != name and not p.eliminated
+                          and not p.distressed), key=lambda p: p.balance, default=None)
+            if lender and lender.balance - short >= self.cfg["cash_reserve"]:
+                game.give_player_loan(lender.name, name, short, self.cfg["loan_rate"])
+                self.stats[name]["player_loans"] += 1
+
+    def _default(self, name):
+        game = self.game
+        game.enter_distress(name)
+        if game.get_player(name).eliminated:
+            self.stats[name]["eliminated_round"] = game.current_round
+
+    def _manage(self, name):
+        """End-of-turn finance: repay debt, insure, trade, build, buy shares."""
+        game = self.game
+        player = game.get_player(name)
+        reserve = self.cfg["cash_reserve"]
+        if player.distressed:
+            return
+        if player.bank_loans and player.balance - player.bank_loans[0].remaining >= 2 * reserve:
+            game.repay_bank_loan(name, 0)
+        for loan in list(player.player_loans_taken.values()):
+            if player.balance - loan.remaining >= 2 * reserve:
+                game.repay_player_loan(name, loan.id)
+
+        if player.properties and not game.insurance.for_insured(name):
+            insurer = max((p for p in game.players if p.name != name and not p.eliminated),
+                          key=lambda p: p.balance)
+            cover = self.cfg["insurance_cover"]
+            game.create_insurance(insurer.name, name, int(cover * self.cfg["insurance_rate"]), cover)
+
+        held = {}   # {colour group: streets name owns in it}, in board order for reproducibility
+        owner = game.street_owner
+        for group, streets in HOUSE_GROUPS.items():
+            mine = [street.name for street in streets if owner.get(street.name) == name]
+            if mine:
+                held[group] = mine
+        self._complete_group(name, held)
+        for _ in range(self.cfg["houses_per_turn"]):
+            street = self._next_house(player, held)
+            if street is None or player.balance - street.house_price < reserve:
+                break
+            game.build_house(name, street.name)
+
+        budget = (player.balance - reserve) * self.cfg["share_budget"]
+        max_shares = S["player"]["max_shares"]
+        targets = [p for p in game.players if p.name != name and not p.eliminated
+                   and p.shares_issued < max_shares and 0 < p.share_price <= budget]
+        if targets:
+            company = max(targets, key=lambda p: p.property_value)
+            price = company.share_price
+            if game.issue_share(company.name, name)[0]:
+                self.stats[name]["share_cost"] += price
+
+    def _complete_group(self, name, held):
+        """Buy the one missing street of a colour group, at a premium, from a
+        player who owns nothing else in that group."""
+        game = self.game
+        for group, mine in held.items():
+            streets = HOUSE_GROUPS[group]
+            if len(mine) != len(streets) - 1:
+                continue
+            street = next(s for s in streets if s.name not in mine)
+            seller = game.street_owner.get(street.name)
+            if seller is None or any(game.street_owner.get(s.name) == seller for s in streets if s is not street):
+                continue
+            offer = int(street.price * self.cfg["trade_premium"])
+            if game.get_player(name).balance - offer >= self.cfg["cash_reserve"]:
+                game.transfer_money(name, seller, offer)
+                game.transfer_property(seller, name, street.name)
+                mine.append(street.name)
+                return
+
+    def _next_house(self, player, held):
+        """Cheapest street with fewest houses in the complete groups in held."""
+        best = None
+        for group, mine in held.items():
+            if len(mine) != len(HOUSE_GROUPS[group]):
+                continue
+            for street in HOUSE_GROUPS[group]:
+                houses = player.houses.get(street.name, 0)
+                if houses < 5 and (best is None or (houses, street.house_price) < best[0]):
+                    best = ((houses, street.house_price), street)
+        return best[1] if best else None
+
+    # ── Result ────────────────────────────────────────────────────────
+
+    def result(self):
+        game = self.game
+        game._refresh_figures()
+        winner = game.check_winner()
+        if winner is None and game._leaderboard:
+            winner = game._leaderboard[0]["name"]
+        players = {}
+        for p in game.players:
+            stats = self.stats[p.name]
+            players[p.name] = dict(
+                stats,
+                net_worth=round(p.net_worth, 2),
+                balance=round(p.balance, 2),
+                properties=len(p.properties),
+                defaults=p.defaults,
+                share_value=round(p.portfolio_value, 2),
+            )
+        return {
+            "seed": self.seed,
+            "winner": winner,
+            "decided": game.check_winner() is not None,   # False: called on net worth
+            "rounds": game.current_round,
+            "turns": self.turns,
+            "players": players,
+        }
+
+
+def simulate(names, seed=None):
+    return Simulation(names, seed).run()
@@ -25,11 +25,17 @@ let gameState = null;
 let socket = null;
 let myPlayer = null;
 let currentGameId = null;
+let streetCatalog = [];  // static street data, fetched once from /api/streets
+let riskForecast = {};   // {player: {default, elimination, insolvent}} from /api/risk_forecast
+let riskVersion = null;  // state version riskForecast was asked for
+let riskLoading = false;
 
 // ── Socket ──────────────────────────────────────────────────────────────
 
 function connectSocket(gameId) {
     currentGameId = gameId;
+    riskForecast = {};
+    riskVersion = null;
     if (socket) socket.disconnect();
     socket = io();
 
@@ -47,32 +53,73 @@ function connectSocket(gameId) {
     });
 
     socket.on("game_update", (data) => {
+        // Server sends the pre-encoded state as a JSON string
+        if (typeof data === "string") data = JSON.parse(data);
         gameState = data.game;
+        onGameState();
+    });
 
-        // If on claim screen, re-render player list
-        const claimPanel = document.getElementById("setup-claim");
-        if (claimPanel && !claimPanel.classList.contains("hidden")) {
-            renderClaimPlayers();
-        }
-
-        // If on setup-players screen (host lobby), update player list
-        const playersPanel = document.getElementById("setup-players");
-        if (playersPanel && !playersPanel.classList.contains("hidden")) {
-            renderSetupPlayers();
-            if (gameState.players.length >= 2) show("btn-start-game");
+    socket.on("game_patch", (patch) => {
+        if (!applyPatch(patch)) {
+            // Missed an update in between — ask for a full snapshot
+            socket.emit("request_snapshot", { game_id: gameId });
+            return;
         }
+        onGameState();
+    });
+}
 
-        // If game started and I have claimed a player, transition to game screen
-        if (gameState.started && myPlayer) {
-            document.getElementById("setup-screen").classList.remove("active");
-            document.getElementById("game-screen").classList.add("active");
-        }
+// Apply a server patch to gameState. Returns false on a version gap.
+function applyPatch(patch) {
+    if (!gameState) return false;
+    if (patch.version <= gameState.version) return true;  // already have it
+    if (patch.base !== gameState.version) return false;
 
-        // If game screen is active, re-render
-        if (document.getElementById("game-screen").classList.contains("active")) {
-            renderGame();
-        }
+    Object.entries(patch.players || {}).forEach(([name, changes]) => {
+        const p = gameState.players.find(pl => pl.name === name);
+        if (p) Object.assign(p, changes);
+        else gameState.players.push(changes);
     });
+    Object.entries(patch.owners || {}).forEach(([street, owner]) => {
+        if (owner === null) delete gameState.owners[street];
+        else gameState.owners[street] = owner;
+    });
+    if (patch.log) gameState.log = gameState.log.concat(patch.log).slice(-40);
+    if (patch.transactions) {
+        gameState.transactions = gameState.transactions.concat(patch.transactions).slice(-30);
+    }
+    ["insurance_contracts", "current_round", "started", "claimed_players",
+     "leaderboard", "auction_pool", "winner", "exchange"].forEach(key => {
+        if (key in patch) gameState[key] = patch[key];
+    });
+    gameState.version = patch.version;
+    return true;
+}
+
+function onGameState() {
+    // If on claim screen, re-render player list
+    const claimPanel = document.getElementById("setup-claim");
+    if (claimPanel && !claimPanel.classList.contains("hidden")) {
+        renderClaimPlayers();
+    }
+
+    // If on setup-players screen (host lobby), update player list
+    const playersPanel = document.getElementById("setup-players");
+    if (playersPanel && !playersPanel.classList.contains("hidden")) {
+        renderSetupPlayers();
+        if (gameState.players.length >= 2) show("btn-start-game");
+    }
+
+    // If game started and I have claimed a player, transition to game screen
+    if (gameState.started && myPlayer) {
+        document.getElementById("setup-screen").classList.remove("active");
+        document.getElementById("game-screen").classList.add("active");
+    }
+
+    // If game screen is active, re-render
+    if (document.getElementById("game-screen").classList.contains("active")) {
+        renderGame();
+    }
 }
 
 function setConnectionStatus(connected) {
@@ -123,8 +170,8 @@ function refreshSelects() {
         "money-from", "money-to", "adjust-player", "distress-player"
     ].forEach(id => populateSelect(id, opts));
 
-    if (gameState.all_streets) {
-        populateSelect("prop-street", gameState.all_streets.map(s => ({
+    if (streetCatalog.length) {
+        populateSelect("prop-street", streetCatalog.map(s => ({
             value: s.name,
             label: `${s.name} (${s.group}) — ${fmt(s.price)} kr`
         })));
@@ -187,6 +234,15 @@ async function tryRecoverSession() {
     }
 }
 
+async function loadStreetCatalog() {
+    const res = await API.get("/api/streets");
+    if (res.status === "ok") {
+        streetCatalog = res.streets;
+        if (gameState && gameState.started) refreshSelects();
+    }
+}
+
+loadStreetCatalog();
 tryRecoverSession();
 
 // ── Setup ────────────────────────────────────────────────────────────────
@@ -392,6 +448,21 @@ function renderGame() {
     renderLoans();
     renderInsurance();
     renderLog();
+    refreshRisk();
+}
+
+// The forecast is a Monte Carlo, so it isn't part of the state: fetch it after
+// updates, one request at a time, and catch up with the latest version after.
+async function refreshRisk() {
+    if (riskLoading || !gameState.started || riskVersion === gameState.version) return;
+    riskLoading = true;
+    const version = gameState.version;
+    const res = await API.get("/api/risk_forecast");
+    riskLoading = false;
+    riskVersion = version;
+    riskForecast = res.status === "ok" ? res.players : {};  // no numpy: no risk line
+    renderPlayers();
+    refreshRisk();
 }
 
 function renderDashboard() {
@@ -445,6 +516,15 @@ function renderPlayers() {
 
         const props = p.properties.length > 0 ? p.properties.join(", ") : "Inga";
 
+        const projection = p.debt_projection || [];
+        const debtOutlook = p.total_debt > 0 && projection.length
+            ? ` (${fmt(projection[projection.length - 1])} kr om ${projection.length} rundor)` : "";
+        const r = riskForecast[p.name];
+        const risk = r && !p.eliminated && (r.default > 0 || r.insolvent > 0)
+            ? `<div class="player-card-meta">Risk: konkurs ${Math.round(r.default * 100)}% |
+                   utslagen ${Math.round(r.elimination * 100)}% | insolvent ${Math.round(r.insolvent * 100)}%</div>`
+            : "";
+
         const isMe = p.name === myPlayer;
         return `
             <div class="player-card ${p.eliminated ? 'eliminated' : ''} ${isMe ? 'my-player' : ''}" style="border-left-color:${p.color}">
@@ -453,7 +533,7 @@ function renderPlayers() {
                     <div class="player-card-name">${p.name} ${isMe ? '<span class="you-badge">Du</span>' : ''} ${statusBadge}</div>
                     <div class="player-card-balance">${fmt(p.balance)} kr</div>
                     <div class="player-card-meta">
-                        Nettovarde: ${fmt(p.net_worth)} kr | Skuld: ${fmt(p.total_debt)} kr
+                        Nettovarde: ${fmt(p.net_worth)} kr | Skuld: ${fmt(p.total_debt)} kr${debtOutlook}
                     </div>
                     <div class="player-card-meta">
                         Fastigheter (${fmt(p.property_value)} kr): ${props}
@@ -462,6 +542,7 @@ function renderPlayers() {
                         Aktier: ${p.shares_issued}/${p.max_shares} emitterade (${fmt(p.share_price)} kr/st) |
                         Agare: ${shareholderList}
                     </div>
+                    ${risk}
                 </div>
             </div>
         `;
@@ -526,11 +607,11 @@ function renderLoans() {
                 idx, from: "Banken", isBank: true,
             });
         });
-        p.player_loans_taken.forEach((loan, idx) => {
+        p.player_loans_taken.forEach(loan => {
             allLoans.push({
                 type: "Spelar", player: p.name,
                 amount: loan.amount, remaining: loan.remaining,
-                idx, from: loan.from, isBank: false,
+                idx: loan.id, from: loan.from, isBank: false,
             });
         });
     });
@@ -587,7 +668,11 @@ async function apiAction(url, data, btn) {
     if (btn) setLoading(btn, true);
     const res = await API.post(url, data);
     if (btn) setLoading(btn, false);
-    if (res.game) { gameState = res.game; renderGame(); }
+    // A patch for a newer version may have arrived before this response
+    if (res.game && (!gameState || res.game.version >= gameState.version)) {
+        gameState = res.game;
+        renderGame();
+    }
     toast(res.message, res.status !== "ok");
 }
 
@@ -655,7 +740,8 @@ document.getElementById("btn-player-loan").addEventListener("click", function()
 
 async function repayLoan(player, idx, isBank) {
     const url = isBank ? "/api/repay_bank_loan" : "/api/repay_player_loan";
-    await apiAction(url, { player, loan_index: idx });
+    // Bank loans are addressed by position, player loans by id
+    await apiAction(url, isBank ? { player, loan_index: idx } : { player, loan_id: idx });
 }
 
 document.getElementById("btn-create-insurance").addEventListener("click", function() {
@@ -0,0 +1,72 @@
+from collections import namedtuple
+from types import MappingProxyType
+import json
+import config
+from location_data import location
+
+# Immutable view of config.streets, built once at import.
+# rent is the raw "Hyra" table (utility rents are still lambdas of the dice total).
+Street = namedtuple("Street", "name group price house_price mortgage rent position order")
+
+
+def _build():
+    positions = {}
+    for pos, square in location.items():
+        for group_name, name in square.items():
+            if group_name in config.streets:
+                positions[name] = pos
+
+    streets = {}
+    for group_name, group in config.streets.items():
+        for name, info in group.items():
+            streets[name] = Street(
+                name=name,
+                group=group_name,
+                price=info["Pris"],
+                house_price=info.get("Huspris"),
+                # Vattenledningsverket has no "Intecknas" entry; mortgage is half price on the board
+                mortgage=info.get("Intecknas", info["Pris"] // 2),
+                rent=MappingProxyType(dict(info["Hyra"])),
+                position=positions.get(name),
+                order=len(streets),
+            )
+    return streets
+
+
+STREETS = MappingProxyType(_build())
+GROUPS = MappingProxyType({name: tuple(group) for name, group in config.streets.items()})
+
+
+def get(name):
+    """Street for name, or None if it isn't a street."""
+    return STREETS.get(name)
+
+
+def price(name, default=0):
+    street = STREETS.get(name)
+    return street.price if street else default
+
+
+def group_of(name):
+    street = STREETS.get(name)
+    return street.group if street else None
+
+
+def in_order(names):
+    """Street names sorted in config.streets order."""
+    return sorted(names, key=lambda n: STREETS[n].order)
+
+
+# Static part shipped to clients once (see /api/streets) instead of with every state update
+CLIENT_STREETS = tuple(
+    {
+        "name": s.name,
+        "group": s.group,
+        "price": s.price,
+        "house_price": s.house_price,
+        "mortgage": s.mortgage,
+        "position": s.position,
+    }
+    for s in STREETS.values()
+)
+CLIENT_JSON = json.dumps({"status": "ok", "streets": CLIENT_STREETS}, ensure_ascii=False)
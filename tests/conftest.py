@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import player_settings as psettings  # noqa: E402
+
+psettings.settings["storage"]["directory"] = None   # tests give each game its own journal
@@ -0,0 +1,32 @@
+"""batch.run_batch: the same batch gives the same games, however it is run."""
+import json
+import os
+import subprocess
+import sys
+
+import batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def games(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted((json.loads(line) for line in f), key=lambda r: r["game"])
+
+
+def test_results_do_not_depend_on_workers_or_hash_seed(tmp_path):
+    one = batch.run_batch(20, players=4, workers=1, out=str(tmp_path / "one.jsonl"), chunk_size=6)
+    two = batch.run_batch(20, players=4, workers=2, out=str(tmp_path / "two.jsonl"), chunk_size=6)
+    assert games(tmp_path / "one.jsonl") == games(tmp_path / "two.jsonl")
+    assert one.to_dict() == two.to_dict()
+    assert [r["seed"] for r in games(tmp_path / "one.jsonl")] == [batch.game_seed(0, i) for i in range(20)]
+
+    # Fresh processes with other hash seeds play the same games (games 18 and 19 once didn't)
+    for hash_seed in ("1", "2"):
+        out = tmp_path / f"cli{hash_seed}.jsonl"
+        cli = subprocess.run(
+            [sys.executable, "batch.py", "--games", "20", "--players", "4", "--workers", "2", "--out", str(out)],
+            cwd=ROOT, env=dict(os.environ, PYTHONHASHSEED=hash_seed), capture_output=True, text=True, check=True,
+        )
+        assert games(out) == games(tmp_path / "one.jsonl")
+        assert json.loads(cli.stdout) == one.to_dict()
@@ -0,0 +1,104 @@
+"""GameLog ring buffer, compressed chunks and the paged /api/history."""
+import json
+import zlib
+
+import pytest
+
+import app
+from gamelog import GameLog
+
+
+def filled(count, capacity=5, chunk_size=3):
+    log = GameLog(capacity, chunk_size)
+    for i in range(count):
+        log.append({"i": i})
+    return log
+
+
+def numbers(entries):
+    return [e["i"] for e in entries]
+
+
+def test_oldest_entries_leave_the_ring_in_compressed_chunks():
+    log = filled(12)
+    assert numbers(log._recent) == [7, 8, 9, 10, 11]
+    assert [numbers(json.loads(zlib.decompress(c))) for c in log._archive] == [[0, 1, 2], [3, 4, 5]]
+    assert numbers(log._spill) == [6]
+    assert len(log) == 12
+
+
+@pytest.mark.parametrize("count", [0, 4, 5, 8, 9, 12, 23])
+def test_range_reads_across_chunk_and_ring_boundaries(count):
+    log = filled(count)
+    for start in range(-1, count + 2):
+        for end in range(start, count + 2):
+            assert numbers(log.range(start, end)) == list(range(max(start, 0), min(end, count)))
+    for n in range(count + 2):
+        assert numbers(log.tail(n)) == list(range(max(count - n, 0), count))
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7, 50])
+def test_pages_walk_back_to_the_first_entry(limit):
+    log = filled(23)
+    pages, cursor = [], None
+    while True:
+        entries, cursor = log.page(cursor, limit)
+        pages.append(numbers(entries))
+        if cursor is None:
+            break
+    assert all(len(p) == limit for p in pages[:-1]) and 0 < len(pages[-1]) <= limit
+    assert [i for page in reversed(pages) for i in page] == list(range(23))
+
+
+def test_dump_and_load_keep_chunks_and_numbering():
+    log = filled(23)
+    loaded = GameLog.load(json.loads(json.dumps(log.dump())), capacity=5, chunk_size=4)
+    assert loaded.chunk_size == 3 and len(loaded) == 23
+    assert numbers(loaded.range(0, 23)) == list(range(23))
+    loaded.append({"i": 23})
+    assert numbers(loaded.tail(2)) == [22, 23]
+
+
+def test_history_route_pages_through_the_log(monkeypatch):
+    monkeypatch.setitem(app.S["history"], "recent", 5)
+    monkeypatch.setitem(app.S["history"], "chunk_size", 3)
+    client = app.app.test_client()
+    game_id = client.post("/api/new_game").get_json()["game_id"]
+    game = app.games.get(game_id)
+    for name in ("Anna", "Bo"):
+        game.add_player(name)
+    game.start()
+    for amount in range(1, 21):
+        game.adjust_balance("Anna", amount)
+    records = game.log.range(0, len(game.log))
+    assert len(records) == 21 and game.log._archive
+
+    seen, cursor = [], None
+    while True:
+        query = {"kind": "log", "limit": 4, "raw": 1}
+        if cursor is not None:
+            query["before"] = cursor
+        body = client.get("/api/history", query_string=query).get_json()
+        seen = body["entries"] + seen
+        cursor = body["next"]
+        if cursor is None:
+            break
+    assert seen == records
+
+    body = client.get("/api/history", query_string={"kind": "log", "limit": 1, "lang": "sv"}).get_json()
+    assert body["entries"] == ["Anna fick 20kr."] and body["next"] == 20
+    assert client.get("/api/history", query_string={"kind": "nope"}).status_code == 400
+
+
+def test_rent_routes_render_the_returned_record(monkeypatch):
+    monkeypatch.setitem(app.S["history"], "language", "sv")
+    client = app.app.test_client()
+    game = app.games.get(client.post("/api/new_game").get_json()["game_id"])
+    for name in ("Anna", "Bo"):
+        game.add_player(name)
+    game.start()
+    assert game.collect_rent("Anna", 100) == (True, game.log.tail(1)[0])
+    body = client.post("/api/pay_rent_with_insurance", json={"player": "Bo", "amount": 200}).get_json()
+    assert body["message"] == "Bo betalade 200kr i hyra."
+    body = client.post("/api/collect_rent", json={"player": "Anna", "amount": 200}).get_json()
+    assert body["message"] == "Anna tog in 200kr i hyra."
@@ -0,0 +1,206 @@
+"""Journal replay, snapshot restore and FairLock ordering."""
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import player_settings as psettings
+import street_catalog
+from app import FairLock, Game
+from journal import GameJournal
+
+S = psettings.settings
+NAMES = ["A", "B", "C", "D", "E"]
+
+
+def random_op(game, rng):
+    """One random mutation, valid or not — rejected calls must leave no trace."""
+    name = lambda: rng.choice(NAMES)
+    street = lambda: rng.choice(list(street_catalog.STREETS))
+    ops = [
+        lambda: game.add_property(name(), street()),
+        lambda: game.remove_property(name(), street()),
+        lambda: game.transfer_property(name(), name(), street()),
+        lambda: game.issue_share(name(), name()),
+        lambda: game.transfer_share(name(), name(), name(), rng.randrange(0, 3000)),
+        lambda: game.buyback_share(name(), name()),
+        lambda: game.collect_rent(name(), rng.randrange(0, 5000)),
+        lambda: game.charge_rent(name(), street(), rng.randrange(0, 13)),
+        lambda: game.take_bank_loan(name(), rng.randrange(500, 10000)),
+        lambda: game.repay_bank_loan(name(), rng.randrange(0, 3), rng.choice([None, 300])),
+        lambda: game.give_player_loan(name(), name(), rng.randrange(1, 4000), rng.choice([5, 10, 40])),
+        lambda: game.repay_player_loan(name(), rng.randrange(1, 30), rng.choice([None, 200])),
+        lambda: game.create_insurance(name(), name(), rng.randrange(1, 500), rng.randrange(1, 5000)),
+        lambda: game.pay_rent_with_insurance(name(), rng.randrange(0, 4000)),
+        lambda: game.adjust_balance(name(), rng.randrange(-20000, 5000)),
+        lambda: game.enter_distress(name()) if rng.random() < 0.2 else None,
+        lambda: game.market_round(),
+        lambda: game.place_order(name(), name(), rng.choice(["buy", "sell"]), rng.randrange(200, 2500),
+                                 rng.randrange(1, 3)),
+        lambda: game.cancel_order(name(), rng.randrange(1, 60)),
+        lambda: game.build_house(name(), street()),
+        lambda: game.sell_house(name(), street()),
+        lambda: game.add_player("Ann"),
+    ]
+    rng.choice(ops)()
+
+
+def play(journal, seed, steps=300):
+    rng = random.Random(seed)
+    game = Game()
+    game.journal = journal
+    for name in NAMES:
+        game.add_player(name)
+    game.start()
+    for _ in range(steps):
+        random_op(game, rng)
+    journal.close()
+    return game
+
+
+def same_game(a, b):
+    assert a.dump_state() == b.dump_state()
+    assert json.dumps(a.snapshot(), sort_keys=True) == json.dumps(b.snapshot(), sort_keys=True)
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 7, 50, 1000])
+@pytest.mark.parametrize("seed", range(5))
+def test_restore_matches_live_game(tmp_path, seed, snapshot_every):
+    game = play(GameJournal(str(tmp_path), "g", snapshot_every), seed)
+    same_game(game, Game.restore(GameJournal(str(tmp_path), "g")))
+
+
+def test_restore_from_snapshot_alone(tmp_path):
+    journal = GameJournal(str(tmp_path), "g", snapshot_every=1)
+    game = play(journal, seed=11, steps=100)
+    assert os.path.getsize(journal.journal_path) == 0
+    same_game(game, Game.restore(GameJournal(str(tmp_path), "g")))
+
+
+def test_restore_skips_events_already_in_snapshot(tmp_path):
+    # A crash between writing the snapshot and truncating the journal leaves old events behind
+    journal = GameJournal(str(tmp_path), "g", snapshot_every=1000)
+    game = play(journal, seed=3, steps=80)
+    with open(journal.journal_path, encoding="utf-8") as f:
+        stale = f.read()
+    journal.write_snapshot(game.version, game.dump_state())
+    with open(journal.journal_path, "w", encoding="utf-8") as f:
+        f.write(stale)
+    same_game(game, Game.restore(GameJournal(str(tmp_path), "g")))
+
+
+def test_elimination_replays_the_same_after_a_snapshot(tmp_path):
+    # C buys into B before A: a restored game rebuilds C's holdings in seating order
+    journal = GameJournal(str(tmp_path), "g", snapshot_every=7)
+    game = Game()
+    game.journal = journal
+    for name in "ABC":
+        game.add_player(name)
+    game.start()
+    game.issue_share("B", "C")
+    game.issue_share("A", "C")
+    game.enter_distress("C")
+    game.enter_distress("C")
+    journal.close()
+    same_game(game, Game.restore(GameJournal(str(tmp_path), "g")))
+
+
+def test_rejected_mutations_are_not_journaled(tmp_path):
+    game = Game()
+    game.journal = GameJournal(str(tmp_path), "g", snapshot_every=1000)
+    game.add_player("Ann")
+    version = game.version
+    assert game.add_player("Ann") == (False, "Name taken or max players reached.")
+    assert game.transfer_money("Ann", "Nobody", 100)[0] is False
+    game.journal.close()
+    assert game.version == version
+    with open(game.journal.journal_path, encoding="utf-8") as f:
+        assert [json.loads(line)["op"] for line in f] == ["add_player"]
+
+
+def test_fair_lock_is_granted_in_arrival_order():
+    lock = FairLock()
+    order = []
+    lock.acquire()
+    threads = []
+    for i in range(8):
+        t = threading.Thread(target=lambda i=i: (lock.acquire(), order.append(i), lock.release()))
+        t.start()
+        threads.append(t)
+        while lock._next_ticket != i + 2:   # wait until thread i holds its ticket
+            time.sleep(0.0005)
+    lock.release()
+    for t in threads:
+        t.join()
+    assert order == list(range(8))
+
+
+def test_fair_lock_is_reentrant():
+    lock = FairLock()
+    with lock:
+        with lock:
+            assert lock._depth == 2
+    assert lock._owner is None
+    done = threading.Event()
+    threading.Thread(target=lambda: (lock.acquire(), lock.release(), done.set())).start()
+    assert done.wait(1)
+
+
+def test_concurrent_mutations_are_serialized():
+    game = Game()
+    for name in "ABCD":
+        game.add_player(name)
+    game.start()
+
+    def work(seed):
+        rng = random.Random(seed)
+        for _ in range(500):
+            a, b = rng.sample("ABCD", 2)
+            game.transfer_money(a, b, rng.randrange(1, 50))
+            if rng.random() < 0.05:
+                game.to_json()
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(p.balance for p in game.players) == 4 * S["player"]["start_balance"]
+    assert json.loads(game.to_json())["version"] == game.version
+
+
+REPLAY = """
+import json, sys
+sys.path[:0] = [{root!r}, {tests!r}]
+import player_settings
+player_settings.settings["storage"]["directory"] = None
+from app import Game
+from journal import GameJournal
+from test_journal import play
+if sys.argv[1] == "play":
+    game = play(GameJournal(sys.argv[2], "g", 100000), seed=int(sys.argv[3]), steps=400)
+else:
+    game = Game.restore(GameJournal(sys.argv[2], "g"))
+print(json.dumps(game.dump_state()))
+"""
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_replay_under_another_hash_seed_gives_the_same_state(tmp_path, seed):
+    tests = os.path.dirname(os.path.abspath(__file__))
+    script = REPLAY.format(root=os.path.dirname(tests), tests=tests)
+
+    def run(hash_seed, *args):
+        env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+        out = subprocess.run([sys.executable, "-c", script, *args], env=env, capture_output=True, text=True,
+                             check=True)
+        return json.loads(out.stdout)
+
+    played = run(1, "play", str(tmp_path), str(seed))
+    for hash_seed in (2, 3):
+        assert run(hash_seed, "replay", str(tmp_path)) == played
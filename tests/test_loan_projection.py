@@ -0,0 +1,61 @@
+"""Game.project_debt against the market rounds it projects."""
+import pytest
+
+import loan_projection
+import market_engine
+import player_settings as psettings
+from app import Game
+
+S = psettings.settings
+
+
+def bank_loans(game):
+    for amount in (500, 2750, 10000):
+        game.take_bank_loan("A", amount)
+
+
+def player_loans(game):
+    # 50 at 5%: every step truncates to 0; 1000 at 0%: never grows
+    for lender, amount, rate in (("B", 50, 5), ("B", 400, 7.5), ("C", 3000, 20), ("C", 1000, 0)):
+        game.give_player_loan(lender, "A", amount, rate)
+
+
+def distressed(game):
+    bank_loans(game)
+    player_loans(game)
+    game.enter_distress("A")
+
+
+def late_in_distress(game):
+    distressed(game)
+    game.market_round()     # one frozen round gone
+
+
+SETUPS = {f.__name__: f for f in (bank_loans, player_loans, distressed, late_in_distress)}
+ENGINES = ["loop", pytest.param("columnar", marks=pytest.mark.skipif(
+    not market_engine.available(), reason="needs numpy"))]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("rounds", [1, 3, 40])
+@pytest.mark.parametrize("setup", SETUPS)
+def test_projection_matches_real_market_rounds(monkeypatch, setup, rounds, engine):
+    monkeypatch.setitem(S["market"], "engine", engine)
+    game = Game()
+    for name in ("A", "B", "C"):
+        game.add_player(name)
+    game.start()
+    SETUPS[setup](game)
+    ok, projection = game.project_debt("A", rounds)
+    assert ok
+    player = game.get_player("A")
+    assert loan_projection.total(player, rounds) == projection["total"]   # the state's debt_projection
+
+    actual = []
+    for _ in range(rounds):
+        game.market_round()
+        actual.append(
+            [l.remaining for l in player.bank_loans] + [l.remaining for l in player.player_loans_taken.values()]
+        )
+    assert [list(col) for col in zip(*(l["schedule"] for l in projection["loans"]))] == actual
+    assert projection["total"] == [sum(owed) for owed in actual]
@@ -0,0 +1,44 @@
+"""Share exchange: the order book and Game's order handling."""
+from app import Game
+from market import Stockmarket
+
+
+def table():
+    game = Game()
+    for name in ("Anna", "Bo", "Cia"):
+        game.add_player(name)
+    game.start()
+    game.issue_share("Cia", "Anna")
+    game.issue_share("Cia", "Anna")
+    return game
+
+
+def test_price_time_priority_at_resting_price():
+    market = Stockmarket()
+    market.place("A", "X", "sell", 500, 1)
+    market.place("B", "X", "sell", 400, 1)
+    market.place("C", "X", "sell", 400, 1)
+    _, fills = market.place("D", "X", "buy", 600, 2)
+    assert [(f["seller"], f["price"]) for f in fills] == [("B", 400), ("C", 400)]
+    assert market.best_ask("X") == 500
+
+
+def test_order_crossing_own_order_is_rejected():
+    game = table()
+    assert game.place_order("Anna", "Cia", "sell", 900)[0]
+    ok, msg = game.place_order("Anna", "Cia", "buy", 1000)
+    assert not ok and "own order #1" in msg
+    assert list(game.stockmarket.orders) == [1]   # the resting order stays
+    assert game.place_order("Anna", "Cia", "buy", 800)[0]   # below the ask: no cross
+
+
+def test_cancelled_orders_do_not_pile_up_in_the_book():
+    market = Stockmarket()
+    market.place("A", "X", "buy", 100, 1)
+    for i in range(20000):
+        order, _ = market.place("B", "X", "buy", 200 + i % 7, 1)
+        market.cancel(order.id)
+    heap = market._bids["X"]
+    assert len(heap) <= 2 * len(market.orders)
+    assert market.depth("X") == {"bids": [[100, 1]], "asks": []}
+    assert market.best_bid("X") == 100
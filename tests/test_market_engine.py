@@ -0,0 +1,108 @@
+"""The columnar market round (market_engine.py) against Game's per-player loop."""
+import random
+
+import pytest
+
+import market_engine
+import player_settings as psettings
+from app import Game
+from test_journal import NAMES, random_op
+
+pytestmark = pytest.mark.skipif(not market_engine.available(), reason="needs numpy")
+
+S = psettings.settings
+
+
+def table(names=NAMES):
+    game = Game()
+    for name in names:
+        game.add_player(name)
+    game.start()
+    return game
+
+
+def lockstep(monkeypatch, step, setup=None, steps=300):
+    """Drive a loop game and a columnar game through the same calls, comparing after each."""
+    games = {}
+    for engine in ("loop", "columnar"):
+        monkeypatch.setitem(S["market"], "engine", engine)
+        games[engine] = table()
+        if setup:
+            setup(games[engine])
+    for i in range(steps):
+        results = {}
+        for engine, game in games.items():
+            monkeypatch.setitem(S["market"], "engine", engine)
+            results[engine] = step(game, i)
+        assert results["loop"] == results["columnar"]
+        assert games["loop"].dump_state() == games["columnar"].dump_state()
+    return games["columnar"]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_matches_the_loop_under_random_play(monkeypatch, seed):
+    rngs = {}
+
+    def step(game, i):
+        rng = rngs.setdefault(id(game), random.Random(seed))
+        random_op(game, rng)
+        if i % 5 == 0:
+            return game.market_round()
+
+    game = lockstep(monkeypatch, step)
+    assert game.market_table is not None
+
+
+def many_loans(game):
+    rng = random.Random(1)
+    for name in NAMES:
+        game.add_property(name, rng.choice(["Norrmalmstorg", "Hornsgatan", "Götgatan", "Strandvägen"]))
+        for _ in range(3):
+            game.take_bank_loan(name, rng.randrange(500, 10000))
+    for _ in range(40):
+        lender, borrower = rng.sample(NAMES, 2)
+        game.give_player_loan(lender, borrower, rng.randrange(1, 400), rng.choice([0, 5, 20, 7.5]))
+    for _ in range(12):
+        insurer, insured = rng.sample(NAMES, 2)
+        game.create_insurance(insurer, insured, rng.randrange(1, 3000), 5000)
+    game.issue_share("A", "B")      # share prices are floats: B's balance no longer is an int
+
+
+def test_matches_the_loop_through_capping_distress_and_lapses(monkeypatch):
+    def step(game, i):
+        if i == 3:
+            game.enter_distress("C")
+        if i == 9:
+            game.adjust_balance("D", -game.get_player("D").balance)   # D can't pay premiums: they lapse
+        if i == 20:
+            game.repay_bank_loan("A", 0, 300.5)     # a float balance: that round goes to the loop
+        if i == 24:
+            game.repay_bank_loan("A", 0)
+        if i == 30:
+            game.enter_distress("C")
+        return game.market_round()
+
+    lockstep(monkeypatch, step, setup=many_loans, steps=60)
+
+
+def test_columns_are_kept_between_rounds(monkeypatch):
+    monkeypatch.setitem(S["market"], "engine", "columnar")
+    game = table()
+    many_loans(game)
+    game.market_round()
+    columns = game.market_table.player
+    remaining = columns.remaining
+    game.adjust_balance("A", 500)           # not a loan change: nothing to re-read
+    game.market_round()
+    assert columns.remaining is remaining and not game.market_table.stale
+    loans = [l.remaining for l in columns.loans]
+    assert remaining.tolist() == loans      # rounds write through to the loan objects and the columns
+
+    game.take_bank_loan("B", 1000)
+    assert game.market_table.stale == {"B"}
+    segments = list(game.market_table.bank.segments)
+    game.market_round()
+    kept = game.market_table.bank.segments
+    assert [s[0] for i, s in enumerate(kept) if i != 1] == [s[0] for i, s in enumerate(segments) if i != 1]
+    assert len(kept[1][0]) == len(segments[1][0]) + 1
+    assert [l.remaining for l in game.market_table.bank.loans] == game.market_table.bank.remaining.tolist()
@@ -0,0 +1,104 @@
+"""game_patch deltas: Game.make_patch against static/game.js applyPatch."""
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import app
+from app import Game
+from test_journal import NAMES, random_op
+
+GAME_JS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "game.js")
+NODE = shutil.which("node")
+
+
+def apply_patches(state, patches):
+    """Run the client's applyPatch over patches in turn: [(applied, state after)]."""
+    with open(GAME_JS, encoding="utf-8") as f:
+        source = re.search(r"^function applyPatch\(patch\) \{.*?^\}", f.read(), re.S | re.M).group(0)
+    script = (
+        "let gameState = null;\n" + source + "\n"
+        "const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));\n"
+        "gameState = input.state;\n"
+        "const out = input.patches.map(p => [applyPatch(p), JSON.parse(JSON.stringify(gameState))]);\n"
+        "process.stdout.write(JSON.stringify(out));\n"
+    )
+    run = subprocess.run([NODE, "-e", script], input=json.dumps({"state": state, "patches": patches}),
+                         capture_output=True, text=True, check=True)
+    return json.loads(run.stdout)
+
+
+def state_of(game):
+    return json.loads(game.to_json())
+
+
+def test_patch_is_none_until_something_changes():
+    game = Game()
+    game.add_player("Anna")
+    assert game.make_patch()["version"] == game.version
+    assert game.make_patch() is None
+    assert game.add_player("Anna")[0] is False   # rejected: no new version, no patch
+    assert game.make_patch() is None
+    game.add_player("Bo")
+    patch = game.make_patch()
+    assert (patch["base"], patch["version"]) == (game.version - 1, game.version)
+    assert list(patch["players"]) == ["Bo"]
+
+
+@pytest.mark.skipif(NODE is None, reason="needs node to run static/game.js")
+@pytest.mark.parametrize("seed", range(3))
+def test_patch_on_version_n_gives_the_state_at_n_plus_1(seed):
+    rng = random.Random(seed)
+    game = Game()
+    game.add_player("A")
+    initial = state_of(game)
+    game.make_patch()
+    patches, expected = [], []
+    for name in NAMES[1:]:
+        game.add_player(name)
+    game.start()
+    for step in range(150):
+        if step:
+            random_op(game, rng)
+        patch = game.make_patch()
+        if patch:
+            patches.append(json.loads(json.dumps(patch)))
+            expected.append(state_of(game))
+    results = apply_patches(initial, patches)
+    assert [applied for applied, _ in results] == [True] * len(patches)
+    for (_, state), want in zip(results, expected):
+        assert state == want
+
+
+@pytest.mark.skipif(NODE is None, reason="needs node to run static/game.js")
+def test_client_rejects_a_patch_after_a_gap():
+    game = Game()
+    for name in ("Anna", "Bo"):
+        game.add_player(name)
+    state = state_of(game)
+    game.make_patch()
+    game.transfer_money("Anna", "Bo", 100)
+    game.make_patch()                       # this one never reaches the client
+    game.transfer_money("Bo", "Anna", 50)
+    patch = game.make_patch()
+    assert patch["base"] == state["version"] + 1
+    [(applied, after)] = apply_patches(state, [patch])
+    assert applied is False and after == state
+    [(applied, after)] = apply_patches(state_of(game), [patch])   # already has it: a no-op
+    assert applied is True and after == state_of(game)
+
+
+def test_request_snapshot_sends_the_full_state():
+    client = app.app.test_client()
+    game_id = client.post("/api/new_game").get_json()["game_id"]
+    client.post("/api/add_player", json={"name": "anna"})
+    sock = app.socketio.test_client(app.app, flask_test_client=client)
+    sock.emit("request_snapshot", {"game_id": game_id})
+    [message] = sock.get_received()
+    assert message["name"] == "game_update"
+    assert json.loads(message["args"][0])["game"] == state_of(app.games.get(game_id))
+    sock.disconnect()
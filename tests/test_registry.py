@@ -0,0 +1,111 @@
+"""GameRegistry: restoring spilled games, eviction limits."""
+import threading
+
+import app
+import player_settings as psettings
+from app import Game
+from journal import GameJournal
+from registry import GameRegistry
+
+S = psettings.settings
+
+
+def journaled_game(directory, game_id):
+    game = Game()
+    game.journal = GameJournal(str(directory), game_id)
+    game.add_player("Anna")
+    game.add_player("Bo")
+    return game
+
+
+def test_evicted_game_is_restored_on_access(tmp_path):
+    registry = GameRegistry(loader=lambda gid: Game.restore(GameJournal(str(tmp_path), gid)))
+    game = journaled_game(tmp_path, "1")
+    registry["1"] = game
+    before = game.to_json()
+    registry.evict("1")
+    assert registry.in_memory() == [] and "1" in registry
+    restored = registry.get("1")
+    assert restored is not game and restored.to_json() == before
+
+
+def test_corrupt_snapshot_is_quarantined(tmp_path):
+    calls = []
+
+    def loader(gid):
+        calls.append(gid)
+        return Game.restore(GameJournal(str(tmp_path), gid))
+
+    registry = GameRegistry(loader=loader)
+    game = journaled_game(tmp_path, "1")
+    game.journal.write_snapshot(game.version, game.dump_state())
+    with open(game.journal.snapshot_path, "r+", encoding="utf-8") as f:
+        f.truncate(40)
+    registry.add_spilled("1")
+
+    assert registry.get("1") is None
+    assert registry.get("1") is None
+    assert calls == ["1"]
+    assert "1" in registry.quarantined and "1" in registry   # the id isn't handed out again
+
+
+def test_join_game_with_corrupt_snapshot_is_not_found(tmp_path, monkeypatch):
+    monkeypatch.setitem(S["storage"], "directory", str(tmp_path))
+    registry = GameRegistry(loader=lambda gid: Game.restore(app.open_journal(gid)))
+    monkeypatch.setattr(app, "games", registry)
+    (tmp_path / "12345").mkdir()
+    (tmp_path / "12345" / "snapshot.json").write_text('{"v": 3, "state": {"pla')
+    registry.add_spilled("12345")
+
+    client = app.app.test_client()
+    for _ in range(2):
+        response = client.post("/api/join_game", json={"game_id": "12345"})
+        assert response.status_code == 404
+
+
+def test_slow_restore_does_not_block_other_games(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def loader(gid):
+        started.set()
+        release.wait(5)
+        return Game()
+
+    registry = GameRegistry(loader=loader)
+    registry["fast"] = Game()
+    registry.add_spilled("slow")
+    restoring = threading.Thread(target=registry.get, args=("slow",))
+    restoring.start()
+    assert started.wait(5)
+    got = []
+    reader = threading.Thread(target=lambda: got.append(registry.get("fast")))
+    reader.start()
+    reader.join(1)
+    assert got and got[0] is not None   # served while "slow" is still restoring
+    release.set()
+    restoring.join()
+    assert "slow" in registry.in_memory()
+
+
+def test_max_games_evicts_least_recently_used(tmp_path):
+    now = [0.0]
+    registry = GameRegistry(loader=lambda gid: Game.restore(GameJournal(str(tmp_path), gid)),
+                            max_games=2, clock=lambda: now[0])
+    for gid in "123":
+        registry[gid] = journaled_game(tmp_path, gid)
+        now[0] += 10
+    assert registry.in_memory() == ["2", "3"] and len(registry) == 3
+    registry.get("1")
+    assert registry.in_memory() == ["3", "1"]
+
+
+def test_memory_budget_is_left_to_the_sweep(tmp_path):
+    registry = GameRegistry(memory_budget=15)
+    measured = []
+    for gid in "12":
+        game = journaled_game(tmp_path, gid)
+        game.approx_size = lambda gid=gid: measured.append(gid) or 10
+        registry[gid] = game
+    assert measured == [] and registry.in_memory() == ["1", "2"]   # nothing measured on the request path
+    registry.sweep()
+    assert registry.in_memory() == ["2"]
@@ -0,0 +1,163 @@
+"""rent.py's compiled tables, Game.charge_rent and building and selling houses."""
+import pytest
+
+import config
+import rent
+import street_catalog
+from app import Game
+
+BROWN = ("Västerlånggatan", "Hornsgatan")
+STATIONS = street_catalog.GROUPS["Station"]
+UTILITIES = street_catalog.GROUPS["Statligt"]
+
+
+def table(*streets, owner="Anna"):
+    game = Game()
+    for name in ("Anna", "Bo"):
+        game.add_player(name)
+    game.start()
+    for street in streets:
+        game.add_property(owner, street)
+    return game
+
+
+def balances(game):
+    return {p.name: p.balance for p in game.players}
+
+
+def test_tables_match_config():
+    for group, streets in config.streets.items():
+        for name, info in streets.items():
+            hyra = info["Hyra"]
+            if "Huspris" in info:
+                assert rent.rent_for(name, 1) == hyra["Inga"]
+                assert rent.rent_for(name, len(streets)) == hyra["Alla"]
+                for houses in range(1, 6):
+                    assert rent.rent_for(name, len(streets), houses) == hyra[houses]
+            else:
+                for owned, due in hyra.items():
+                    for dice in range(2, 13):
+                        want = due(dice) if callable(due) else due
+                        assert rent.rent_for(name, owned, dice_total=dice) == want
+
+
+@pytest.mark.parametrize("owned, due", [(1, 500), (2, 1000), (3, 2000), (4, 4000)])
+def test_station_rent_by_stations_owned(owned, due):
+    game = table(*STATIONS[:owned])
+    assert [game.rent_due(s) for s in STATIONS] == [due] * owned + [0] * (4 - owned)
+
+
+@pytest.mark.parametrize("dice", [2, 7, 12])
+def test_utility_rent_is_a_multiple_of_the_dice(dice):
+    game = table(UTILITIES[0])
+    assert game.rent_due(UTILITIES[0], dice) == 80 * dice
+    game.add_property("Anna", UTILITIES[1])
+    assert [game.rent_due(s, dice) for s in UTILITIES] == [200 * dice] * 2
+
+
+def test_complete_colour_group_doubles_rent_and_houses_replace_it():
+    game = table(BROWN[0])
+    assert game.rent_due(BROWN[0]) == 40
+    game.add_property("Anna", BROWN[1])
+    assert [game.rent_due(s) for s in BROWN] == [80, 160]
+    game.adjust_balance("Anna", 10000)
+    levels = []
+    for _ in range(5):
+        for street in BROWN:
+            assert game.build_house("Anna", street)[0]
+        levels.append([game.rent_due(s) for s in BROWN])
+    assert levels == [[200, 400], [600, 1200], [1800, 3600], [3200, 6400], [5000, 9000]]
+
+
+def test_charge_rent_moves_the_table_rent():
+    game = table(*BROWN)
+    before = balances(game)
+    assert game.charge_rent("Bo", "Hornsgatan") == (True, "Bo paid 160kr rent to Anna for Hornsgatan.")
+    assert balances(game) == {"Anna": before["Anna"] + 160, "Bo": before["Bo"] - 160}
+
+    game.add_property("Anna", UTILITIES[0])
+    assert game.charge_rent("Bo", UTILITIES[0], 9)[0]
+    assert balances(game) == {"Anna": before["Anna"] + 160 + 720, "Bo": before["Bo"] - 160 - 720}
+
+
+def test_charge_rent_to_a_distressed_owner_is_halved():
+    game = table(*BROWN)
+    game.enter_distress("Anna")
+    before = balances(game)
+    assert game.charge_rent("Bo", "Hornsgatan")[0]
+    assert balances(game) == {"Anna": before["Anna"] + 80, "Bo": before["Bo"] - 160}
+
+
+@pytest.mark.parametrize("payer, street, dice, message", [
+    ("Cia", "Hornsgatan", 0, "Invalid player."),
+    ("Bo", "Nowhere", 0, "Property not found."),
+    ("Bo", "Centrum", 0, "Nobody owns Centrum."),
+    ("Anna", "Hornsgatan", 0, "Anna owns Hornsgatan."),
+    ("Bo", UTILITIES[0], 0, "Utility rent needs the dice total (2-12)."),
+    ("Bo", UTILITIES[0], 13, "Utility rent needs the dice total (2-12)."),
+])
+def test_charge_rent_rejections(payer, street, dice, message):
+    game = table("Hornsgatan", UTILITIES[0])
+    before = balances(game)
+    assert game.charge_rent(payer, street, dice) == (False, message)
+    assert balances(game) == before
+
+
+def test_houses_are_built_and_sold_evenly():
+    game = table(*BROWN)
+    start = game.get_player("Anna").balance
+    assert game.build_house("Anna", BROWN[0]) == (True, "Built on Västerlånggatan (1/5).")
+    assert game.build_house("Anna", BROWN[0]) == (False, "Build evenly across Brun.")
+    assert game.build_house("Anna", BROWN[1])[0]
+    assert game.build_house("Anna", BROWN[0])[0]
+    anna = game.get_player("Anna")
+    assert anna.houses == {BROWN[0]: 2, BROWN[1]: 1}
+    assert anna.balance == start - 3000
+    assert anna.property_value == 2400 + 3000
+
+    assert game.sell_house("Anna", BROWN[1]) == (False, "Sell evenly across Brun.")
+    assert game.sell_house("Anna", BROWN[0]) == (True, "Sold a house on Västerlånggatan for 500kr.")
+    assert game.sell_house("Anna", BROWN[1])[0]
+    assert game.sell_house("Anna", BROWN[0])[0]
+    assert anna.houses == {}
+    assert anna.balance == start - 3000 + 1500
+    assert anna.property_value == 2400
+    assert game.sell_house("Anna", BROWN[0]) == (False, "No houses on Västerlånggatan.")
+
+
+def test_houses_hold_the_group_together():
+    game = table(*BROWN)
+    game.build_house("Anna", BROWN[0])
+    message = "Sell the houses in Brun first."
+    assert game.remove_property("Anna", BROWN[1]) == (False, message)
+    assert game.transfer_property("Anna", "Bo", BROWN[1]) == (False, message)
+
+
+def test_hotel_is_the_last_level():
+    game = table(*BROWN)
+    game.adjust_balance("Anna", 10000)
+    for _ in range(5):
+        for street in BROWN:
+            game.build_house("Anna", street)
+    assert game.build_house("Anna", BROWN[0]) == (False, "Västerlånggatan already has a hotel.")
+
+
+@pytest.mark.parametrize("streets, player, street, message", [
+    (BROWN, "Cia", BROWN[0], "Invalid player."),
+    (BROWN, "Bo", BROWN[0], "Bo doesn't own Västerlånggatan."),
+    (BROWN, "Anna", "Nowhere", "Anna doesn't own Nowhere."),
+    (STATIONS, "Anna", STATIONS[0], "Houses can't be built on Södra Station."),
+    (BROWN[:1], "Anna", BROWN[0], "Own all of Brun first."),
+])
+def test_build_house_rejections(streets, player, street, message):
+    game = table(*streets)
+    assert game.build_house(player, street) == (False, message)
+
+
+def test_build_house_needs_money_and_no_distress():
+    game = table(*BROWN)
+    game.adjust_balance("Anna", -game.get_player("Anna").balance + 999)
+    assert game.build_house("Anna", BROWN[0]) == (False, "Not enough money. A house costs 1000kr.")
+    game.enter_distress("Anna")
+    assert game.build_house("Anna", BROWN[0]) == (False, "Cannot build while distressed.")
+    assert game.get_player("Anna").houses == {}
@@ -0,0 +1,46 @@
+"""The risk forecast is served by /api/risk_forecast, off the mutation path."""
+import pytest
+
+import app
+import risk
+
+pytestmark = pytest.mark.skipif(not risk.available(), reason="needs numpy")
+
+
+@pytest.fixture
+def started():
+    client = app.app.test_client()
+    game = app.games.get(client.post("/api/new_game").get_json()["game_id"])
+    for name in ("Anna", "Bo", "Cia"):
+        game.add_player(name)
+    game.start()
+    return client, game
+
+
+def test_state_has_no_forecast(started):
+    _, game = started
+    assert all("risk" not in p for p in game.to_dict()["players"])
+
+
+def test_forecast_runs_outside_the_lock_and_once_per_figures(started, monkeypatch):
+    client, game = started
+    runs = []
+    forecast = risk.forecast
+
+    def counted(table, rounds):
+        assert game.lock._owner is None     # mutations aren't held up by the Monte Carlo
+        runs.append(rounds)
+        return forecast(table, rounds)
+
+    monkeypatch.setattr(risk, "forecast", counted)
+    first = client.get("/api/risk_forecast").get_json()
+    assert first["status"] == "ok" and set(first["players"]) == {"Anna", "Bo", "Cia"}
+    game.claimed_players.add("Anna")    # figures unchanged: the last forecast stands
+    assert client.get("/api/risk_forecast").get_json() == first
+    assert runs == [app.S["risk"]["rounds"]]
+
+    client.get("/api/risk_forecast", query_string={"rounds": 3})
+    game.adjust_balance("Anna", -29000)
+    after = client.get("/api/risk_forecast").get_json()
+    assert runs == [app.S["risk"]["rounds"], 3, app.S["risk"]["rounds"]]
+    assert after["players"]["Anna"]["default"] > first["players"]["Anna"]["default"]
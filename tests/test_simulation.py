@@ -0,0 +1,70 @@
+"""Simulation turns play by board_model's rules."""
+from collections import Counter
+
+import pytest
+
+import board_model
+import simulation
+from simulation import Simulation
+
+
+class Dice:
+    """An rng whose random() gives set die faces, one per call."""
+
+    def __init__(self, faces):
+        self.faces = list(faces)
+
+    def random(self):
+        return (self.faces.pop(0) - 1) / 6
+
+
+def moves_of(sim, monkeypatch):
+    """Record each move's end square; no buying, rent, tax or bot management."""
+    ends = []
+    move = sim._move
+
+    def recorded(name, steps):
+        move(name, steps)
+        if not sim.jail_turns[name]:
+            ends.append(sim.position[name])
+
+    monkeypatch.setattr(sim, "_move", recorded)
+    monkeypatch.setattr(sim, "_land_on_street", lambda *args: None)
+    monkeypatch.setattr(sim, "_pay", lambda *args: None)
+    monkeypatch.setattr(sim, "_manage", lambda *args: None)
+    return ends
+
+
+def test_last_double_in_a_row_goes_to_jail_without_moving(monkeypatch):
+    sim = Simulation(["Anna", "Bo"], seed=0)
+    ends = moves_of(sim, monkeypatch)
+    sim.rng = Dice([1, 1, 2, 2, 3, 3])
+    sim.turn("Anna")
+    assert ends == [2, 6]
+    assert sim.position["Anna"] == simulation.JAIL and sim.jail_turns["Anna"] == 1
+
+
+def test_jail_attempts_then_pay_and_move(monkeypatch):
+    sim = Simulation(["Anna", "Bo"], seed=0)
+    ends = moves_of(sim, monkeypatch)
+    sim._to_jail("Anna")
+    sim.rng = Dice([1, 2] * (board_model.DEFAULT_RULES.jail_attempts - 1) + [1, 2, 5, 5])
+    for _ in range(board_model.DEFAULT_RULES.jail_attempts - 1):
+        sim.turn("Anna")
+        assert ends == []
+    sim.turn("Anna")
+    assert ends == [simulation.JAIL + 3]    # out on the last try, paying
+    assert sim.rng.faces == [5, 5]          # and no roll after it
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_move_ends_follow_the_board_model(monkeypatch, seed):
+    sim = Simulation(["Anna", "Bo"], seed=seed)
+    ends = moves_of(sim, monkeypatch)
+    turns = 100000
+    for _ in range(turns):
+        sim.turn("Anna")
+    counts = Counter(ends)
+    for square, p in enumerate(board_model.landing_probabilities().squares):
+        assert counts[square] / turns == pytest.approx(p, abs=0.003)
+    assert counts[board_model.GO_TO_JAIL] == 0
@@ -0,0 +1,80 @@
+"""Share prices for player-companies, from a pluggable valuation engine.
+
+An engine is a function (player) -> value of the whole company in kr; the
+share price is that over max_shares, never below 0. The "valuation" settings
+pick the engine:
+
+- "fundamental": property at list price, plus expected rent over a horizon of
+  opponent turns (board_model, counting houses and colour-group completion), plus cash
+  at a weight, minus debt; discounted while distressed.
+- "formula": the original property_value + 10% of balance.
+
+Prices are memoized per player state: Player.changed() bumps the player's
+version, and a price is only recomputed when that version or the engine moved.
+"""
+import math
+
+import board_model
+import player_settings as psettings
+import street_catalog
+
+S = psettings.settings
+
+
+def formula(player):
+    return player.property_value + player.balance * 0.1
+
+
+def expected_rent_flow(player):
+    """Expected rent per opponent turn from player's streets.
+
+    Summed with math.fsum: properties is a set, and a plain float sum would
+    depend on its (hash seed dependent) order, so prices would differ
+    between processes and journal replays.
+    """
+    by_group = {}
+    for name in player.properties:
+        street = street_catalog.get(name)
+        by_group[street.group] = by_group.get(street.group, 0) + 1
+    table = board_model.rent_table()
+    flows = []
+    for name in player.properties:
+        street = street_catalog.get(name)
+        flows.append(table[name][board_model.rent_key(street, by_group[street.group], player.houses.get(name, 0))])
+    return math.fsum(flows)
+
+
+def fundamental(player):
+    cfg = S["valuation"]
+    net_cash = player.balance - player.total_debt
+    value = (
+        player.property_value
+        + expected_rent_flow(player) * cfg["horizon_turns"]
+        + (net_cash * cfg["cash_weight"] if net_cash > 0 else net_cash)
+    )
+    if player.distressed:
+        value *= 1 - cfg["distress_discount"]
+    return value
+
+
+ENGINES = {
+    "fundamental": fundamental,
+    "formula": formula,
+}
+
+
+def register(name, engine):
+    """Add an engine: engine(player) -> company value in kr."""
+    ENGINES[name] = engine
+
+
+def share_price(player):
+    """Price of one share in player, memoized on (player version, engine)."""
+    engine = S["valuation"]["engine"]
+    memo = player._valuation
+    if memo is not None and memo[0] == player.version and memo[1] == engine:
+        return memo[2]
+    value = ENGINES[engine](player)
+    price = value / S["player"]["max_shares"] if value > 0 else 0
+    player._valuation = (player.version, engine, price)
+    return price